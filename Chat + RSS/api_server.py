@@ -0,0 +1,347 @@
+"""
+Servicio HTTP asíncrono para ingesta y consultas RAG
+
+Endpoints:
+    GET  /health                       Estado del servicio
+    POST /documents?name=archivo.pdf   Cuerpo = bytes del archivo. Devuelve document_id
+    POST /retrieve                     {"document_id", "question", "k"?}
+    POST /answer                       {"document_id", "question", "k"?, "history"?}
+    GET  /metrics                      Percentiles de latencia por endpoint y por etapa
+    GET  /metrics/prometheus           Las mismas métricas en formato Prometheus
+
+Uso:
+    python api_server.py --port 8080
+    python api_server.py --llm stub --stub-latency-ms 300   # pruebas de carga offline
+"""
+import argparse
+import asyncio
+import io
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Optional
+
+from aiohttp import web
+
+from config.settings import settings
+from models.document import ConversationMessage
+from services.document_service import DocumentService
+from services.embedding_service import EmbeddingService
+from services.ai_service import AIService
+from services.index_registry import IndexRegistry, IndexReleasedError
+from services.llm_backends import create_llm_backend
+from services.metrics_service import LatencyTracker
+from services.tracing_service import tracer
+from services.usage_service import usage_tracker
+
+
+# Todos los documentos de la API comparten un mismo espacio en el registro de índices
+_API_SESSION = "api"
+
+
+class APIServer:
+    """
+    Expone el pipeline RAG por HTTP reutilizando los servicios de la app
+
+    El trabajo de CPU (extracción, embeddings, búsqueda) se ejecuta en un
+    pool de hilos para no bloquear el event loop, y las llamadas al LLM
+    salen en paralelo limitadas por un semáforo.
+
+    Los índices viven en un IndexRegistry: el presupuesto de memoria
+    (INDEX_MEMORY_BUDGET_MB) manda a disco los documentos menos consultados,
+    que se recargan con la siguiente pregunta. Dos subidas simultáneas del
+    mismo documento lo indexan una sola vez.
+    """
+
+    def __init__(self, llm_backend=None):
+        self.document_service = DocumentService()
+        self.embedding_service = EmbeddingService()
+        # El cliente admite tantas llamadas como el servidor; el stub no tiene cuota que cuidar
+        self.ai_service = AIService(
+            model=llm_backend,
+            max_concurrency=settings.API_MAX_CONCURRENT_LLM,
+            rate_limited=llm_backend is None
+        )
+        # Sin TTL de sesión: los documentos de la API no tienen una sesión que expire
+        self.index_registry = IndexRegistry(self.embedding_service, session_ttl=0)
+        self.documents: Dict[str, int] = {}  # document_id -> chunks
+        self._ingests: Dict[str, Future] = {}  # Indexaciones en curso por document_id
+        self._ingest_lock = threading.Lock()
+
+        self.cpu_executor = ThreadPoolExecutor(
+            max_workers=settings.API_CPU_WORKERS, thread_name_prefix="api-cpu"
+        )
+        self.llm_executor = ThreadPoolExecutor(
+            max_workers=settings.API_MAX_CONCURRENT_LLM, thread_name_prefix="api-llm"
+        )
+        self.llm_semaphore: Optional[asyncio.Semaphore] = None
+        self.latency = LatencyTracker()
+
+    def create_app(self) -> web.Application:
+        app = web.Application(
+            middlewares=[self._latency_middleware],
+            client_max_size=settings.API_MAX_UPLOAD_MB * 1024 * 1024
+        )
+        app.router.add_get("/health", self.health)
+        app.router.add_post("/documents", self.ingest)
+        app.router.add_post("/retrieve", self.retrieve)
+        app.router.add_post("/answer", self.answer)
+        app.router.add_get("/metrics", self.metrics)
+        app.router.add_get("/metrics/prometheus", self.prometheus_metrics)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    # -------------------------
+    # CICLO DE VIDA
+    # -------------------------
+
+    async def _on_startup(self, app: web.Application) -> None:
+        self.llm_semaphore = asyncio.Semaphore(settings.API_MAX_CONCURRENT_LLM)
+
+    async def _on_cleanup(self, app: web.Application) -> None:
+        self.cpu_executor.shutdown(wait=False)
+        self.llm_executor.shutdown(wait=False)
+        self.embedding_service.close()
+
+    @web.middleware
+    async def _latency_middleware(self, request: web.Request, handler):
+        start = time.perf_counter()
+        try:
+            return await handler(request)
+        finally:
+            route = request.match_info.route.resource
+            path = route.canonical if route is not None else request.path
+            self.latency.record(f"{request.method} {path}", time.perf_counter() - start)
+
+    # -------------------------
+    # UTILIDADES
+    # -------------------------
+
+    async def _run_cpu(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.cpu_executor, func, *args)
+
+    async def _run_llm(self, func, *args):
+        loop = asyncio.get_running_loop()
+        async with self.llm_semaphore:
+            return await loop.run_in_executor(self.llm_executor, func, *args)
+
+    @staticmethod
+    def _error(message: str, status: int = 400) -> web.Response:
+        return web.json_response({"error": message}, status=status)
+
+    async def _read_query(self, request: web.Request):
+        """
+        Valida el cuerpo JSON de /retrieve y /answer
+
+        Returns:
+            Tupla (datos, None) o (None, respuesta de error)
+        """
+        try:
+            data = await request.json()
+        except Exception:
+            return None, self._error("El cuerpo debe ser JSON")
+
+        if not isinstance(data, dict):
+            return None, self._error("El cuerpo debe ser un objeto JSON")
+
+        if not data.get("question"):
+            return None, self._error("Falta el campo 'question'")
+
+        available = self.documents.get(data.get("document_id", ""))
+        if available is None:
+            return None, self._unknown_document()
+
+        k = data.get("k")
+        if k is not None:
+            if isinstance(k, bool) or not str(k).strip().isdigit() or int(k) < 1:
+                return None, self._error("'k' debe ser un entero positivo")
+            if int(k) > available:
+                return None, self._error(f"'k' no puede superar los {available} fragmentos del documento")
+            data["k"] = int(k)
+
+        history = data.get("history", [])
+        if not isinstance(history, list) or not all(
+            isinstance(msg, dict) and isinstance(msg.get("role"), str) and isinstance(msg.get("content"), str)
+            for msg in history
+        ):
+            return None, self._error("'history' debe ser una lista de mensajes {role, content}")
+
+        return data, None
+
+    def _unknown_document(self) -> web.Response:
+        return self._error("document_id desconocido. Primero sube el documento.", status=404)
+
+    def _retrieve_sync(self, document_id: str, question: str, k: Optional[int]):
+        # Fija el índice mientras se consulta (y lo recarga si estaba en disco)
+        with self.index_registry.use(_API_SESSION, document_id) as database_service:
+            return database_service.retrieve_context(question, k)
+
+    async def _retrieve(self, data: dict):
+        """
+        Búsqueda de /retrieve y /answer
+
+        Returns:
+            Tupla (RetrievalResult, None) o (None, respuesta de error)
+        """
+        try:
+            return await self._run_cpu(
+                self._retrieve_sync, data["document_id"], data["question"], data.get("k")
+            ), None
+        except IndexReleasedError:
+            # Se descartó sin guardarse en disco (INDEX_SPILL_TO_DISK=false)
+            self.documents.pop(data["document_id"], None)
+            return None, self._unknown_document()
+        except Exception as e:
+            return None, self._error(f"Error en la búsqueda: {e}", status=500)
+
+    def _is_indexed(self, document_id: str) -> bool:
+        if document_id not in self.documents:
+            return False
+        try:
+            with self.index_registry.use(_API_SESSION, document_id):
+                return True
+        except IndexReleasedError:
+            return False
+
+    def _ingest_sync(self, file_name: str, data: bytes) -> dict:
+        document = self.document_service.process_file(io.BytesIO(data), file_name)
+        document_id = document.file_hash[:16]
+
+        # Una sola indexación por documento: las subidas simultáneas esperan a la primera
+        with self._ingest_lock:
+            pending = self._ingests.get(document_id)
+            owner = pending is None
+            if owner:
+                pending = self._ingests[document_id] = Future()
+
+        if not owner:
+            pending.result()
+        else:
+            try:
+                if not self._is_indexed(document_id):
+                    self.index_registry.create(_API_SESSION, document)
+                    self.documents[document_id] = len(document.chunks)
+                pending.set_result(None)
+            except BaseException as e:
+                pending.set_exception(e)
+                raise
+            finally:
+                with self._ingest_lock:
+                    self._ingests.pop(document_id, None)
+
+        return {
+            "document_id": document_id,
+            "file_name": document.file_name,
+            "chunks": len(document.chunks)
+        }
+
+    # -------------------------
+    # ENDPOINTS
+    # -------------------------
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", "documents": len(self.documents)})
+
+    async def ingest(self, request: web.Request) -> web.Response:
+        file_name = request.query.get("name", "")
+        extension = file_name.split(".")[-1].lower()
+
+        if extension not in settings.SUPPORTED_EXTENSIONS:
+            return self._error(f"Extensión no soportada: '{extension}'")
+
+        data = await request.read()
+        if not data:
+            return self._error("El archivo está vacío")
+
+        try:
+            result = await self._run_cpu(self._ingest_sync, file_name, data)
+        except Exception as e:
+            return self._error(f"No se pudo procesar el archivo: {e}", status=422)
+
+        return web.json_response(result)
+
+    async def retrieve(self, request: web.Request) -> web.Response:
+        data, error = await self._read_query(request)
+        if data is None:
+            return error
+
+        retrieval_result, error = await self._retrieve(data)
+        if error is not None:
+            return error
+
+        return web.json_response({
+            "chunks": retrieval_result.chunks,
+            "chunk_ids": retrieval_result.chunk_ids,
+            "distances": retrieval_result.distances
+        })
+
+    async def answer(self, request: web.Request) -> web.Response:
+        data, error = await self._read_query(request)
+        if data is None:
+            return error
+
+        history = [
+            ConversationMessage(role=msg["role"], content=msg["content"])
+            for msg in data.get("history", [])
+        ]
+
+        start = time.perf_counter()
+        retrieval_result, error = await self._retrieve(data)
+        if error is not None:
+            return error
+        retrieved = time.perf_counter()
+
+        try:
+            answer = await self._run_llm(partial(
+                self.ai_service.generate_response,
+                retrieval_result.get_context_text(),
+                data["question"],
+                history,
+                session_id=data.get("session_id"),
+                document_id=data["document_id"]
+            ))
+        except Exception as e:
+            return self._error(f"Error del LLM: {e}", status=502)
+        generated = time.perf_counter()
+
+        return web.json_response({
+            "answer": answer,
+            "chunk_ids": retrieval_result.chunk_ids,
+            "timings_ms": {
+                "retrieval": round((retrieved - start) * 1000, 2),
+                "generation": round((generated - retrieved) * 1000, 2)
+            }
+        })
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "latency": self.latency.summary(),
+            "stages": tracer.get_stats(),
+            "embedding_batching": self.embedding_service.get_batching_stats(),
+            "indexes": self.index_registry.get_stats(),
+            "llm_client": self.ai_service.client.get_stats(),
+            "llm_usage": usage_tracker.get_stats()
+        })
+
+    async def prometheus_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=tracer.to_prometheus(), content_type="text/plain")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API HTTP del pipeline RAG")
+    parser.add_argument("--host", default=settings.API_HOST)
+    parser.add_argument("--port", type=int, default=settings.API_PORT)
+    parser.add_argument("--llm", choices=["gemini", "stub"], default="gemini", help="Backend de LLM")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="Latencia simulada del stub")
+    parser.add_argument("--stub-failure-rate", type=float, default=0.0, help="Fracción de llamadas del stub que fallan")
+    args = parser.parse_args()
+
+    server = APIServer(llm_backend=create_llm_backend(args.llm, args.stub_latency_ms, args.stub_failure_rate))
+    web.run_app(server.create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
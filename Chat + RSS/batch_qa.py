@@ -0,0 +1,147 @@
+"""
+Preguntas y respuestas en lote sin Streamlit
+
+Procesa un documento, lee preguntas de un archivo JSONL y las responde
+en paralelo con un pool de hilos acotado. Cada línea de entrada puede ser
+{"id": "...", "question": "..."} o simplemente {"question": "..."}.
+
+Uso:
+    python batch_qa.py documento.pdf preguntas.jsonl respuestas.jsonl --workers 8
+    python batch_qa.py documento.pdf preguntas.jsonl respuestas.jsonl --llm stub --stub-latency-ms 200
+"""
+import argparse
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from services.document_service import DocumentService
+from services.embedding_service import EmbeddingService
+from services.database_service import DatabaseService
+from services.ai_service import AIService
+from services.llm_backends import create_llm_backend
+from services.usage_service import usage_tracker
+
+
+def load_questions(path: str) -> list:
+    """
+    Lee las preguntas de un archivo JSONL (ignora líneas vacías)
+    """
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            questions.append({
+                "id": str(item.get("id", line_number)),
+                "question": item["question"]
+            })
+    return questions
+
+
+def answer_question(
+    item: dict,
+    database_service: DatabaseService,
+    ai_service: AIService,
+    k: Optional[int],
+    document_id: Optional[str] = None
+) -> dict:
+    """
+    Responde una pregunta y mide el tiempo de cada etapa
+    """
+    result = {"id": item["id"], "question": item["question"]}
+    start = time.perf_counter()
+
+    try:
+        retrieval_result = database_service.retrieve_context(item["question"], k=k)
+        retrieved = time.perf_counter()
+
+        answer = ai_service.generate_response(
+            retrieval_result.get_context_text(), item["question"], [], document_id=document_id
+        )
+        generated = time.perf_counter()
+
+        result.update({
+            "answer": answer,
+            "chunk_ids": retrieval_result.chunk_ids,
+            "timings_ms": {
+                "retrieval": round((retrieved - start) * 1000, 2),
+                "generation": round((generated - retrieved) * 1000, 2),
+                "total": round((generated - start) * 1000, 2)
+            }
+        })
+    except Exception as e:
+        result.update({
+            "error": str(e),
+            "timings_ms": {"total": round((time.perf_counter() - start) * 1000, 2)}
+        })
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Responde un lote de preguntas sobre un documento")
+    parser.add_argument("document", help="Archivo a consultar (pdf, docx, xlsx, txt)")
+    parser.add_argument("questions", help="Archivo JSONL con las preguntas")
+    parser.add_argument("output", help="Archivo JSONL donde guardar las respuestas")
+    parser.add_argument("--workers", type=int, default=4, help="Preguntas respondidas en paralelo")
+    parser.add_argument("--k", type=int, default=None,
+                        help="Fragmentos a recuperar (por defecto el top_k del perfil del documento)")
+    parser.add_argument("--llm", choices=["gemini", "stub"], default="gemini", help="Backend de LLM")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="Latencia simulada del stub")
+    parser.add_argument("--stub-failure-rate", type=float, default=0.0, help="Fracción de llamadas del stub que fallan")
+    args = parser.parse_args()
+
+    document_service = DocumentService()
+    embedding_service = EmbeddingService()
+    database_service = DatabaseService(embedding_service)
+    # El stub no tiene cuota: sin límites por minuto y una llamada por worker
+    client_options = {"rate_limited": False, "max_concurrency": max(1, args.workers)} if args.llm == "stub" else {}
+    ai_service = AIService(
+        model=create_llm_backend(args.llm, args.stub_latency_ms, args.stub_failure_rate),
+        **client_options
+    )
+
+    # 1. Ingesta del documento
+    path = Path(args.document)
+    start = time.perf_counter()
+    document = document_service.process_file(io.BytesIO(path.read_bytes()), path.name)
+    processed = time.perf_counter()
+    database_service.create_collection(document)
+    indexed = time.perf_counter()
+    print(f"Documento procesado en {processed - start:.2f}s, indexado en {indexed - processed:.2f}s "
+          f"({len(document.chunks)} chunks)")
+
+    # 2. Preguntas en paralelo (el orden de salida respeta el de entrada)
+    questions = load_questions(args.questions)
+    errors = 0
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor, \
+            open(args.output, "w", encoding="utf-8") as out:
+        results = executor.map(
+            lambda item: answer_question(item, database_service, ai_service, args.k, document.file_hash),
+            questions
+        )
+        for result in results:
+            if "error" in result:
+                errors += 1
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    elapsed = time.perf_counter() - start
+    rate = len(questions) / elapsed if elapsed else 0.0
+    print(f"{len(questions)} preguntas respondidas en {elapsed:.2f}s ({rate:.2f} preguntas/s, "
+          f"{args.workers} workers), {errors} errores")
+    usage = usage_tracker.get_totals()
+    print(f"Tokens: {usage['prompt_tokens']} de prompt ({usage['mean_prompt_tokens']} por pregunta), "
+          f"{usage['completion_tokens']} de respuesta, costo estimado ${usage['cost_usd']:.4f}"
+          + (" (tokens estimados)" if usage["estimated_calls"] else ""))
+    print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Benchmarks de rendimiento del pipeline RAG
+
+Se ejecutan desde la carpeta del proyecto, por ejemplo:
+    python -m benchmarks.embedding_workers
+"""
@@ -0,0 +1,86 @@
+"""
+Prueba de carga local contra api_server.py
+
+Sube un documento y lanza preguntas a /answer con una concurrencia fija.
+Para no gastar cuota, arranca el servidor con el LLM simulado:
+
+    python api_server.py --llm stub --stub-latency-ms 300
+    python -m benchmarks.api_load documento.pdf --requests 500 --concurrency 32
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+import aiohttp
+
+from services.metrics_service import percentile
+
+
+QUESTIONS = [
+    "¿De qué trata el documento?",
+    "¿Cuáles son las conclusiones principales?",
+    "Resume la primera sección",
+    "¿Qué datos numéricos aparecen?",
+    "¿Quién es el autor?",
+]
+
+
+async def run(args) -> None:
+    base_url = args.url.rstrip("/")
+    path = Path(args.document)
+
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{base_url}/documents", params={"name": path.name},
+                                data=path.read_bytes()) as response:
+            response.raise_for_status()
+            document_id = (await response.json())["document_id"]
+
+        latencies = []
+        errors = 0
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one_request(i: int) -> None:
+            nonlocal errors
+            payload = {"document_id": document_id, "question": QUESTIONS[i % len(QUESTIONS)]}
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    async with session.post(f"{base_url}/{args.endpoint}", json=payload) as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                except aiohttp.ClientError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one_request(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+        async with session.get(f"{base_url}/metrics") as response:
+            server_metrics = await response.json()
+
+    latencies.sort()
+    print(f"{args.requests} peticiones a /{args.endpoint}, concurrencia {args.concurrency}")
+    print(f"Tiempo total: {elapsed:.2f}s ({args.requests / elapsed:.1f} peticiones/s), {errors} errores")
+    print("Latencia cliente: " + ", ".join(
+        f"p{p}={percentile(latencies, p) * 1000:.1f}ms" for p in (50, 95, 99)
+    ))
+    print("Latencia servidor:")
+    for name, stats in server_metrics["latency"].items():
+        print(f"  {name}: {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de api_server.py")
+    parser.add_argument("document", help="Documento a subir antes de la prueba")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--endpoint", choices=["answer", "retrieve"], default="answer")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark del enriquecimiento de entradas con el artículo completo
+
+Levanta un servidor local que sirve un feed y las páginas de sus noticias
+(con latencia simulada) y compara:
+    - descarga secuencial, un artículo por vez (sin caché)
+    - descarga en paralelo con límite por dominio (caché vacía)
+    - segunda pasada con la caché en disco (sin red)
+
+Los enlaces se reparten entre dos "sitios" (127.0.0.1 y localhost) para
+que se vea el límite por dominio.
+
+Uso:
+    python -m benchmarks.article_enrich --entries 20 --latency 0.3
+    python -m benchmarks.article_enrich --entries 40 --workers 16 --per-domain 4
+"""
+import argparse
+import tempfile
+import time
+
+from benchmarks.feeds import FixtureFeedServer, build_article, build_rss
+from services.article_enricher import ArticleEnricher
+from services.feed_parser import parse_bytes
+from services.rss_service import RSSService
+from services.token_utils import estimate_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de enriquecimiento con artículos")
+    parser.add_argument("--entries", type=int, default=20, help="Entradas del feed")
+    parser.add_argument("--latency", type=float, default=0.3, help="Latencia simulada de cada página (s)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--per-domain", type=int, default=2, help="Descargas simultáneas por dominio")
+    parser.add_argument("--delay", type=float, default=0.05, help="Pausa entre descargas a un dominio (s)")
+    args = parser.parse_args()
+
+    seed = 42
+    pages = {f"/{seed}/noticia-{i}": build_article(i, seed=seed) for i in range(args.entries)}
+
+    with FixtureFeedServer(pages, slow_seconds=args.latency) as server:
+        _, entries = parse_bytes(build_rss(args.entries, seed=seed, link_base=server.url("/slow")))
+        # La mitad de los enlaces por "otro sitio"
+        for entry in entries[1::2]:
+            entry.link = entry.link.replace("127.0.0.1", "localhost")
+
+        before = estimate_tokens("".join(RSSService.format_entry(entry) for entry in entries))
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cases = [
+                ("secuencial", ArticleEnricher(cache_dir="", workers=1, per_domain=1, domain_delay=0,
+                                                allow_private_hosts=True)),
+                ("paralelo (caché vacía)", ArticleEnricher(cache_dir=cache_dir, workers=args.workers,
+                                                           per_domain=args.per_domain, domain_delay=args.delay,
+                                                           allow_private_hosts=True)),
+                ("paralelo (caché en disco)", ArticleEnricher(cache_dir=cache_dir, workers=args.workers,
+                                                              per_domain=args.per_domain, domain_delay=args.delay,
+                                                              allow_private_hosts=True)),
+            ]
+
+            print(f"{'modo':<28} {'tiempo (s)':>10} {'descargas':>10} {'caché':>6} "
+                  f"{'fallos':>7} {'simultáneas':>12} {'tokens':>8}")
+            for label, enricher in cases:
+                server.max_active = 0
+                start = time.perf_counter()
+                enriched = enricher.enrich(entries)
+                elapsed = time.perf_counter() - start
+
+                stats = enricher.get_stats()
+                after = estimate_tokens("".join(RSSService.format_entry(entry) for entry in enriched))
+                print(f"{label:<28} {elapsed:>10.2f} {stats['downloaded']:>10} {stats['cache_hits']:>6} "
+                      f"{stats['failures']:>7} {server.max_active:>12} {after:>8}")
+
+        print(f"\nTokens del prompt sin artículos: {before}")
+        sample = next((entry for entry in enriched if entry.content), None)
+        if sample:
+            print(f"Ejemplo de texto extraído ({len(sample.content)} caracteres): {sample.content[:160]}...")
+
+
+if __name__ == "__main__":
+    main()
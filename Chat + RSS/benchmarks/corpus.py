@@ -0,0 +1,164 @@
+"""
+Generadores de corpus sintético para los benchmarks
+
+Todos los generadores son deterministas (semilla fija) para que dos
+ejecuciones midan exactamente el mismo contenido.
+"""
+import io
+import random
+from typing import List
+
+
+WORDS = (
+    "documento sistema datos modelo consulta respuesta contexto archivo texto "
+    "vector búsqueda análisis resumen información proceso resultado usuario"
+).split()
+
+FORMATS = ("txt", "pdf", "docx", "xlsx")
+
+# Caracteres por línea de los formatos con líneas/filas (pdf, xlsx)
+LINE_WIDTH = 90
+
+
+def generate_text(size_bytes: int, seed: int = 42) -> str:
+    """
+    Genera texto en párrafos con aproximadamente `size_bytes` caracteres
+    """
+    rng = random.Random(seed)
+    paragraphs = []
+    length = 0
+
+    while length < size_bytes:
+        sentences = []
+        for _ in range(rng.randint(3, 6)):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(6, 16))]
+            sentences.append(" ".join(words).capitalize() + ".")
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 1
+
+    return "\n".join(paragraphs)
+
+
+def generate_questions(count: int, seed: int = 7) -> List[str]:
+    """
+    Genera preguntas sintéticas con el mismo vocabulario del corpus
+    """
+    rng = random.Random(seed)
+    return [
+        "¿Qué dice el documento sobre " + " ".join(rng.sample(WORDS, 3)) + "?"
+        for _ in range(count)
+    ]
+
+
+def _wrap_lines(text: str, width: int = LINE_WIDTH) -> List[str]:
+    lines = []
+    for paragraph in text.split("\n"):
+        while len(paragraph) > width:
+            cut = paragraph.rfind(" ", 0, width)
+            cut = cut if cut > 0 else width
+            lines.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        lines.append(paragraph)
+    return lines
+
+
+def build_txt(text: str) -> bytes:
+    return text.encode("utf-8")
+
+
+def build_docx(text: str) -> bytes:
+    from docx import Document as DocxWriter
+
+    document = DocxWriter()
+    for paragraph in text.split("\n"):
+        document.add_paragraph(paragraph)
+
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def build_xlsx(text: str) -> bytes:
+    import pandas as pd
+
+    lines = _wrap_lines(text)
+    df = pd.DataFrame({"fila": range(len(lines)), "texto": lines})
+
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False, sheet_name="Datos")
+    return buffer.getvalue()
+
+
+def build_pdf(text: str, lines_per_page: int = 50) -> bytes:
+    """
+    Escribe un PDF mínimo (Helvetica, una línea de texto por renglón)
+
+    Se genera a mano para no añadir una dependencia sólo para benchmarks.
+    """
+    lines = [
+        line.encode("latin-1", "replace").decode("latin-1")
+        .replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        for line in _wrap_lines(text)
+    ]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Objetos: 1 catálogo, 2 páginas, 3 fuente, luego (página, contenido) por cada página
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    }
+    kids = []
+    for i, page_lines in enumerate(pages):
+        page_id = 4 + i * 2
+        content_id = page_id + 1
+        kids.append(f"{page_id} 0 R")
+
+        stream = "BT /F1 10 Tf 12 TL 50 800 Td " + " ".join(f"({line}) '" for line in page_lines) + " ET"
+        stream_bytes = stream.encode("latin-1")
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1")
+        objects[content_id] = (
+            f"<< /Length {len(stream_bytes)} >>\nstream\n".encode("latin-1") + stream_bytes + b"\nendstream"
+        )
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode("latin-1")
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = output.tell()
+        output.write(f"{object_id} 0 obj\n".encode("latin-1") + objects[object_id] + b"\nendobj\n")
+
+    xref_offset = output.tell()
+    output.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+    for object_id in sorted(objects):
+        output.write(f"{offsets[object_id]:010d} 00000 n \n".encode("latin-1"))
+    output.write(
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+    )
+    return output.getvalue()
+
+
+BUILDERS = {
+    "txt": build_txt,
+    "pdf": build_pdf,
+    "docx": build_docx,
+    "xlsx": build_xlsx
+}
+
+
+def build_file(file_format: str, text: str) -> bytes:
+    """
+    Genera un archivo del formato indicado con el texto dado
+
+    Args:
+        file_format: "txt", "pdf", "docx" o "xlsx"
+        text: Contenido del archivo
+
+    Returns:
+        Bytes del archivo
+    """
+    return BUILDERS[file_format](text)
@@ -0,0 +1,62 @@
+"""
+Benchmark: chunks/segundo del motor de embeddings según el número de workers
+
+Uso:
+    python -m benchmarks.embedding_workers --chunks 20000 --workers 1 2 4
+"""
+import argparse
+import random
+import time
+
+from benchmarks.corpus import WORDS
+from config.settings import settings
+from services.embedding_service import EmbeddingService
+
+
+def synthetic_chunks(count: int, size: int, seed: int = 42) -> list:
+    """
+    Genera chunks de texto aleatorio de aproximadamente `size` caracteres
+    """
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(count):
+        words = []
+        length = 0
+        while length < size:
+            word = rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        chunks.append(" ".join(words))
+    return chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de embeddings por número de workers")
+    parser.add_argument("--chunks", type=int, default=5000, help="Número de chunks a vectorizar")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, default=0, help="Hilos intra-op con 1 worker")
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BATCH_SIZE)
+    args = parser.parse_args()
+
+    texts = synthetic_chunks(args.chunks, settings.CHUNK_SIZE)
+    print(f"{args.chunks} chunks de ~{settings.CHUNK_SIZE} caracteres, batch_size={args.batch_size}\n")
+    print(f"{'workers':>8} {'segundos':>10} {'chunks/s':>10}")
+
+    for workers in args.workers:
+        service = EmbeddingService(workers=workers, batch_size=args.batch_size, threads=args.threads)
+        try:
+            # Calentamiento: carga del modelo (y del pool) fuera de la medición
+            service.encode_array(texts[:max(settings.EMBEDDING_POOL_MIN_TEXTS, args.batch_size)])
+
+            start = time.perf_counter()
+            embeddings = service.encode_array(texts)
+            elapsed = time.perf_counter() - start
+        finally:
+            service.close()
+
+        assert embeddings.shape[0] == len(texts)
+        print(f"{workers:>8} {elapsed:>10.2f} {len(texts) / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark de descarga concurrente de feeds con GET condicional
+
+Levanta un servidor local con feeds sintéticos (más uno lento, uno roto
+y uno inexistente) y compara:
+    - descarga secuencial sin caché (el camino anterior, un feed por vez)
+    - descarga concurrente en frío (caché vacía)
+    - descarga concurrente en caliente (todas las respuestas son 304)
+
+Uso:
+    python -m benchmarks.feed_fetch --feeds 40 --entries 50
+    python -m benchmarks.feed_fetch --feeds 40 --workers 16 --per-host 4 --timeout 1
+"""
+import argparse
+import tempfile
+import time
+
+from benchmarks.feeds import FixtureFeedServer, build_rss
+from services.feed_fetcher import FeedFetcher
+
+
+def summarize(label: str, results: list, elapsed: float) -> None:
+    statuses = {}
+    for result in results:
+        statuses[result.status] = statuses.get(result.status, 0) + 1
+    downloaded = sum(result.bytes_downloaded for result in results)
+    print(f"{label:<28} {elapsed:>8.2f}s  {downloaded / 1_048_576:>8.2f} MB  {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de descarga de feeds")
+    parser.add_argument("--feeds", type=int, default=40, help="Feeds válidos a servir")
+    parser.add_argument("--entries", type=int, default=50, help="Entradas por feed")
+    parser.add_argument("--content-kb", type=int, default=4, help="Tamaño del content:encoded de cada entrada")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--per-host", type=int, default=8, help="Conexiones simultáneas por host")
+    parser.add_argument("--timeout", type=float, default=1.0, help="Timeout por feed en segundos")
+    args = parser.parse_args()
+
+    feeds = {
+        f"/feed/{i}.xml": build_rss(args.entries, content_bytes=args.content_kb * 1024, seed=i)
+        for i in range(args.feeds)
+    }
+
+    with FixtureFeedServer(feeds, slow_seconds=args.timeout * 3) as server, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        urls = [server.url(path) for path in feeds]
+        # Feeds problemáticos: no deben hacer fallar al resto
+        urls += [server.url("/slow/feed/0.xml"), server.url("/broken.xml"), server.url("/no-existe.xml")]
+
+        sequential = FeedFetcher(cache_dir="", workers=1, timeout=args.timeout)
+        start = time.perf_counter()
+        results = [sequential.fetch(url) for url in urls]
+        summarize("secuencial sin caché", results, time.perf_counter() - start)
+
+        fetcher = FeedFetcher(cache_dir=cache_dir, workers=args.workers, per_host=args.per_host,
+                              timeout=args.timeout)
+        start = time.perf_counter()
+        results = fetcher.fetch_many(urls)
+        summarize("concurrente (caché fría)", results, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        results = fetcher.fetch_many(urls)
+        summarize("concurrente (304)", results, time.perf_counter() - start)
+
+        print("\nErrores reportados por feed:")
+        for result in results:
+            if not result.ok:
+                print(f"  {result.url}: {result.error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark de la normalización del texto de las entradas RSS
+
+Compara, sobre un corpus de feeds de prueba (texto plano y HTML de CMS),
+los tokens del prompt de análisis pasando los resúmenes tal cual frente
+al texto normalizado (sin HTML, sin relleno y recortado a
+RSS_ENTRY_MAX_TOKENS), y el tiempo de normalizar cada entrada.
+Además comprueba que el filtro de relleno no borre líneas reales que
+empiezan como relleno ("Más información sobre...", "Imagen: ...").
+
+Uso:
+    python -m benchmarks.feed_normalize --feeds 10 --entries 50 --max-tokens 150
+"""
+import argparse
+import time
+
+from benchmarks.feeds import build_atom, build_rss
+from services.feed_parser import parse_bytes
+from services.rss_service import RSSService
+from services.text_normalizer import html_to_text
+from services.token_utils import estimate_tokens
+
+
+# Texto de noticias que se parece al relleno: debe conservarse
+REAL_LINES = [
+    "Más información sobre el terremoto: 40 muertos en Chile",
+    "Ver más allá de la crisis…",
+    "Imagen: el satélite captó la erupción…",
+    "Share on X: a new app…",
+    "Read more books, says the minister",
+    "Subscribers fled the platform after the price rise",
+    "Foto: El satélite captó la erupción del volcán anoche.",
+]
+
+# Relleno real de CMS y agregadores: debe eliminarse
+FILLER_LINES = [
+    "Leer más »",
+    "Seguir leyendo…",
+    "Más información:",
+    "Compartir en Facebook Compartir en Twitter",
+    "Foto: Agencia de prueba",
+    "Photo: Getty Images / Reuters",
+    "Subscribe to our newsletter",
+    "The post Noticia 1 appeared first on Example.",
+    "[…]",
+]
+
+
+def check_filler_filter() -> None:
+    """
+    Muestra las líneas reales borradas y el relleno que se escapó
+    """
+    lost = [line for line in REAL_LINES if not html_to_text(f"<p>{line}</p>")]
+    kept = [line for line in FILLER_LINES if html_to_text(f"<p>{line}</p>")]
+    print(f"\nLíneas reales conservadas: {len(REAL_LINES) - len(lost)}/{len(REAL_LINES)}")
+    for line in lost:
+        print(f"  borrada por error: {line}")
+    print(f"Relleno eliminado: {len(FILLER_LINES) - len(kept)}/{len(FILLER_LINES)}")
+    for line in kept:
+        print(f"  se escapó: {line}")
+
+
+def raw_prompt_text(title: str, entries) -> str:
+    """
+    Texto del análisis con los resúmenes sin normalizar (camino anterior)
+    """
+    text = f"Fuente: {title or 'RSS'}\n\n"
+    for entry in entries:
+        text += f"Título: {entry.title}\nResumen: {entry.summary}\n\n"
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de normalización de entradas RSS")
+    parser.add_argument("--feeds", type=int, default=10, help="Feeds de cada tipo en el corpus")
+    parser.add_argument("--entries", type=int, default=50, help="Entradas por feed")
+    parser.add_argument("--max-tokens", type=int, default=150, help="Presupuesto de tokens por entrada")
+    args = parser.parse_args()
+
+    corpus = {
+        "rss texto": [build_rss(args.entries, seed=seed) for seed in range(args.feeds)],
+        "rss html": [build_rss(args.entries, seed=seed, html=True) for seed in range(args.feeds)],
+        "atom texto": [build_atom(args.entries, seed=seed) for seed in range(args.feeds)],
+    }
+
+    print(f"{'corpus':<12} {'entradas':>9} {'tokens antes':>13} {'tokens después':>15} {'reducción':>10} {'µs/entrada':>11}")
+    for name, feeds in corpus.items():
+        entries = before = after = 0
+        seconds = 0.0
+        for data in feeds:
+            title, parsed = parse_bytes(data)
+            before += estimate_tokens(raw_prompt_text(title, parsed))
+
+            start = time.perf_counter()
+            text = f"Fuente: {title or 'RSS'}\n\n" + "".join(
+                RSSService.format_entry(entry, max_tokens=args.max_tokens) for entry in parsed
+            )
+            seconds += time.perf_counter() - start
+
+            after += estimate_tokens(text)
+            entries += len(parsed)
+
+        reduction = 1 - after / before if before else 0.0
+        print(f"{name:<12} {entries:>9} {before:>13} {after:>15} {reduction:>9.0%} {seconds / entries * 1e6:>11.1f}")
+
+    check_filler_filter()
+
+
+if __name__ == "__main__":
+    main()
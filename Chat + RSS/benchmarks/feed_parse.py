@@ -0,0 +1,75 @@
+"""
+Benchmark del parser incremental de feeds frente a feedparser
+
+Genera feeds RSS y Atom de varios MB (con `content:encoded` grandes) y
+mide tiempo y pico de memoria (tracemalloc) de:
+    - feedparser.parse del documento completo (camino anterior)
+    - parser incremental leyendo sólo las primeras N entradas
+    - parser incremental leyendo el documento completo
+
+Uso:
+    python -m benchmarks.feed_parse --entries 200 --content-kb 20 --first 5
+"""
+import argparse
+import io
+import time
+import tracemalloc
+
+from benchmarks.feeds import build_atom, build_rss
+from services.feed_parser import parse_stream, parse_with_feedparser
+
+
+def measure(func, repeat: int) -> tuple:
+    """
+    Mejor tiempo (s) y pico de memoria (MB) de `func`
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1_048_576, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de parseo de feeds")
+    parser.add_argument("--entries", type=int, default=200, help="Entradas por feed")
+    parser.add_argument("--content-kb", type=int, default=20, help="Tamaño del content:encoded de cada entrada")
+    parser.add_argument("--first", type=int, default=5, help="Entradas que usa la app (early exit)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    feeds = {
+        "rss": build_rss(args.entries, content_bytes=args.content_kb * 1024),
+        "atom": build_atom(args.entries, content_bytes=args.content_kb * 1024)
+    }
+
+    print(f"{'feed':<6} {'método':<32} {'tiempo (ms)':>12} {'pico (MB)':>10} {'entradas':>9} {'leído (MB)':>11}")
+    for name, data in feeds.items():
+        size_mb = len(data) / 1_048_576
+        cases = [
+            ("feedparser (documento completo)",
+             lambda: parse_with_feedparser(data)[1][:args.first], size_mb),
+            (f"incremental (primeras {args.first})",
+             lambda: parse_stream(io.BytesIO(data), max_entries=args.first), None),
+            ("incremental (documento completo)",
+             lambda: parse_stream(io.BytesIO(data)), None),
+        ]
+        for label, func, read_mb in cases:
+            seconds, peak_mb, result = measure(func, args.repeat)
+            if read_mb is None:
+                read_mb = result[2] / 1_048_576
+                count = len(result[1])
+            else:
+                count = len(result)
+            print(f"{name:<6} {label:<32} {seconds * 1000:>12.1f} {peak_mb:>10.1f} {count:>9} {read_mb:>11.2f}")
+        print(f"{'':<6} (tamaño del feed: {size_mb:.2f} MB)")
+
+
+if __name__ == "__main__":
+    main()
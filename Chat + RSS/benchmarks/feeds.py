@@ -0,0 +1,277 @@
+"""
+Feeds de prueba y servidor HTTP local para los benchmarks de RSS
+
+Los feeds se generan de forma determinista (semilla fija) y el servidor
+se comporta como uno real: envía ETag y Last-Modified, responde 304 a
+peticiones condicionales y puede simular feeds lentos, rotos o ausentes.
+
+    with FixtureFeedServer({"/a.xml": build_rss(20)}) as server:
+        url = server.url("/a.xml")
+"""
+import hashlib
+import threading
+import time
+from email.utils import formatdate
+from typing import Dict, Optional
+from xml.sax.saxutils import escape
+
+from benchmarks.corpus import generate_text
+
+
+def html_summary(text: str, index: int, seed: int = 42) -> str:
+    """
+    Envuelve un resumen en el HTML que suelen publicar los CMS
+
+    Incluye estilos en línea, imagen con pie de foto, píxel de seguimiento,
+    botones para compartir y el pie "The post ... appeared first on ...".
+    """
+    url = f"https://example.com/{seed}/noticia-{index}"
+    return (
+        f'<div class="entry" style="font-family:Georgia,serif;font-size:16px;line-height:1.6;color:#333">'
+        f'<figure><img src="https://cdn.example.com/img/{seed}-{index}.jpg" width="640" height="360" '
+        f'alt="" style="max-width:100%;height:auto"/><figcaption>Foto: Agencia de prueba</figcaption></figure>'
+        f'<p style="margin:0 0 1em 0"><strong>{text[:60]}</strong>{text[60:]}</p>'
+        f'<p>Seguir leyendo <a href="{url}?utm_source=rss&amp;utm_medium=feed">&raquo;</a></p>'
+        f'<div class="share"><a href="https://facebook.com/sharer?u={url}">Compartir en Facebook</a> '
+        f'<a href="https://twitter.com/intent/tweet?url={url}">Compartir en Twitter</a></div>'
+        f'<script type="text/javascript">window.analytics && analytics.track("rss_{index}");</script>'
+        f'<img src="https://pixel.example.com/t.gif?id={seed}-{index}" width="1" height="1" '
+        f'style="display:none" alt=""/>'
+        f'<p>The post <a href="{url}">Noticia {index}</a> appeared first on <a href="https://example.com">Example</a>.</p>'
+        f'</div>'
+    )
+
+
+def build_article(index: int, paragraphs: int = 8, seed: int = 42) -> bytes:
+    """
+    Genera la página HTML de una noticia, con el ruido habitual alrededor
+
+    Incluye cabecera con menú, barra lateral, botones para compartir,
+    enlaces a otras notas y pie de página, además del cuerpo del artículo.
+    """
+    body = "".join(
+        f"<p>{escape(generate_text(400, seed=seed + 20_000 + index * 100 + i))}</p>"
+        for i in range(paragraphs)
+    )
+    links = "".join(f'<li><a href="/otra-{i}">Otra noticia {i} que quizás te interese</a></li>' for i in range(10))
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Noticia</title>"
+        "<style>body{font-family:sans-serif}</style><script>var analytics={};</script></head><body>"
+        '<header class="site-header"><nav><ul><li><a href="/">Inicio</a></li><li><a href="/politica">Política</a></li>'
+        '<li><a href="/economia">Economía</a></li></ul></nav></header>'
+        f'<div class="layout"><main><article class="post"><h1>Noticia {index}</h1>'
+        f'<div class="entry-content">{body}</div>'
+        '<div class="share-buttons"><p>Compartir esta noticia en Facebook, Twitter y WhatsApp</p></div>'
+        f'<section class="related"><h2>Relacionadas</h2><ul>{links}</ul></section></article></main>'
+        f'<aside class="sidebar"><h2>Lo más leído</h2><ul>{links}</ul></aside></div>'
+        "<footer><p>© Diario de prueba. Todos los derechos reservados. Aviso legal, privacidad y cookies.</p></footer>"
+        "</body></html>"
+    ).encode("utf-8")
+
+
+def build_rss(
+    entries: int,
+    content_bytes: int = 0,
+    seed: int = 42,
+    title: str = "Feed de prueba",
+    html: bool = False,
+    link_base: str = "https://example.com"
+) -> bytes:
+    """
+    Genera un feed RSS 2.0
+
+    Args:
+        entries: Número de items
+        content_bytes: Tamaño aproximado del `content:encoded` de cada item (0 = sin él)
+        seed: Semilla del texto
+        title: Título del canal
+        html: Si la descripción viene con el HTML típico de un CMS (ver `html_summary`)
+        link_base: Sitio al que apuntan los enlaces (por ejemplo, un FixtureFeedServer)
+
+    Returns:
+        XML en UTF-8
+    """
+    items = []
+    for i in range(entries):
+        summary = generate_text(300, seed=seed + i)
+        description = html_summary(summary, i, seed) if html else summary
+        content = ""
+        if content_bytes:
+            body = escape(generate_text(content_bytes, seed=seed + 10_000 + i))
+            content = f"<content:encoded><![CDATA[<p>{body}</p>]]></content:encoded>"
+        items.append(
+            f"<item><title>Noticia {i} {escape(summary[:40])}</title>"
+            f"<link>{link_base}/{seed}/noticia-{i}</link>"
+            f"<guid>https://example.com/{seed}/noticia-{i}</guid>"
+            f"<pubDate>{formatdate(1_700_000_000 - i * 3600, usegmt=True)}</pubDate>"
+            f"<description>{escape(description)}</description>{content}</item>"
+        )
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">'
+        f"<channel><title>{escape(title)}</title><link>https://example.com/</link>"
+        f"<description>Feed sintético</description>{''.join(items)}</channel></rss>"
+    ).encode("utf-8")
+
+
+def build_atom(entries: int, content_bytes: int = 0, seed: int = 42, title: str = "Feed Atom de prueba") -> bytes:
+    """
+    Genera un feed Atom 1.0 con la misma forma que `build_rss`
+    """
+    items = []
+    for i in range(entries):
+        summary = generate_text(300, seed=seed + i)
+        content = ""
+        if content_bytes:
+            body = escape(generate_text(content_bytes, seed=seed + 10_000 + i))
+            content = f'<content type="html">&lt;p&gt;{body}&lt;/p&gt;</content>'
+        items.append(
+            f"<entry><title>Noticia {i} {escape(summary[:40])}</title>"
+            f'<link href="https://example.com/{seed}/noticia-{i}"/>'
+            f"<id>urn:example:{seed}:{i}</id>"
+            f"<updated>2023-11-14T{i % 24:02d}:00:00Z</updated>"
+            f"<summary>{escape(summary)}</summary>{content}</entry>"
+        )
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom">'
+        f"<title>{escape(title)}</title><id>urn:example:{seed}</id>"
+        f"<updated>2023-11-14T00:00:00Z</updated>{''.join(items)}</feed>"
+    ).encode("utf-8")
+
+
+class FixtureFeedServer:
+    """
+    Servidor HTTP local que sirve feeds de prueba (y páginas HTML, por
+    ejemplo las de `build_article`)
+
+    Rutas especiales además de las registradas:
+        /slow/<ruta>  espera `slow_seconds` antes de responder <ruta>
+        /trickle/<ruta> responde <ruta> en 8 partes repartidas en `slow_seconds`
+        /broken.xml   devuelve contenido que no es XML
+        cualquier otra ruta desconocida responde 404
+    """
+
+    def __init__(self, feeds: Dict[str, bytes], slow_seconds: float = 2.0):
+        """
+        Args:
+            feeds: Diccionario {ruta: contenido}
+            slow_seconds: Demora de las rutas /slow/...
+        """
+        self.feeds = dict(feeds)
+        self.slow_seconds = slow_seconds
+        self.requests = 0
+        self.not_modified = 0
+        self.active = 0
+        self.max_active = 0  # Máximo de peticiones atendidas a la vez
+        self._server = None
+        self._lock = threading.Lock()
+
+    def url(self, path: str) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def set_feed(self, path: str, content: bytes) -> None:
+        """
+        Cambia el contenido de un feed (su ETag cambia con él)
+        """
+        with self._lock:
+            self.feeds[path] = content
+
+    def __enter__(self) -> "FixtureFeedServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        fixture = self
+
+        class FeedHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with fixture._lock:
+                    fixture.requests += 1
+                    fixture.active += 1
+                    fixture.max_active = max(fixture.max_active, fixture.active)
+                try:
+                    self._handle()
+                finally:
+                    with fixture._lock:
+                        fixture.active -= 1
+
+            def _handle(self):
+                path = self.path
+                self.trickle = path.startswith("/trickle/")
+                if self.trickle:
+                    path = path[len("/trickle"):]
+                if path.startswith("/slow/"):
+                    time.sleep(fixture.slow_seconds)
+                    path = path[len("/slow"):]
+
+                if path == "/broken.xml":
+                    # Se anuncia como RSS aunque el contenido no lo sea
+                    self._send(200, b"<html><body>esto no es un feed", {
+                        "Content-Type": "application/rss+xml; charset=utf-8"
+                    })
+                    return
+
+                content: Optional[bytes] = fixture.feeds.get(path)
+                if content is None:
+                    self.send_error(404)
+                    return
+
+                etag = '"' + hashlib.sha256(content).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    with fixture._lock:
+                        fixture.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self._send(200, content, {
+                    "ETag": etag,
+                    "Last-Modified": formatdate(1_700_000_000, usegmt=True)
+                })
+
+            def _send(self, status: int, body: bytes, headers: dict):
+                self.send_response(status)
+                if "Content-Type" not in headers:
+                    is_page = body.lstrip()[:15].lower().startswith((b"<!doctype html", b"<html"))
+                    content_type = "text/html" if is_page else "application/rss+xml"
+                    self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                try:
+                    if not getattr(self, "trickle", False):
+                        self.wfile.write(body)
+                        return
+                    # Servidor lento pero vivo: ninguna lectura agota el timeout del socket
+                    step = max(1, -(-len(body) // 8))
+                    for start in range(0, len(body), step):
+                        self.wfile.write(body[start:start + step])
+                        self.wfile.flush()
+                        time.sleep(fixture.slow_seconds / 8)
+                except (BrokenPipeError, ConnectionResetError):
+                    # El cliente se rindió (timeout): es parte de la prueba
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), FeedHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fixture-feeds", daemon=True).start()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
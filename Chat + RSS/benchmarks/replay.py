@@ -0,0 +1,200 @@
+"""
+Reproduce tráfico grabado con N usuarios virtuales concurrentes
+
+Lee un archivo grabado con TRAFFIC_CAPTURE_FILE, agrupa los eventos por
+sesión y los reproduce contra los servicios reales (embeddings, ChromaDB,
+prompt) con un LLM simulado de latencia configurable. Como la grabación
+sólo guarda el hash del documento, todas las preguntas se hacen sobre el
+documento indicado con --document (o sobre un corpus sintético).
+
+Uso:
+    python -m benchmarks.replay trafico.jsonl --users 1 4 16 64 --llm-latency-ms 800
+    python -m benchmarks.replay trafico.jsonl --document manual.pdf --think-scale 0.1 --output carga.json
+"""
+import argparse
+import io
+import json
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.corpus import generate_text
+from services.metrics_service import percentile
+from services.traffic_recorder import load_trace
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def group_sessions(events: List[dict]) -> List[List[dict]]:
+    """
+    Agrupa los eventos por sesión, ordenados en el tiempo
+    """
+    sessions: Dict[str, List[dict]] = defaultdict(list)
+    for event in sorted(events, key=lambda e: e["timestamp"]):
+        sessions[event["session"]].append(event)
+    return list(sessions.values())
+
+
+def peak_memory_mb() -> float:
+    if resource is None:
+        return 0.0
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class VirtualUser:
+    """
+    Usuario virtual: reproduce una sesión grabada manteniendo su propio historial
+    """
+
+    def __init__(self, services: dict, think_scale: float):
+        from services.conversation_service import ConversationService
+
+        self.services = services
+        self.think_scale = think_scale
+        self.conversation = ConversationService(persist=False)  # Sin escribir en la base real
+
+    def run(self, session: List[dict], latencies: List[float], errors: List[str]) -> None:
+        previous = None
+        for event in session:
+            if previous is not None and self.think_scale > 0:
+                time.sleep(max(0.0, event["timestamp"] - previous) * self.think_scale)
+            previous = event["timestamp"]
+
+            start = time.perf_counter()
+            try:
+                if event["type"] == "question":
+                    self._question(event)
+                elif event["type"] == "rss":
+                    self._rss(event)
+            except Exception as e:
+                errors.append(str(e))
+            latencies.append(time.perf_counter() - start)
+
+    def _question(self, event: dict) -> None:
+        retrieval_result = self.services["database"].retrieve_context(event["question"])
+        history = self.conversation.get_history()
+        answer = self.services["ai"].generate_response(
+            retrieval_result.get_context_text(), event["question"], history
+        )
+        self.conversation.add_user_message(event["question"])
+        self.conversation.add_assistant_message(answer)
+
+    def _rss(self, event: dict) -> None:
+        # Feed sintético del mismo tamaño que el analizado en la grabación
+        self.services["ai"].generate_rss_analysis(generate_text(event.get("text_chars", 2000)))
+
+
+def run_level(sessions: List[List[dict]], users: int, services: dict, think_scale: float) -> dict:
+    """
+    Reproduce todas las sesiones con `users` usuarios virtuales concurrentes
+    """
+    latencies: List[float] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+    queue = list(sessions)
+
+    def worker() -> None:
+        while True:
+            with lock:
+                if not queue:
+                    return
+                session = queue.pop()
+            # Un usuario nuevo por sesión: el historial de una sesión no pasa a la siguiente
+            VirtualUser(services, think_scale).run(session, latencies, errors)
+
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        for _ in range(users):
+            executor.submit(worker)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    latencies.sort()
+    return {
+        "users": users,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "cpu_utilization": round(cpu / elapsed, 2) if elapsed else 0.0,
+        "peak_memory_mb": round(peak_memory_mb(), 1),
+        "threads": threading.active_count()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduce tráfico grabado con usuarios virtuales")
+    parser.add_argument("trace", help="Archivo JSONL grabado con TRAFFIC_CAPTURE_FILE")
+    parser.add_argument("--document", help="Documento sobre el que se hacen las preguntas")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 4, 16], help="Niveles de concurrencia")
+    parser.add_argument("--llm-latency-ms", type=float, default=500.0, help="Latencia del LLM simulado")
+    parser.add_argument("--think-scale", type=float, default=0.0,
+                        help="Factor sobre las pausas grabadas entre eventos (0 = sin pausas)")
+    parser.add_argument("--repeat", type=int, default=1, help="Veces que se reproduce la grabación por nivel")
+    parser.add_argument("--output", help="Archivo JSON con los resultados")
+    args = parser.parse_args()
+
+    from services.ai_service import AIService
+    from services.database_service import DatabaseService
+    from services.document_service import DocumentService
+    from services.embedding_service import EmbeddingService
+    from services.llm_backends import StubLLM
+
+    sessions = group_sessions(load_trace(args.trace)) * args.repeat
+    print(f"{sum(len(s) for s in sessions)} eventos en {len(sessions)} sesiones")
+
+    embedding_service = EmbeddingService()
+    database_service = DatabaseService(embedding_service, collection_name="replay")
+
+    if args.document:
+        path = Path(args.document)
+        document = DocumentService().process_file(io.BytesIO(path.read_bytes()), path.name)
+    else:
+        text = generate_text(500 * 1024).encode("utf-8")
+        document = DocumentService().process_file(io.BytesIO(text), "corpus_sintetico.txt")
+    database_service.create_collection(document)
+
+    services = {
+        "database": database_service,
+        # Sin límites de cuota: se mide la app, no el token bucket pensado para Gemini.
+        # Sin deduplicación: con --repeat las mismas preguntas llegan a la vez y cada
+        # una debe costar una llamada, como en el tráfico grabado
+        "ai": AIService(
+            model=StubLLM(latency_ms=args.llm_latency_ms),
+            rate_limited=False,
+            deduplicate=False,
+            max_concurrency=max(args.users)
+        )
+    }
+
+    results = []
+    print(f"\n{'usuarios':>8} {'peticiones':>10} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'CPU':>6} {'RSS MB':>8} {'errores':>8}")
+    for users in args.users:
+        result = run_level(sessions, users, services, args.think_scale)
+        results.append(result)
+        print(f"{users:>8} {result['requests']:>10} {result['throughput_rps']:>8.2f} "
+              f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} "
+              f"{result['cpu_utilization']:>6.2f} {result['peak_memory_mb']:>8.1f} {result['errors']:>8}")
+
+    embedding_service.close()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"llm_latency_ms": args.llm_latency_ms, "levels": results}, f, indent=2)
+        print(f"\nResultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Suite de benchmarks reproducible de ingesta y recuperación
+
+Mide, para varios tamaños de corpus sintético:
+    - extracción (MB/s) por formato: txt, pdf, docx, xlsx
+    - troceado (MB/s)
+    - embeddings/s
+    - tiempo de construcción del índice
+    - latencia de consulta p50/p95/p99 (embedding + búsqueda)
+    - latencia de respuesta completa con un LLM simulado (sin red)
+
+Uso:
+    python -m benchmarks.suite --sizes-kb 100 1000 --output resultados.json
+    python -m benchmarks.suite --sizes-kb 100 1000 --compare resultados.json --tolerance 0.15
+"""
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+from typing import Dict
+
+from benchmarks.corpus import FORMATS, build_file, generate_questions, generate_text
+from config.settings import settings
+from services.metrics_service import percentile
+
+
+# Métricas donde un valor más bajo es mejor (el resto: más alto es mejor)
+LOWER_IS_BETTER = ("_seconds", "_ms")
+
+
+def _timed(func, *args, repeat: int = 1):
+    """
+    Ejecuta una función `repeat` veces y devuelve (resultado, mejor tiempo)
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run_size(size_kb: int, formats, queries: int, services: dict) -> Dict[str, float]:
+    """
+    Ejecuta todas las mediciones para un tamaño de corpus
+
+    Returns:
+        Diccionario plano {métrica: valor}
+    """
+    from services.database_service import DatabaseService
+    from services.extractor_service import ExtractorService
+
+    metrics = {}
+    text = generate_text(size_kb * 1024)
+    text_mb = len(text.encode("utf-8")) / 1_048_576
+
+    # Extracción por formato
+    for file_format in formats:
+        data = build_file(file_format, text)
+        _, seconds = _timed(
+            lambda: ExtractorService.extract_text(io.BytesIO(data), file_format), repeat=3
+        )
+        metrics[f"extraction_{file_format}_mb_s"] = len(data) / 1_048_576 / seconds
+
+    # Troceado
+    chunks, seconds = _timed(services["document"].chunk_text, text, repeat=5)
+    metrics["chunking_mb_s"] = text_mb / seconds
+    metrics["chunks"] = len(chunks)
+
+    # Embeddings
+    texts = [chunk.content for chunk in chunks]
+    embeddings, seconds = _timed(services["embedding"].encode_array, texts)
+    metrics["embeddings_per_s"] = len(texts) / seconds
+
+    # Construcción del índice (con los embeddings ya calculados)
+    database_service = DatabaseService(services["embedding"], collection_name=f"bench_{size_kb}kb")
+    database_service.reset_collection()
+    chunk_ids = [chunk.id for chunk in chunks]
+    metadatas = [{"chunk_index": i} for i in range(len(chunks))]
+    _, seconds = _timed(database_service.add_chunks, texts, chunk_ids, embeddings.tolist(), metadatas)
+    metrics["index_build_seconds"] = seconds
+
+    # Latencia de consulta
+    questions = generate_questions(queries)
+    latencies = []
+    for question in questions:
+        _, seconds = _timed(database_service.retrieve_context, question)
+        latencies.append(seconds)
+    latencies.sort()
+    for p in (50, 95, 99):
+        metrics[f"query_p{p}_ms"] = percentile(latencies, p) * 1000
+
+    # Respuesta completa con LLM simulado
+    latencies = []
+    for question in questions[:max(1, queries // 5)]:
+        start = time.perf_counter()
+        retrieval_result = database_service.retrieve_context(question)
+        services["ai"].generate_response(retrieval_result.get_context_text(), question, [])
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    metrics["answer_p50_ms"] = percentile(latencies, 50) * 1000
+
+    return metrics
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> int:
+    """
+    Compara los resultados con una línea base guardada
+
+    Returns:
+        Número de métricas que empeoraron más que `tolerance`
+    """
+    regressions = 0
+    print(f"\n{'métrica':<40} {'base':>12} {'actual':>12} {'cambio':>9}")
+
+    for size, metrics in results["results"].items():
+        base_metrics = baseline.get("results", {}).get(size, {})
+        for name, value in metrics.items():
+            if name not in base_metrics or name == "chunks":
+                continue
+            base = base_metrics[name]
+            change = (value - base) / base if base else 0.0
+            worse = change > tolerance if name.endswith(LOWER_IS_BETTER) else change < -tolerance
+            regressions += worse
+            flag = "  REGRESIÓN" if worse else ""
+            print(f"{size + '.' + name:<40} {base:>12.2f} {value:>12.2f} {change:>+8.1%}{flag}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de ingesta y recuperación")
+    parser.add_argument("--sizes-kb", type=int, nargs="+", default=[100, 1000],
+                        help="Tamaños de corpus en KB")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--queries", type=int, default=100, help="Consultas por tamaño")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--compare", help="Archivo JSON de línea base para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Empeoramiento relativo permitido antes de marcar regresión")
+    args = parser.parse_args()
+
+    from services.ai_service import AIService
+    from services.document_service import DocumentService
+    from services.embedding_service import EmbeddingService
+    from services.llm_backends import StubLLM
+
+    services = {
+        "document": DocumentService(),
+        "embedding": EmbeddingService(),
+        "ai": AIService(model=StubLLM(), rate_limited=False)
+    }
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "embedding_model": settings.EMBEDDING_MODEL_NAME,
+            "chunk_size": settings.CHUNK_SIZE,
+            "chunk_overlap": settings.CHUNK_OVERLAP,
+            "top_k": settings.RETRIEVAL_TOP_K
+        },
+        "results": {}
+    }
+
+    for size_kb in args.sizes_kb:
+        print(f"\n=== Corpus de {size_kb} KB ===")
+        metrics = run_size(size_kb, args.formats, args.queries, services)
+        results["results"][f"{size_kb}kb"] = metrics
+        for name, value in metrics.items():
+            print(f"  {name:<28} {value:>12.2f}")
+
+    services["embedding"].close()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados guardados en {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        print(f"\n{regressions} regresiones (tolerancia {args.tolerance:.0%})")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Arma paquetes de índice portables para documentos grandes
+
+Extrae, trocea y vectoriza cada archivo una sola vez y guarda el resultado
+como paquete (ver services/index_bundle.py) en una carpeta por hash del
+archivo. Copiando esa carpeta a INDEX_BUNDLE_DIR de cada instancia, la app
+carga el índice al subir el mismo archivo sin recalcular nada.
+
+Uso:
+    python build_index_bundle.py manual.pdf informe.docx --out index_bundles
+    python build_index_bundle.py --inspect index_bundles/<hash> --query "garantía"
+"""
+import argparse
+import io
+import os
+import time
+
+from config.settings import settings
+from services.document_service import DocumentService
+from services.embedding_service import EmbeddingService
+from services.index_bundle import IndexBundle
+
+
+def build(path: str, out_dir: str, document_service: DocumentService, embedding_service: EmbeddingService) -> str:
+    """
+    Arma el paquete de un archivo
+
+    Returns:
+        Carpeta del paquete
+    """
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        document = document_service.process_file(io.BytesIO(f.read()), os.path.basename(path))
+
+    embeddings = embedding_service.encode_array([chunk.content for chunk in document.chunks])
+    bundle_path = os.path.join(out_dir, document.file_hash)
+    manifest = IndexBundle.write(bundle_path, document, embeddings)
+
+    print(f"{document.file_name}: {manifest.chunk_count} chunks, dimensión {manifest.dimension}, "
+          f"{time.perf_counter() - start:.1f}s -> {bundle_path}")
+    return bundle_path
+
+
+def inspect(path: str, query: str, embedding_service_factory) -> None:
+    start = time.perf_counter()
+    bundle = IndexBundle.open(path)
+    opened = time.perf_counter() - start
+
+    print(bundle.manifest)
+    print(f"Abierto en {opened * 1000:.2f} ms")
+
+    if query:
+        result = bundle.search(embedding_service_factory().encode_text(query))
+        for chunk_id, chunk, distance in zip(result.chunk_ids, result.chunks, result.distances):
+            print(f"[{distance:.3f}] {chunk_id}: {chunk[:120]!r}")
+    bundle.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arma o inspecciona paquetes de índice")
+    parser.add_argument("files", nargs="*", help="Archivos a indexar (pdf, docx, xlsx, txt)")
+    parser.add_argument("--out", default=settings.INDEX_BUNDLE_DIR, help="Carpeta de salida")
+    parser.add_argument("--inspect", help="Paquete a abrir y describir")
+    parser.add_argument("--query", help="Pregunta de prueba al inspeccionar")
+    args = parser.parse_args()
+
+    if args.inspect:
+        inspect(args.inspect, args.query, EmbeddingService)
+        return
+
+    if not args.files:
+        parser.error("Indica al menos un archivo o --inspect")
+
+    os.makedirs(args.out, exist_ok=True)
+    document_service = DocumentService()
+    embedding_service = EmbeddingService()
+    for path in args.files:
+        build(path, args.out, document_service, embedding_service)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
+import json
 import os
+from typing import Optional
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
@@ -16,6 +18,29 @@ class Settings:
     EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
     GEMINI_MODEL_NAME = "gemini-2.5-flash"
     
+    # Cliente del LLM (límites de cuota, reintentos y timeouts)
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", 60))
+    LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", 250000))  # Tokens de prompt estimados
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 4))
+    LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))
+    LLM_RETRY_BASE_DELAY = 1.0  # Segundos; se duplica en cada reintento (con jitter)
+    LLM_RETRY_MAX_DELAY = 30.0
+    LLM_PROMPT_PRICE_PER_MTOK = float(os.getenv("LLM_PROMPT_PRICE_PER_MTOK", 0.30))  # USD por millón de tokens
+    LLM_COMPLETION_PRICE_PER_MTOK = float(os.getenv("LLM_COMPLETION_PRICE_PER_MTOK", 2.50))
+    
+    # Motor de embeddings
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+    EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", 1))  # >1 = pool de procesos
+    EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", 0))  # Hilos intra-op por proceso (0 = por defecto)
+    EMBEDDING_POOL_MIN_TEXTS = 1000  # Mínimo de textos para usar el pool de procesos
+    EMBEDDING_BACKGROUND_LOAD = os.getenv("EMBEDDING_BACKGROUND_LOAD", "1") == "1"  # Cargar y calentar el modelo en segundo plano
+    
+    # Agrupación de consultas concurrentes (micro-batching)
+    EMBEDDING_COALESCE = os.getenv("EMBEDDING_COALESCE", "1") == "1"
+    EMBEDDING_COALESCE_MAX_BATCH = 32  # Máximo de consultas por lote
+    EMBEDDING_COALESCE_MAX_WAIT_MS = 5.0  # Espera máxima para completar un lote
+    
     # Configuración de chunks
     CHUNK_SIZE = 500
     CHUNK_OVERLAP = 100
@@ -23,8 +48,102 @@ class Settings:
     # Configuración de búsqueda
     RETRIEVAL_TOP_K = 4  # Número de fragmentos a recuperar
     
+    # Perfiles de chunking/búsqueda por tipo de documento (generados con evaluation/harness.py)
+    RETRIEVAL_PROFILES_FILE = os.getenv(
+        "RETRIEVAL_PROFILES_FILE",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "retrieval_profiles.json")
+    )
+    _retrieval_profiles = None
+    
     # ChromaDB
     COLLECTION_NAME = "pdf_rag"
+    CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR")  # None = base en memoria
+
+    # Historial de conversación
+    CONVERSATION_MAX_MESSAGES = int(os.getenv("CONVERSATION_MAX_MESSAGES", 20))  # Mensajes recientes en memoria
+    CONVERSATION_PERSIST = os.getenv("CONVERSATION_PERSIST", "1") == "1"  # Guardar todo el historial en SQLite
+    CONVERSATION_DB_PATH = os.getenv("CONVERSATION_DB_PATH", "conversations.db")
+    CONVERSATION_MEMORY_ENABLED = os.getenv("CONVERSATION_MEMORY_ENABLED", "1") == "1"  # Recuperar turnos antiguos por similitud
+    CONVERSATION_PROMPT_MESSAGES = 6  # Mensajes recientes que van completos al prompt cuando hay memoria
+    CONVERSATION_MEMORY_TOP_K = 3  # Turnos antiguos recuperados por pregunta
+    CONVERSATION_MEMORY_MIN_SIMILARITY = 0.3
+
+    # Índices por sesión y documento
+    INDEX_MEMORY_BUDGET_MB = float(os.getenv("INDEX_MEMORY_BUDGET_MB", 512))  # Memoria total para índices en memoria
+    INDEX_SPILL_TO_DISK = os.getenv("INDEX_SPILL_TO_DISK", "1") == "1"  # False = descartar al desalojar
+    INDEX_SPILL_DIR = os.getenv("INDEX_SPILL_DIR", "index_spill")
+    INDEX_IDLE_SECONDS = int(os.getenv("INDEX_IDLE_SECONDS", 1800))  # Desalojar índices sin uso (0 = nunca)
+    INDEX_SESSION_TTL_SECONDS = int(os.getenv("INDEX_SESSION_TTL_SECONDS", 6 * 3600))  # Borrar sesiones abandonadas (0 = nunca)
+    INDEX_BUNDLE_DIR = os.getenv("INDEX_BUNDLE_DIR", "index_bundles")  # Paquetes precalculados, una carpeta por hash de archivo
+    
+    # Ingesta masiva (carpetas / ZIP)
+    SUPPORTED_EXTENSIONS = ("pdf", "docx", "xlsx", "txt")
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", os.cpu_count() or 1))
+    INGEST_EMBED_BATCH_SIZE = 256  # Chunks por lote de embeddings (entre archivos)
+
+    # Descarga de feeds RSS
+    FEED_FETCH_WORKERS = int(os.getenv("FEED_FETCH_WORKERS", 8))  # Descargas simultáneas
+    FEED_PER_HOST_LIMIT = int(os.getenv("FEED_PER_HOST_LIMIT", 2))  # Conexiones simultáneas por host
+    FEED_TIMEOUT_SECONDS = float(os.getenv("FEED_TIMEOUT_SECONDS", 10))
+    FEED_CACHE_DIR = os.getenv("FEED_CACHE_DIR", "feed_cache")  # ETag/Last-Modified y entradas parseadas
+    FEED_USER_AGENT = "ChatRSS/1.0 (+feedfetcher)"
+
+    # Actualización de feeds suscritos en segundo plano
+    FEED_POLLER_ENABLED = os.getenv("FEED_POLLER_ENABLED", "1") == "1"
+    FEED_POLLER_DB_PATH = os.getenv("FEED_POLLER_DB_PATH", "feeds.db")  # Suscripciones y análisis precalculados
+    FEED_POLLER_WORKERS = int(os.getenv("FEED_POLLER_WORKERS", 4))  # Feeds revisados en paralelo
+    FEED_POLL_INTERVAL_SECONDS = 600  # Intervalo inicial de cada feed
+    FEED_POLL_MIN_SECONDS = 120  # Intervalo de un feed que cambia en cada revisión
+    FEED_POLL_MAX_SECONDS = 3600  # Intervalo de un feed que no cambia
+    FEED_POLL_ERROR_MAX_SECONDS = 6 * 3600  # Espera máxima tras errores consecutivos
+    FEED_POLL_JITTER = 0.1  # ±10 % aleatorio para no revisar todos los feeds a la vez
+
+    # Resumen jerárquico (map-reduce) de feeds grandes
+    RSS_MAX_ENTRIES = int(os.getenv("RSS_MAX_ENTRIES", 300))  # Entradas que se leen en el análisis completo
+    RSS_ENTRY_MAX_TOKENS = int(os.getenv("RSS_ENTRY_MAX_TOKENS", 150))  # Tokens máximos del resumen de cada entrada (sin HTML)
+    RSS_ANALYSIS_CACHE_PATH = os.getenv("RSS_ANALYSIS_CACHE_PATH", "rss_analyses.db")  # Análisis guardados por huella de las entradas
+    RSS_ANALYSIS_CACHE_TTL_SECONDS = float(os.getenv("RSS_ANALYSIS_CACHE_TTL_SECONDS", 6 * 3600))
+
+    # Enriquecimiento de entradas con el artículo completo
+    RSS_ARTICLE_WORKERS = int(os.getenv("RSS_ARTICLE_WORKERS", 8))  # Artículos descargados en paralelo
+    RSS_ARTICLE_PER_DOMAIN = int(os.getenv("RSS_ARTICLE_PER_DOMAIN", 2))  # Descargas simultáneas por sitio
+    RSS_ARTICLE_DOMAIN_DELAY_SECONDS = float(os.getenv("RSS_ARTICLE_DOMAIN_DELAY_SECONDS", 0.25))  # Pausa entre descargas a un sitio
+    RSS_ARTICLE_TIMEOUT_SECONDS = float(os.getenv("RSS_ARTICLE_TIMEOUT_SECONDS", 10))
+    RSS_ARTICLE_MAX_BYTES = 2_000_000  # Bytes leídos de cada página
+    RSS_ARTICLE_ALLOW_PRIVATE_HOSTS = os.getenv("RSS_ARTICLE_ALLOW_PRIVATE_HOSTS", "false").lower() == "true"  # Sólo para pruebas locales
+    RSS_ARTICLE_CACHE_DIR = os.getenv("RSS_ARTICLE_CACHE_DIR", "article_cache")  # Texto extraído por URL
+    RSS_ARTICLE_MAX_TOKENS = int(os.getenv("RSS_ARTICLE_MAX_TOKENS", 600))  # Tokens del artículo por entrada en el prompt
+    RSS_SUMMARY_BATCH_TOKENS = int(os.getenv("RSS_SUMMARY_BATCH_TOKENS", 3000))  # Tokens de entradas por lote
+    RSS_SUMMARY_WORKERS = int(os.getenv("RSS_SUMMARY_WORKERS", 4))  # Lotes resumidos en paralelo
+    RSS_SUMMARY_DEADLINE_SECONDS = float(os.getenv("RSS_SUMMARY_DEADLINE_SECONDS", 60))
+    RSS_SUMMARY_REDUCE_DEADLINE_SECONDS = float(os.getenv("RSS_SUMMARY_REDUCE_DEADLINE_SECONDS", 30))  # Niveles intermedios del reduce
+    RSS_SUMMARY_CACHE_SIZE = 512  # Resúmenes parciales guardados
+
+    # Análisis conjunto de varios feeds
+    RSS_ENTRIES_PER_FEED = int(os.getenv("RSS_ENTRIES_PER_FEED", 10))  # Entradas leídas de cada feed
+    STORY_CLUSTER_THRESHOLD = float(os.getenv("STORY_CLUSTER_THRESHOLD", 0.85))  # Similitud coseno para considerar la misma noticia
+
+    # Noticias guardadas (RAG sobre todos los feeds descargados)
+    NEWS_DB_PATH = os.getenv("NEWS_DB_PATH", "news.db")
+    NEWS_COLLECTION_NAME = "news"
+    NEWS_EMBED_BATCH_SIZE = 256  # Noticias por lote de embeddings
+    NEWS_TOP_K = 5  # Noticias recuperadas por pregunta
+
+    # Trazas y métricas
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+    TRACE_FILE = os.getenv("TRACE_FILE")  # Archivo JSONL de spans (None = desactivado)
+    METRICS_PORT = int(os.getenv("METRICS_PORT", 0))  # Exportador Prometheus de la app Streamlit (0 = desactivado)
+    
+    # Grabación de tráfico para pruebas de carga (opt-in)
+    TRAFFIC_CAPTURE_FILE = os.getenv("TRAFFIC_CAPTURE_FILE")  # None = desactivado
+    TRAFFIC_CAPTURE_SALT = os.getenv("TRAFFIC_CAPTURE_SALT")  # Sal fija para correlacionar varias grabaciones
+    
+    # API HTTP (api_server.py)
+    API_HOST = os.getenv("API_HOST", "127.0.0.1")
+    API_PORT = int(os.getenv("API_PORT", 8080))
+    API_CPU_WORKERS = int(os.getenv("API_CPU_WORKERS", os.cpu_count() or 1))  # Extracción y embeddings
+    API_MAX_CONCURRENT_LLM = int(os.getenv("API_MAX_CONCURRENT_LLM", 8))  # Llamadas simultáneas a Gemini
+    API_MAX_UPLOAD_MB = 50
     
     # Streamlit
     PAGE_TITLE = "Chat PDF con Gemini"
@@ -39,6 +158,55 @@ class Settings:
             raise ValueError("GOOGLE_API_KEY no está configurada en el archivo .env")
         
         return True
+    
+    @classmethod
+    def load_retrieval_profiles(cls, path: Optional[str] = None) -> dict:
+        """
+        Carga los perfiles de chunking/búsqueda desde un archivo JSON
+        
+        El archivo tiene la forma {"default": {...}, "pdf": {...}, ...} donde
+        cada perfil puede definir chunk_size, chunk_overlap y top_k.
+        
+        Args:
+            path: Ruta del archivo (usa RETRIEVAL_PROFILES_FILE por defecto)
+            
+        Returns:
+            Diccionario de perfiles (vacío si el archivo no existe)
+        """
+        path = path or cls.RETRIEVAL_PROFILES_FILE
+        
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                cls._retrieval_profiles = json.load(f)
+        else:
+            cls._retrieval_profiles = {}
+        
+        return cls._retrieval_profiles
+    
+    @classmethod
+    def get_retrieval_profile(cls, document_type: Optional[str] = None) -> dict:
+        """
+        Obtiene los parámetros de chunking y búsqueda para un tipo de documento
+        
+        Args:
+            document_type: Extensión del documento ("pdf", "docx"...) o None
+            
+        Returns:
+            Diccionario con chunk_size, chunk_overlap y top_k
+        """
+        if cls._retrieval_profiles is None:
+            cls.load_retrieval_profiles()
+        
+        profile = {
+            "chunk_size": cls.CHUNK_SIZE,
+            "chunk_overlap": cls.CHUNK_OVERLAP,
+            "top_k": cls.RETRIEVAL_TOP_K
+        }
+        profile.update(cls._retrieval_profiles.get("default", {}))
+        if document_type:
+            profile.update(cls._retrieval_profiles.get(document_type, {}))
+        
+        return profile
 
 
 # Instancia global de configuración
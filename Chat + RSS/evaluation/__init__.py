@@ -0,0 +1,6 @@
+"""
+Evaluación de calidad y latencia de la recuperación
+
+Se ejecuta desde la carpeta del proyecto, por ejemplo:
+    python -m evaluation.harness etiquetas.jsonl --strategy halving
+"""
@@ -0,0 +1,345 @@
+"""
+Evaluación de la recuperación y ajuste automático de parámetros
+
+Recibe un conjunto etiquetado en JSONL, una línea por pregunta:
+    {"document": "docs/manual.pdf", "question": "...", "relevant_text": "fragmento que responde"}
+    {"document": "docs/manual.pdf", "question": "...", "relevant_start": 1200, "relevant_end": 1350}
+
+Las rutas relativas se resuelven respecto a la carpeta del archivo JSONL.
+Un chunk recuperado es relevante si se solapa con el fragmento etiquetado.
+
+Para cada combinación de CHUNK_SIZE, CHUNK_OVERLAP y RETRIEVAL_TOP_K mide
+recall@k, MRR, tamaño del índice y latencia de consulta. Después emite las
+configuraciones Pareto-óptimas y, opcionalmente, guarda la elegida como
+perfil de un tipo de documento en config/retrieval_profiles.json.
+
+Uso:
+    python -m evaluation.harness etiquetas.jsonl --chunk-sizes 300 500 800 \\
+        --overlaps 50 100 --top-k 2 4 8 --strategy halving --output pareto.json --write-profile pdf
+"""
+import argparse
+import hashlib
+import io
+import itertools
+import json
+import math
+import os
+import random
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import settings
+from services.metrics_service import percentile
+
+
+@dataclass(frozen=True)
+class EvalConfig:
+    """
+    Combinación de parámetros a evaluar
+    """
+    chunk_size: int
+    chunk_overlap: int
+    top_k: int
+
+
+@dataclass
+class EvalResult:
+    """
+    Métricas de una configuración sobre un conjunto de preguntas
+    """
+    config: EvalConfig
+    questions: int
+    recall: float
+    mrr: float
+    index_bytes: int
+    latency_p50_ms: float
+    latency_p95_ms: float
+
+    def to_dict(self) -> dict:
+        return {**asdict(self.config), **{k: v for k, v in asdict(self).items() if k != "config"}}
+
+
+@dataclass
+class LabeledExample:
+    """
+    Pregunta etiquetada con el fragmento del documento que la responde
+    """
+    document: str
+    question: str
+    relevant_text: Optional[str] = None
+    relevant_start: Optional[int] = None
+    relevant_end: Optional[int] = None
+
+
+def load_examples(path: str) -> List[LabeledExample]:
+    """
+    Lee el conjunto etiquetado desde un archivo JSONL
+    """
+    base_dir = Path(path).resolve().parent
+    examples = []
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            document = Path(item["document"])
+            if not document.is_absolute():
+                document = base_dir / document
+            examples.append(LabeledExample(
+                document=str(document),
+                question=item["question"],
+                relevant_text=item.get("relevant_text"),
+                relevant_start=item.get("relevant_start"),
+                relevant_end=item.get("relevant_end")
+            ))
+
+    return examples
+
+
+class RetrievalEvaluator:
+    """
+    Evalúa configuraciones de chunking y búsqueda sobre un conjunto etiquetado
+
+    Los textos extraídos y los índices se reutilizan entre configuraciones:
+    sólo se re-indexa cuando cambian chunk_size o chunk_overlap.
+    """
+
+    def __init__(self, examples: List[LabeledExample], embedding_service=None, document_service=None):
+        from services.document_service import DocumentService
+        from services.embedding_service import EmbeddingService
+
+        self.examples = examples
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.document_service = document_service or DocumentService()
+
+        self._texts: Dict[str, str] = {}
+        self._indexes: Dict[Tuple[str, int, int], tuple] = {}
+
+    def _text(self, document: str) -> str:
+        if document not in self._texts:
+            extension = document.split(".")[-1].lower()
+            data = Path(document).read_bytes()
+            self._texts[document] = self.document_service.extractor.extract_text(io.BytesIO(data), extension)
+        return self._texts[document]
+
+    def _relevant_span(self, example: LabeledExample) -> Tuple[int, int]:
+        if example.relevant_start is not None and example.relevant_end is not None:
+            return example.relevant_start, example.relevant_end
+
+        text = self._text(example.document)
+        start = text.find(example.relevant_text or "")
+        if start < 0 or not example.relevant_text:
+            raise ValueError(f"Fragmento relevante no encontrado en {example.document}: {example.question}")
+        return start, start + len(example.relevant_text)
+
+    def _index(self, document: str, chunk_size: int, overlap: int) -> tuple:
+        """
+        Construye (o reutiliza) el índice de un documento con un chunking dado
+
+        Returns:
+            Tupla (DatabaseService, {chunk_id: Chunk}, tamaño del índice en bytes)
+        """
+        from services.database_service import DatabaseService
+
+        key = (document, chunk_size, overlap)
+        if key not in self._indexes:
+            chunks = self.document_service.chunk_text(self._text(document), chunk_size, overlap)
+            texts = [chunk.content for chunk in chunks]
+            embeddings = self.embedding_service.encode_array(texts)
+
+            doc_id = hashlib.sha256(document.encode("utf-8")).hexdigest()[:8]
+            database_service = DatabaseService(
+                self.embedding_service, collection_name=f"eval_{doc_id}_{chunk_size}_{overlap}"
+            )
+            database_service.reset_collection()
+            database_service.add_chunks(
+                texts,
+                [chunk.id for chunk in chunks],
+                embeddings.tolist(),
+                [{"start_index": chunk.start_index, "chunk_size": chunk.size} for chunk in chunks]
+            )
+
+            index_bytes = embeddings.nbytes + sum(len(text.encode("utf-8")) for text in texts)
+            self._indexes[key] = (database_service, {chunk.id: chunk for chunk in chunks}, index_bytes)
+
+        return self._indexes[key]
+
+    def evaluate(self, config: EvalConfig, examples: Optional[List[LabeledExample]] = None) -> EvalResult:
+        """
+        Mide recall@k, MRR, tamaño de índice y latencia de una configuración
+        """
+        examples = examples or self.examples
+        hits = 0
+        reciprocal_ranks = 0.0
+        latencies = []
+        index_bytes = {}
+
+        for example in examples:
+            database_service, chunks_by_id, size = self._index(
+                example.document, config.chunk_size, config.chunk_overlap
+            )
+            index_bytes[example.document] = size
+            relevant_start, relevant_end = self._relevant_span(example)
+
+            start = time.perf_counter()
+            retrieval_result = database_service.retrieve_context(example.question, k=config.top_k)
+            latencies.append(time.perf_counter() - start)
+
+            for rank, chunk_id in enumerate(retrieval_result.chunk_ids, start=1):
+                chunk = chunks_by_id[chunk_id]
+                if chunk.start_index < relevant_end and relevant_start < chunk.start_index + chunk.size:
+                    hits += 1
+                    reciprocal_ranks += 1.0 / rank
+                    break
+
+        latencies.sort()
+        return EvalResult(
+            config=config,
+            questions=len(examples),
+            recall=hits / len(examples) if examples else 0.0,
+            mrr=reciprocal_ranks / len(examples) if examples else 0.0,
+            index_bytes=sum(index_bytes.values()),
+            latency_p50_ms=percentile(latencies, 50) * 1000,
+            latency_p95_ms=percentile(latencies, 95) * 1000
+        )
+
+    def grid_search(self, configs: List[EvalConfig]) -> List[EvalResult]:
+        """
+        Evalúa todas las configuraciones con todas las preguntas
+        """
+        results = []
+        for config in configs:
+            result = self.evaluate(config)
+            print(f"  {config}: recall={result.recall:.3f} mrr={result.mrr:.3f}")
+            results.append(result)
+        return results
+
+    def successive_halving(
+        self,
+        configs: List[EvalConfig],
+        eta: int = 2,
+        min_questions: int = 10,
+        seed: int = 42
+    ) -> List[EvalResult]:
+        """
+        Descarta las peores configuraciones en rondas con cada vez más preguntas
+
+        En cada ronda se conserva la mejor fracción 1/eta (por recall y MRR)
+        y se multiplica por eta el número de preguntas. Las supervivientes
+        se evalúan al final con el conjunto completo.
+        """
+        examples = list(self.examples)
+        random.Random(seed).shuffle(examples)
+
+        remaining = list(configs)
+        budget = min(min_questions, len(examples))
+
+        while len(remaining) > eta and budget < len(examples):
+            print(f"  Ronda: {len(remaining)} configuraciones x {budget} preguntas")
+            scored = [self.evaluate(config, examples[:budget]) for config in remaining]
+            scored.sort(key=lambda r: (r.recall, r.mrr), reverse=True)
+            remaining = [r.config for r in scored[:max(1, math.ceil(len(scored) / eta))]]
+            budget = min(len(examples), budget * eta)
+
+        print(f"  Ronda final: {len(remaining)} configuraciones x {len(examples)} preguntas")
+        return self.grid_search(remaining)
+
+
+def pareto_front(results: List[EvalResult]) -> List[EvalResult]:
+    """
+    Filtra las configuraciones no dominadas
+
+    Objetivos: maximizar recall y MRR, minimizar tamaño de índice y latencia p95.
+    """
+    def objectives(r: EvalResult) -> tuple:
+        return (-r.recall, -r.mrr, r.index_bytes, r.latency_p95_ms)
+
+    def dominates(a: EvalResult, b: EvalResult) -> bool:
+        oa, ob = objectives(a), objectives(b)
+        return all(x <= y for x, y in zip(oa, ob)) and any(x < y for x, y in zip(oa, ob))
+
+    return [r for r in results if not any(dominates(other, r) for other in results if other is not r)]
+
+
+def select_profile(front: List[EvalResult]) -> EvalConfig:
+    """
+    Elige una configuración del frente: mejor recall, luego MRR, luego la más barata
+    """
+    best = max(front, key=lambda r: (r.recall, r.mrr, -r.index_bytes, -r.latency_p95_ms))
+    return best.config
+
+
+def write_profile(document_type: str, config: EvalConfig, path: Optional[str] = None) -> None:
+    """
+    Guarda una configuración como perfil de un tipo de documento
+    """
+    path = path or settings.RETRIEVAL_PROFILES_FILE
+    profiles = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            profiles = json.load(f)
+
+    profiles[document_type] = asdict(config)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profiles, f, indent=2)
+
+    settings.load_retrieval_profiles(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evalúa y ajusta los parámetros de recuperación")
+    parser.add_argument("labeled", help="Conjunto etiquetado en JSONL")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[300, 500, 800])
+    parser.add_argument("--overlaps", type=int, nargs="+", default=[50, 100])
+    parser.add_argument("--top-k", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--strategy", choices=["grid", "halving"], default="grid")
+    parser.add_argument("--eta", type=int, default=2, help="Factor de descarte de successive halving")
+    parser.add_argument("--output", help="Archivo JSON con todos los resultados y el frente de Pareto")
+    parser.add_argument("--write-profile", metavar="TIPO",
+                        help="Guarda la configuración elegida como perfil (pdf, docx, xlsx, txt o default)")
+    args = parser.parse_args()
+
+    examples = load_examples(args.labeled)
+    configs = [
+        EvalConfig(size, overlap, k)
+        for size, overlap, k in itertools.product(args.chunk_sizes, args.overlaps, args.top_k)
+        if overlap < size
+    ]
+    print(f"{len(examples)} preguntas, {len(configs)} configuraciones ({args.strategy})")
+
+    evaluator = RetrievalEvaluator(examples)
+    if args.strategy == "grid":
+        results = evaluator.grid_search(configs)
+    else:
+        results = evaluator.successive_halving(configs, eta=args.eta)
+
+    front = pareto_front(results)
+    front.sort(key=lambda r: (r.recall, r.mrr), reverse=True)
+
+    print("\nConfiguraciones Pareto-óptimas:")
+    print(f"{'size':>6} {'overlap':>8} {'k':>3} {'recall':>7} {'mrr':>6} {'índice KB':>10} {'p95 ms':>8}")
+    for r in front:
+        print(f"{r.config.chunk_size:>6} {r.config.chunk_overlap:>8} {r.config.top_k:>3} "
+              f"{r.recall:>7.3f} {r.mrr:>6.3f} {r.index_bytes / 1024:>10.1f} {r.latency_p95_ms:>8.2f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "results": [r.to_dict() for r in results],
+                "pareto": [r.to_dict() for r in front]
+            }, f, indent=2)
+        print(f"\nResultados guardados en {args.output}")
+
+    if args.write_profile:
+        chosen = select_profile(front)
+        write_profile(args.write_profile, chosen)
+        print(f"Perfil '{args.write_profile}' guardado: {asdict(chosen)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Ingesta masiva de una carpeta o archivo ZIP desde la línea de comandos
+
+Uso:
+    python ingest.py ruta/a/carpeta_o_archivo.zip [--workers 8] [--batch-size 256]
+"""
+import argparse
+
+from config.settings import settings
+from services.embedding_service import EmbeddingService
+from services.database_service import DatabaseService
+from services.ingestion_service import IngestionService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexa una carpeta o ZIP en ChromaDB")
+    parser.add_argument("path", help="Carpeta o archivo .zip a indexar")
+    parser.add_argument("--workers", type=int, default=settings.INGEST_WORKERS,
+                        help="Procesos de extracción")
+    parser.add_argument("--batch-size", type=int, default=settings.INGEST_EMBED_BATCH_SIZE,
+                        help="Chunks por lote de embeddings")
+    parser.add_argument("--persist-dir", default=settings.CHROMA_PERSIST_DIR,
+                        help="Carpeta donde persistir ChromaDB (por defecto en memoria)")
+    parser.add_argument("--append", action="store_true",
+                        help="Agregar a la colección existente en lugar de recrearla")
+    args = parser.parse_args()
+
+    embedding_service = EmbeddingService()
+    database_service = DatabaseService(embedding_service, persist_directory=args.persist_dir)
+    ingestion_service = IngestionService(
+        embedding_service,
+        database_service,
+        workers=args.workers,
+        batch_size=args.batch_size
+    )
+
+    report = ingestion_service.ingest(args.path, reset=not args.append)
+
+    print("\n=== Resultado de la ingesta ===")
+    print(f"Archivos procesados: {report.processed_files}/{report.total_files}")
+    if report.duplicate_files:
+        print(f"Archivos repetidos:  {report.duplicate_files} (mismo contenido, no se indexan dos veces)")
+    print(f"Chunks indexados:    {report.total_chunks}")
+    print(f"Datos leídos:        {report.total_bytes / 1_048_576:.2f} MB")
+    print(f"Tiempo total:        {report.elapsed_seconds:.2f} s")
+    print(f"Rendimiento:         {report.files_per_second:.2f} archivos/s, "
+          f"{report.chunks_per_second:.1f} chunks/s ({report.workers} workers)")
+
+    if report.failures:
+        print(f"\nFallos ({len(report.failures)}):")
+        for failure in report.failures:
+            print(f"  - {failure.file_name}: {failure.error}")
+
+
+if __name__ == "__main__":
+    main()
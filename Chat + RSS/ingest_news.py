@@ -0,0 +1,59 @@
+"""
+Ingesta incremental de noticias desde la línea de comandos
+
+Descarga los feeds indicados, guarda las noticias nuevas en la base local
+(sin repetir las ya vistas) y vectoriza sólo esas. Opcionalmente busca
+las noticias más relacionadas con una pregunta.
+
+Uso:
+    python ingest_news.py https://ejemplo.com/rss https://otro.com/feed.xml
+    python ingest_news.py --file feeds.txt --search "elecciones"
+"""
+import argparse
+
+from services.embedding_service import EmbeddingService
+from services.news_service import NewsService
+
+
+def read_feed_list(path: str) -> list:
+    """
+    Lee una URL por línea (ignora líneas vacías y comentarios #)
+    """
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingesta incremental de feeds RSS/Atom")
+    parser.add_argument("urls", nargs="*", help="URLs de los feeds")
+    parser.add_argument("--file", help="Archivo con una URL de feed por línea")
+    parser.add_argument("--search", help="Pregunta para buscar en las noticias guardadas")
+    parser.add_argument("--k", type=int, default=None, help="Noticias a mostrar en la búsqueda")
+    args = parser.parse_args()
+
+    urls = list(args.urls)
+    if args.file:
+        urls += read_feed_list(args.file)
+
+    news_service = NewsService(EmbeddingService())
+
+    if urls:
+        report = news_service.ingest_feeds(urls)
+        print("\n=== Resultado de la ingesta ===")
+        print(report.summary())
+        for failure in report.failures:
+            print(f"  - {failure.url}: {failure.error}")
+
+    stats = news_service.get_stats()
+    print(f"\nBase de noticias: {stats['entries']} noticias de {stats['feeds']} feeds "
+          f"({stats['embedded']} indexadas)")
+
+    if args.search:
+        result = news_service.search(args.search, k=args.k)
+        print(f"\n=== Noticias para '{args.search}' ===")
+        for chunk, distance in zip(result.chunks, result.distances):
+            print(f"[{distance:.3f}] {chunk.splitlines()[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,118 @@
+import os
+import tempfile
+import time
+import uuid
+from typing import Optional
+
 import streamlit as st
 from config.settings import settings
 
 from services.document_service import DocumentService
 from services.embedding_service import EmbeddingService
-from services.database_service import DatabaseService
 from services.ai_service import AIService
 from services.conversation_service import ConversationService
+from services.conversation_memory import ConversationMemory
 from services.rss_service import RSSService   #  NUEVO
+from services.rss_summarizer import RSSSummarizer
+from services.analysis_cache import AnalysisCache
+from services.story_clusterer import StoryClusterer
+from services.feed_poller import FeedPoller
+from services.feed_registry import FeedRegistry
+from services.ingestion_service import IngestionService
+from services.index_bundle import IndexBundle
+from services.index_registry import IndexRegistry, IndexReleasedError
+from services.news_service import NewsService
+from services.tracing_service import tracer
+from services.traffic_recorder import recorder
+from services.usage_service import usage_tracker
+
+
+@st.cache_resource
+def get_embedding_service() -> EmbeddingService:
+    # Una sola instancia por servidor, creada con la primera acción sobre documentos o
+    # noticias (no al abrir la página); el modelo se carga y calienta en segundo plano
+    return EmbeddingService()
+
+
+@st.cache_resource
+def get_ai_service() -> AIService:
+    return AIService()
+
+
+@st.cache_resource
+def get_index_registry() -> IndexRegistry:
+    # Compartido por todas las sesiones: aplica el presupuesto de memoria global
+    return IndexRegistry(get_embedding_service())
+
+
+@st.cache_resource
+def get_rss_summarizer() -> RSSSummarizer:
+    # Compartido para que la caché de resúmenes parciales sirva a todas las sesiones
+    return RSSSummarizer(get_ai_service())
+
+
+@st.cache_resource
+def get_analysis_cache() -> AnalysisCache:
+    return AnalysisCache()
+
+
+@st.cache_resource
+def get_story_clusterer() -> StoryClusterer:
+    return StoryClusterer(get_embedding_service())
+
+
+@st.cache_resource
+def get_feed_poller() -> FeedPoller:
+    # Un solo hilo por servidor mantiene precalculados los análisis de los feeds suscritos.
+    # El servicio de IA se crea con el primer análisis y el hilo sólo arranca si hay feeds
+    poller = FeedPoller(FeedRegistry(), RSSService(), get_ai_service)
+    if settings.FEED_POLLER_ENABLED and poller.registry.next_poll_at() is not None:
+        poller.start()
+    return poller
+
+
+@st.cache_resource
+def get_news_service() -> NewsService:
+    # Base de noticias compartida; al crearse reconstruye el índice desde SQLite
+    return NewsService(get_embedding_service())
 
 
 class ChatApp:
 
     def __init__(self):
+        # Servicios ligeros: se crean siempre
         self.document_service = DocumentService()
-        self.embedding_service = EmbeddingService()
-        self.database_service = DatabaseService(self.embedding_service)
-        self.ai_service = AIService()
-        self.conversation_service = ConversationService()
         self.rss_service = RSSService()  #  NUEVO
 
+    # Servicios pesados: se crean al usarse por primera vez
+
+    @property
+    def embedding_service(self) -> EmbeddingService:
+        return get_embedding_service()
+
+    @property
+    def ai_service(self) -> AIService:
+        return get_ai_service()
+
+    @property
+    def index_registry(self) -> IndexRegistry:
+        return get_index_registry()
+
+    @property
+    def news_service(self) -> NewsService:
+        return get_news_service()
+
+    @property
+    def conversation_memory(self) -> Optional[ConversationMemory]:
+        if not settings.CONVERSATION_MEMORY_ENABLED:
+            return None
+        if "conversation_memory" not in st.session_state:
+            st.session_state.conversation_memory = ConversationMemory(self.embedding_service)
+        return st.session_state.conversation_memory
+
     def initialize_session_state(self):
+        if "session_id" not in st.session_state:
+            st.session_state.session_id = uuid.uuid4().hex
         if "document" not in st.session_state:
             st.session_state.document = None
         if "file_processed" not in st.session_state:
@@ -27,46 +120,124 @@ class ChatApp:
         if "file_hash" not in st.session_state:
             st.session_state.file_hash = None
         if "conversation_service" not in st.session_state:
-            st.session_state.conversation_service = self.conversation_service
-        if "database_service" not in st.session_state:
-            st.session_state.database_service = None
+            # ?conversation=<id> en la URL retoma una conversación guardada
+            conversation = ConversationService(conversation_id=st.query_params.get("conversation"))
+            st.query_params["conversation"] = conversation.conversation_id
+            st.session_state.conversation_service = conversation
 
     # -------------------------
     # PROCESAMIENTO DOCUMENTO
     # -------------------------
 
     def process_document(self, uploaded_file):
+        bundle_path = os.path.join(settings.INDEX_BUNDLE_DIR, st.session_state.file_hash)
+        if os.path.isfile(os.path.join(bundle_path, "manifest.json")):
+            # Índice armado de antemano (build_index_bundle.py): no se extrae ni se vectoriza nada
+            try:
+                with st.spinner(f"Cargando el índice precalculado de {uploaded_file.name}..."):
+                    bundle = IndexBundle.open(bundle_path)
+                    try:
+                        self.index_registry.create_from_bundle(st.session_state.session_id, bundle)
+                    finally:
+                        bundle.close()
+            except (ValueError, KeyError, TypeError, OSError) as e:
+                # Paquete dañado, de otra versión o de otro modelo/chunking: se procesa el archivo
+                st.warning(f"No se pudo usar el índice precalculado ({e}); se procesa el archivo.")
+            else:
+                st.session_state.document = None
+                st.session_state.file_processed = True
+                st.success(f"Índice precalculado cargado: {len(bundle)} fragmentos.")
+                return
+
         with st.spinner(f"Procesando {uploaded_file.name}..."):
             document = self.document_service.process_file(uploaded_file, uploaded_file.name)
 
-            self.database_service.create_collection(document)
+            # Colección propia de esta sesión y este documento
+            self.index_registry.create(st.session_state.session_id, document)
 
-            st.session_state.database_service = self.database_service
             st.session_state.document = document
             st.session_state.file_processed = True
             st.session_state.file_hash = document.file_hash
 
-            st.session_state.conversation_service.clear_history()
-
         st.success(f"Archivo procesado: {len(document.chunks)} fragmentos generados.")
 
+    def process_archive(self, uploaded_file):
+        session_id = st.session_state.session_id
+        archive_hash = st.session_state.file_hash
+        database_service = self.index_registry.open(session_id, archive_hash)
+        ingestion_service = IngestionService(self.embedding_service, database_service)
+
+        with st.spinner(f"Indexando {uploaded_file.name}..."):
+            with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
+                tmp.write(uploaded_file.getvalue())
+                archive_path = tmp.name
+
+            try:
+                report = ingestion_service.ingest(archive_path, reset=False)
+            finally:
+                os.remove(archive_path)
+                self.index_registry.commit(session_id, archive_hash)
+
+            st.session_state.document = None
+            st.session_state.file_processed = True
+
+        st.success(f"ZIP procesado: {report.summary()}")
+
+        for failure in report.failures:
+            st.warning(f"{failure.file_name}: {failure.error}")
+
     def handle_question(self, question: str):
         with st.spinner("Pensando..."):
-            db_service = st.session_state.database_service
-
-            if db_service is None:
+            if not st.session_state.file_processed:
                 st.error("Primero debes procesar un documento.")
                 return "", None
 
-            retrieval_result = db_service.retrieve_context(question)
-            context_text = retrieval_result.get_context_text()
-
-            history = st.session_state.conversation_service.get_history()
+            start = time.perf_counter()
+            try:
+                # Si el índice se desalojó a disco, se recarga aquí de forma transparente
+                with self.index_registry.use(st.session_state.session_id, st.session_state.file_hash) as db_service:
+                    retrieval_result = db_service.retrieve_context(question)
+            except IndexReleasedError as e:
+                st.session_state.file_processed = False
+                st.error(f"El índice de este documento ya no está disponible ({e.reason}). Vuelve a procesarlo.")
+                return "", None
 
-            answer = self.ai_service.generate_response(context_text, question, history)
+            context_text = retrieval_result.get_context_text()
+            retrieved = time.perf_counter()
+
+            conversation = st.session_state.conversation_service
+            memory = self.conversation_memory
+
+            if memory is not None:
+                # Pocos mensajes recientes completos + turnos antiguos relevantes
+                memory.sync(conversation)
+                history = conversation.get_last_n_messages(settings.CONVERSATION_PROMPT_MESSAGES)
+                recalled = memory.search(question, before_position=conversation.get_message_count() - len(history))
+            else:
+                history = conversation.get_history()
+                recalled = []
+
+            answer = self.ai_service.generate_response(
+                context_text,
+                question,
+                history,
+                session_id=st.session_state.session_id,
+                document_id=st.session_state.file_hash,
+                memory=[turn.text for turn in recalled]
+            )
+            generated = time.perf_counter()
+
+            recorder.record_question(
+                session_id=st.session_state.session_id,
+                document_hash=st.session_state.file_hash,
+                question=question,
+                retrieved_ids=retrieval_result.chunk_ids,
+                timings={"retrieval": retrieved - start, "generation": generated - retrieved},
+                history_length=len(history)
+            )
 
-            st.session_state.conversation_service.add_user_message(question)
-            st.session_state.conversation_service.add_assistant_message(answer)
+            conversation.add_user_message(question)
+            conversation.add_assistant_message(answer)
 
             return answer, retrieval_result
 
@@ -74,14 +245,145 @@ class ChatApp:
     # PROCESAMIENTO RSS
     # -------------------------
 
-    def handle_rss(self, rss_url: str):
-        with st.spinner("Analizando RSS..."):
-            rss_text = self.rss_service.fetch_and_format(rss_url)
+    def handle_rss(self, rss_url: str, all_entries: bool = False, full_articles: bool = False):
+        if not all_entries and not full_articles:
+            # Feed suscrito: el análisis ya está calculado en segundo plano
+            subscription = get_feed_poller().registry.get(rss_url)
+            if subscription and subscription.analysis:
+                return subscription.analysis
 
-            result = self.ai_service.generate_rss_analysis(rss_text)
+        with st.spinner("Analizando RSS..."):
+            start = time.perf_counter()
+
+            feed = self.rss_service.fetch_entries(rss_url, max_entries=settings.RSS_MAX_ENTRIES if all_entries else 5)
+            if full_articles:
+                feed.entries = self.rss_service.enrich_entries(feed.entries)
+            rss_text = self.rss_service.format_feed(feed.title, feed.entries, max_entries=None)
+            fetched = time.perf_counter()
+
+            # Mismas entradas (GUID + fecha) con el mismo modo y modelo: el análisis guardado sirve
+            cache = get_analysis_cache()
+            cache_key = AnalysisCache.key(
+                ("all" if all_entries else "latest") + ("+articles" if full_articles else ""),
+                settings.GEMINI_MODEL_NAME,
+                feed.title,
+                self.rss_service.fingerprint(feed.entries)
+            )
+            result = cache.get(cache_key)
+
+            if result is None and all_entries:
+                # Resumen jerárquico: lotes resumidos en paralelo y combinados al final
+                result, omitted = get_rss_summarizer().summarize_with_coverage(
+                    feed.title,
+                    feed.entries,
+                    session_id=st.session_state.session_id,
+                    feed_url=rss_url
+                )
+                # Un análisis parcial (plazo vencido) no se guarda: la próxima vez puede completarse
+                if not omitted:
+                    cache.put(cache_key, result)
+
+            elif result is None:
+                result = self.ai_service.generate_rss_analysis(
+                    rss_text,
+                    session_id=st.session_state.session_id,
+                    feed_url=rss_url
+                )
+                cache.put(cache_key, result)
+
+            recorder.record_rss(
+                session_id=st.session_state.session_id,
+                feed_url=rss_url,
+                text_chars=len(rss_text),
+                timings={"fetch": fetched - start, "analysis": time.perf_counter() - fetched}
+            )
 
             return result
 
+    def handle_rss_feeds(self, feed_urls: str):
+        urls = [url.strip() for url in feed_urls.splitlines() if url.strip()]
+
+        with st.spinner(f"Analizando {len(urls)} feeds..."):
+            start = time.perf_counter()
+            feeds = self.rss_service.fetch_many(urls, max_entries=settings.RSS_ENTRIES_PER_FEED)
+
+            # La misma noticia publicada por varios feeds se envía una sola vez
+            clusters = get_story_clusterer().cluster_feeds(feeds)
+            if not clusters:
+                raise ValueError("Ningún feed se pudo descargar")
+
+            rss_text = self.rss_service.format_clusters(clusters)
+            fetched = time.perf_counter()
+
+            result = self.ai_service.generate_rss_analysis(
+                rss_text,
+                session_id=st.session_state.session_id
+            )
+
+            recorder.record_rss(
+                session_id=st.session_state.session_id,
+                feed_url=",".join(urls),
+                text_chars=len(rss_text),
+                timings={"fetch": fetched - start, "analysis": time.perf_counter() - fetched}
+            )
+
+            entries = sum(cluster.size for cluster in clusters)
+            failures = [feed for feed in feeds if not feed.ok]
+            return result, entries, len(clusters), failures
+
+    def render_subscriptions(self):
+        poller = get_feed_poller()
+
+        new_url = st.text_input("Suscribirse a un feed")
+        if st.button("Suscribir") and new_url.strip():
+            poller.registry.subscribe(new_url)
+            if settings.FEED_POLLER_ENABLED:
+                poller.start()
+            poller.wake()
+
+        now = time.time()
+        for subscription in poller.registry.list():
+            label = subscription.title or subscription.url
+            with st.expander(label):
+                if subscription.analysis:
+                    st.caption(
+                        f"Analizado hace {(now - subscription.analyzed_at) / 60:.0f} min · "
+                        f"próxima revisión en {max(0.0, subscription.next_poll_at - now) / 60:.0f} min"
+                    )
+                    st.write(subscription.analysis)
+                else:
+                    st.caption("Pendiente del primer análisis")
+
+                if subscription.last_error:
+                    st.warning(f"Último error ({subscription.failures} seguidos): {subscription.last_error}")
+
+                if st.button("Quitar", key=f"unsubscribe-{subscription.url}"):
+                    poller.registry.unsubscribe(subscription.url)
+                    st.rerun()
+
+    def handle_news_ingest(self, feed_urls: str):
+        urls = [url.strip() for url in feed_urls.splitlines() if url.strip()]
+
+        with st.spinner(f"Descargando {len(urls)} feeds..."):
+            report = self.news_service.ingest_feeds(urls)
+
+        st.success(report.summary())
+        for failure in report.failures:
+            st.warning(f"{failure.url}: {failure.error}")
+
+    def handle_news_question(self, question: str):
+        with st.spinner("Buscando en las noticias..."):
+            retrieval_result = self.news_service.search(question)
+            if not retrieval_result.chunks:
+                return "Todavía no hay noticias guardadas.", retrieval_result
+
+            answer = self.ai_service.generate_news_answer(
+                retrieval_result.get_context_text(),
+                question,
+                session_id=st.session_state.session_id
+            )
+            return answer, retrieval_result
+
     # -------------------------
     # INTERFAZ
     # -------------------------
@@ -97,26 +399,35 @@ class ChatApp:
         # =============================
         with tab1:
 
-            st.markdown("Soporta: **PDF, Excel (.xlsx), Word (.docx), Texto (.txt)**")
+            st.markdown("Soporta: **PDF, Excel (.xlsx), Word (.docx), Texto (.txt)** o un **.zip** con varios archivos")
 
             uploaded_file = st.file_uploader(
                 "Sube tu archivo",
-                type=["pdf", "docx", "xlsx", "txt"]
+                type=["pdf", "docx", "xlsx", "txt", "zip"]
             )
 
             if uploaded_file:
+                # Primer uso de documentos: el modelo empieza a cargarse en segundo plano
+                # mientras el usuario pulsa "Procesar Archivo"
+                get_embedding_service()
                 current_hash = self.document_service.hash_file(uploaded_file)
 
                 if st.session_state.file_hash != current_hash:
+                    if st.session_state.file_hash:
+                        # El documento anterior ya no se usa en esta sesión
+                        self.index_registry.drop(st.session_state.session_id, st.session_state.file_hash)
                     st.session_state.file_hash = current_hash
                     st.session_state.file_processed = False
                     st.session_state.document = None
-                    st.session_state.database_service = None
-                    st.session_state.conversation_service.clear_history()
+                    # Si es otro documento, la conversación empieza de cero
+                    st.session_state.conversation_service.set_document(current_hash)
 
             if uploaded_file and not st.session_state.file_processed:
                 if st.button("Procesar Archivo"):
-                    self.process_document(uploaded_file)
+                    if uploaded_file.name.lower().endswith(".zip"):
+                        self.process_archive(uploaded_file)
+                    else:
+                        self.process_document(uploaded_file)
 
             if st.session_state.file_processed:
                 st.divider()
@@ -144,11 +455,19 @@ class ChatApp:
             st.markdown("Ingresa una URL RSS para analizar su contenido.")
 
             rss_url = st.text_input("URL del RSS")
+            all_entries = st.checkbox(
+                "Analizar todas las entradas",
+                help=f"Resume hasta {settings.RSS_MAX_ENTRIES} entradas por lotes en lugar de sólo las 5 primeras"
+            )
+            full_articles = st.checkbox(
+                "Leer los artículos completos",
+                help="Descarga la página de cada entrada y agrega su texto principal al análisis"
+            )
 
             if st.button("Analizar RSS"):
                 if rss_url:
                     try:
-                        result = self.handle_rss(rss_url)
+                        result = self.handle_rss(rss_url, all_entries=all_entries, full_articles=full_articles)
                         st.success("Análisis completado")
                         st.write(result)
 
@@ -157,10 +476,83 @@ class ChatApp:
                 else:
                     st.warning("Debes ingresar una URL válida.")
 
+            st.divider()
+            st.markdown("**Feeds suscritos**: se revisan y analizan en segundo plano.")
+            self.render_subscriptions()
+
+            st.divider()
+            st.markdown("**Noticias guardadas**: cada actualización sólo agrega las noticias nuevas.")
+
+            feed_urls = st.text_area("Feeds a seguir (una URL por línea)")
+            col_ingest, col_analyze = st.columns(2)
+            if col_ingest.button("Actualizar noticias") and feed_urls.strip():
+                self.handle_news_ingest(feed_urls)
+
+            if col_analyze.button("Analizar feeds juntos") and feed_urls.strip():
+                try:
+                    result, entries, stories, failures = self.handle_rss_feeds(feed_urls)
+                    st.success(f"Análisis completado: {entries} entradas agrupadas en {stories} noticias")
+                    for failure in failures:
+                        st.warning(f"{failure.url}: {failure.error}")
+                    st.write(result)
+
+                except Exception as e:
+                    st.error(f"Error: {e}")
+
+            news_question = st.text_input("Pregunta sobre todas las noticias guardadas")
+            if st.button("Preguntar") and news_question:
+                answer, retrieval_result = self.handle_news_question(news_question)
+                st.write(answer)
+
+                with st.expander("Ver noticias utilizadas"):
+                    for chunk in retrieval_result.chunks:
+                        st.text(chunk)
+
+    def render_debug_panel(self):
+        with st.sidebar.expander("🔧 Métricas del pipeline"):
+            st.caption("Índices en memoria")
+            if st.session_state.file_hash:
+                st.json(self.index_registry.get_stats(), expanded=False)
+                st.caption("Lotes de embeddings de consultas (tamaño y latencia)")
+                st.json(self.embedding_service.get_batching_stats(), expanded=False)
+            else:
+                # Consultar el registro crearía el servicio de embeddings sin haber documentos
+                st.text("Todavía no se subió ningún documento en esta sesión")
+
+            st.caption("Consumo del LLM (esta sesión / total)")
+            st.json({
+                "sesion": usage_tracker.get_breakdown("session_id").get(st.session_state.session_id, {}),
+                "total": usage_tracker.get_totals()
+            }, expanded=False)
+
+            st.caption("Actualizador de feeds")
+            st.json(get_feed_poller().get_stats(), expanded=False)
+
+            st.caption("Caché de análisis RSS")
+            st.json(get_analysis_cache().get_stats(), expanded=False)
+
+            stats = tracer.get_stats()
+
+            if not stats:
+                st.caption("Todavía no hay mediciones.")
+                return
+
+            st.dataframe(
+                [{"etapa": name, **values} for name, values in stats.items()],
+                hide_index=True
+            )
+            st.caption("Últimos spans")
+            st.json(tracer.get_recent(20), expanded=False)
+
     def run(self):
         st.set_page_config(page_title=settings.PAGE_TITLE, page_icon="📚")
         self.initialize_session_state()
+
+        if settings.METRICS_PORT:
+            tracer.start_http_exporter(settings.METRICS_PORT)
+
         self.render_ui()
+        self.render_debug_panel()
 
 
 if __name__ == "__main__":
@@ -1,10 +1,23 @@
 from .document import Chunk, Document, ConversationMessage, RetrievalResult
+from .ingestion import IngestionFailure, IngestionReport
+from .usage import LLMUsage
+from .bundle import BundleManifest
+from .feed import FeedEntry, FeedResult, FeedSubscription, NewsIngestReport, StoryCluster
 
 __all__ = [
     'Chunk',
     'Document', 
     'ConversationMessage',
-    'RetrievalResult'
+    'RetrievalResult',
+    'IngestionFailure',
+    'IngestionReport',
+    'LLMUsage',
+    'BundleManifest',
+    'FeedEntry',
+    'FeedResult',
+    'FeedSubscription',
+    'NewsIngestReport',
+    'StoryCluster'
 ]
 
 
@@ -0,0 +1,41 @@
+from dataclasses import asdict, dataclass, field
+from typing import Dict
+
+
+# Versión del formato; cambia si cambia la estructura de los archivos
+BUNDLE_FORMAT_VERSION = 1
+
+
+@dataclass
+class BundleManifest:
+    """
+    Descripción de un paquete de índice (manifest.json)
+
+    Guarda lo necesario para saber si el paquete sirve en otra instancia:
+    el modelo de embeddings y los parámetros de chunking con que se armó.
+    """
+    file_name: str
+    file_hash: str
+    chunk_count: int
+    dimension: int
+    embedding_model: str
+    chunk_size: int
+    chunk_overlap: int
+    top_k: int
+    total_pages: int = 1
+    text_bytes: int = 0
+    created_at: float = 0.0
+    format_version: int = BUNDLE_FORMAT_VERSION
+    files: Dict[str, str] = field(default_factory=dict)  # Nombre lógico -> archivo dentro del paquete
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BundleManifest":
+        known = {name: data[name] for name in cls.__dataclass_fields__ if name in data}
+        return cls(**known)
+
+    def __repr__(self):
+        return (f"BundleManifest(file={self.file_name}, chunks={self.chunk_count}, "
+                f"dim={self.dimension}, model={self.embedding_model})")
@@ -0,0 +1,127 @@
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class FeedEntry:
+    """
+    Una noticia (item de RSS o entry de Atom)
+
+    `content` sólo se llena al enriquecer la entrada con el texto del
+    artículo enlazado (ArticleEnricher). `updated` es la fecha de la
+    última edición cuando el feed la publica aparte (Atom <updated>).
+    """
+    title: str
+    link: str = ""
+    guid: str = ""
+    summary: str = ""
+    published: str = ""
+    content: str = ""
+    updated: str = ""
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def __repr__(self):
+        return f"FeedEntry(title={self.title[:40]!r}, guid={self.guid[:40]!r})"
+
+
+@dataclass
+class FeedResult:
+    """
+    Resultado de descargar un feed
+
+    `status` es "ok" (descargado y parseado), "not_modified" (304: se
+    reutilizaron las entradas en caché) o "error".
+    """
+    url: str
+    status: str
+    title: str = ""
+    entries: List[FeedEntry] = field(default_factory=list)
+    error: Optional[str] = None
+    http_status: Optional[int] = None
+    elapsed_seconds: float = 0.0
+    bytes_downloaded: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.status != "error"
+
+    def __repr__(self):
+        return (f"FeedResult(url={self.url}, status={self.status}, entries={len(self.entries)}, "
+                f"elapsed={self.elapsed_seconds:.2f}s)")
+
+
+@dataclass
+class NewsIngestReport:
+    """
+    Resumen de una pasada de ingesta incremental de noticias
+    """
+    feeds: int = 0
+    not_modified: int = 0
+    new_entries: int = 0
+    duplicate_entries: int = 0
+    embedded_entries: int = 0
+    elapsed_seconds: float = 0.0
+    failures: List[FeedResult] = field(default_factory=list)
+
+    def summary(self) -> str:
+        """
+        Texto legible con el resultado de la ingesta
+        """
+        return (
+            f"{self.feeds} feeds ({self.not_modified} sin cambios, {len(self.failures)} con error), "
+            f"{self.new_entries} noticias nuevas, {self.duplicate_entries} repetidas, "
+            f"{self.embedded_entries} indexadas en {self.elapsed_seconds:.2f}s"
+        )
+
+    def __repr__(self):
+        return f"NewsIngestReport(feeds={self.feeds}, new={self.new_entries}, embedded={self.embedded_entries})"
+
+
+@dataclass
+class StoryCluster:
+    """
+    Una misma noticia publicada por uno o más feeds
+
+    `representative` es la versión que se envía al LLM; `sources` son los
+    títulos de los feeds que la publicaron (sin repetir).
+    """
+    representative: FeedEntry
+    entries: List[FeedEntry] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self):
+        return f"StoryCluster(title={self.representative.title[:40]!r}, entries={self.size}, sources={len(self.sources)})"
+
+
+@dataclass
+class FeedSubscription:
+    """
+    Feed seguido por el actualizador en segundo plano
+
+    `interval_seconds` se adapta a la frecuencia con que el feed cambia;
+    `analysis` es el último análisis precalculado (None hasta el primero).
+    """
+    url: str
+    title: str = ""
+    interval_seconds: float = 0.0
+    next_poll_at: float = 0.0
+    last_polled_at: Optional[float] = None
+    last_changed_at: Optional[float] = None
+    failures: int = 0
+    last_error: Optional[str] = None
+    fingerprint: Optional[str] = None
+    analysis: Optional[str] = None
+    analyzed_at: Optional[float] = None
+
+    def is_due(self, now: float) -> bool:
+        return self.next_poll_at <= now
+
+    def __repr__(self):
+        return (f"FeedSubscription(url={self.url}, interval={self.interval_seconds:.0f}s, "
+                f"failures={self.failures}, analyzed={self.analysis is not None})")
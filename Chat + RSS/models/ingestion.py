@@ -0,0 +1,52 @@
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass
+class IngestionFailure:
+    """
+    Representa un archivo que no se pudo procesar durante una ingesta masiva
+    """
+    file_name: str
+    error: str
+
+    def __repr__(self):
+        return f"IngestionFailure(file={self.file_name}, error={self.error})"
+
+
+@dataclass
+class IngestionReport:
+    """
+    Resumen de una ingesta masiva (carpeta o ZIP)
+    """
+    total_files: int = 0
+    processed_files: int = 0
+    duplicate_files: int = 0  # Archivos con el mismo contenido que otro ya indexado (se omiten)
+    total_chunks: int = 0
+    total_bytes: int = 0
+    elapsed_seconds: float = 0.0
+    workers: int = 1
+    failures: List[IngestionFailure] = field(default_factory=list)
+
+    @property
+    def files_per_second(self) -> float:
+        return self.processed_files / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.total_chunks / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def summary(self) -> str:
+        """
+        Texto legible con el rendimiento agregado de la ingesta
+        """
+        return (
+            f"{self.processed_files}/{self.total_files} archivos"
+            f"{f' ({self.duplicate_files} repetidos)' if self.duplicate_files else ''}, "
+            f"{self.total_chunks} chunks en {self.elapsed_seconds:.2f}s "
+            f"({self.files_per_second:.2f} archivos/s, {self.chunks_per_second:.1f} chunks/s, "
+            f"{self.workers} workers), {len(self.failures)} fallos"
+        )
+
+    def __repr__(self):
+        return f"IngestionReport(files={self.processed_files}/{self.total_files}, chunks={self.total_chunks})"
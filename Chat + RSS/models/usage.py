@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class LLMUsage:
+    """
+    Consumo de una llamada al LLM
+    """
+    operation: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency_seconds: float
+    estimated: bool = False  # True si los tokens se estimaron (sin metadatos de la API)
+    failed: bool = False  # True si la llamada falló (error o timeout); sólo se imputa el prompt
+    session_id: Optional[str] = None
+    document_id: Optional[str] = None
+    feed_url: Optional[str] = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def __repr__(self):
+        return (f"LLMUsage(op={self.operation}, prompt={self.prompt_tokens}, "
+                f"completion={self.completion_tokens}, latency={self.latency_seconds:.3f}s)")
@@ -0,0 +1,80 @@
+"""
+Actualizador de feeds suscritos desde la línea de comandos
+
+Suscribe los feeds indicados y los revisa en segundo plano con intervalos
+adaptativos, guardando los análisis en la misma base que lee la app
+(settings.FEED_POLLER_DB_PATH). Útil para mantener los análisis
+precalculados con la app detenida o en otra máquina (en ese caso,
+desactivar el de la app con FEED_POLLER_ENABLED=0).
+
+Uso:
+    python poll_feeds.py https://ejemplo.com/rss --file feeds.txt
+    python poll_feeds.py --once            # una pasada y termina
+    python poll_feeds.py --list
+"""
+import argparse
+import time
+
+from ingest_news import read_feed_list
+from services.ai_service import AIService
+from services.feed_poller import FeedPoller
+from services.feed_registry import FeedRegistry
+from services.llm_backends import create_llm_backend
+from services.rss_service import RSSService
+
+
+def print_subscriptions(registry: FeedRegistry) -> None:
+    now = time.time()
+    for subscription in registry.list():
+        status = f"error x{subscription.failures}" if subscription.failures else (
+            "analizado" if subscription.analysis else "pendiente"
+        )
+        print(f"- {subscription.title or subscription.url} [{status}] "
+              f"intervalo {subscription.interval_seconds / 60:.0f} min, "
+              f"próxima revisión en {max(0.0, subscription.next_poll_at - now) / 60:.0f} min")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Actualizador de feeds RSS en segundo plano")
+    parser.add_argument("urls", nargs="*", help="Feeds a suscribir")
+    parser.add_argument("--file", help="Archivo con una URL de feed por línea")
+    parser.add_argument("--unsubscribe", nargs="*", default=[], help="Feeds a quitar")
+    parser.add_argument("--once", action="store_true", help="Revisar los feeds pendientes una vez y salir")
+    parser.add_argument("--list", action="store_true", help="Mostrar las suscripciones y salir")
+    parser.add_argument("--llm", choices=["gemini", "stub"], default="gemini", help="Backend del LLM")
+    args = parser.parse_args()
+
+    registry = FeedRegistry()
+    urls = list(args.urls)
+    if args.file:
+        urls += read_feed_list(args.file)
+    for url in urls:
+        registry.subscribe(url)
+    for url in args.unsubscribe:
+        registry.unsubscribe(url)
+
+    if args.list:
+        print_subscriptions(registry)
+        return
+
+    ai_service = AIService(model=create_llm_backend(args.llm), rate_limited=args.llm != "stub")
+    poller = FeedPoller(registry, RSSService(), ai_service)
+
+    if args.once:
+        print(f"Feeds revisados: {poller.poll_due()}")
+        print_subscriptions(registry)
+        poller.close()
+        return
+
+    poller.start()
+    print("Actualizador en marcha (Ctrl+C para detener)")
+    try:
+        while True:
+            time.sleep(60)
+            print(poller.get_stats())
+    except KeyboardInterrupt:
+        poller.close()
+
+
+if __name__ == "__main__":
+    main()
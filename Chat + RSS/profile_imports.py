@@ -0,0 +1,115 @@
+"""
+Reporte de tiempo de importación y de arranque de la app
+
+Ejecuta `python -X importtime` en un proceso limpio, resume los módulos
+más costosos y mide el tiempo hasta poder dibujar la interfaz (importar
+main.py y construir ChatApp, sin cargar el modelo de embeddings).
+
+Uso:
+    python profile_imports.py
+    python profile_imports.py --top 30 --output import_profile.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+
+FIRST_PAINT_SNIPPET = (
+    "import time; start = time.perf_counter(); "
+    "import main; main.ChatApp(); "
+    "print(time.perf_counter() - start)"
+)
+
+
+def run_importtime(module: str) -> list:
+    """
+    Importa un módulo con -X importtime y devuelve las filas del reporte
+
+    Returns:
+        Lista de tuplas (módulo, tiempo propio en µs, tiempo acumulado en µs)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure_first_paint(runs: int = 3) -> float:
+    """
+    Mejor tiempo (en segundos) de importar main.py y construir ChatApp
+    """
+    times = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", FIRST_PAINT_SNIPPET],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env={**os.environ, "EMBEDDING_BACKGROUND_LOAD": "1"}
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de importación de la app")
+    parser.add_argument("--module", default="main", help="Módulo a importar")
+    parser.add_argument("--top", type=int, default=20, help="Módulos a mostrar")
+    parser.add_argument("--output", help="Archivo JSON con el reporte")
+    args = parser.parse_args()
+
+    rows = run_importtime(args.module)
+
+    # Agrupa por paquete de primer nivel (torch, chromadb, pandas...)
+    packages = defaultdict(int)
+    for name, self_us, _ in rows:
+        packages[name.strip().split(".")[0]] += self_us
+
+    total_us = sum(self_us for _, self_us, _ in rows)
+    top_modules = sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]
+    top_packages = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    first_paint = measure_first_paint() if args.module == "main" else None
+
+    print(f"Importar '{args.module}': {total_us / 1000:.1f} ms ({len(rows)} módulos)")
+    if first_paint is not None:
+        print(f"Tiempo hasta el primer render (import main + ChatApp()): {first_paint * 1000:.1f} ms")
+
+    print(f"\n{'paquete':<30} {'ms':>10}")
+    for name, self_us in top_packages:
+        print(f"{name:<30} {self_us / 1000:>10.1f}")
+
+    print(f"\n{'módulo (acumulado)':<50} {'ms':>10}")
+    for name, _, cumulative_us in top_modules:
+        print(f"{name.strip():<50} {cumulative_us / 1000:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "module": args.module,
+                "total_ms": round(total_us / 1000, 2),
+                "first_paint_ms": round(first_paint * 1000, 2) if first_paint is not None else None,
+                "packages_ms": {name: round(us / 1000, 2) for name, us in top_packages},
+                "modules_cumulative_ms": {name.strip(): round(us / 1000, 2) for name, _, us in top_modules}
+            }, f, indent=2)
+        print(f"\nReporte guardado en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
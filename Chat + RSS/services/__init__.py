@@ -0,0 +1,57 @@
+"""
+Servicios de la aplicación
+
+Los módulos se importan de forma perezosa: `from services import AIService`
+sólo carga ai_service (y sus dependencias) cuando se pide ese nombre, así
+abrir la pestaña de RSS no arrastra torch, chromadb o pandas.
+"""
+import importlib
+
+_EXPORTS = {
+    'DocumentService': 'document_service',
+    'ExtractorService': 'extractor_service',
+    'EmbeddingService': 'embedding_service',
+    'EmbeddingPool': 'embedding_pool',
+    'EmbeddingBatcher': 'embedding_batcher',
+    'DatabaseService': 'database_service',
+    'IndexBundle': 'index_bundle',
+    'AIService': 'ai_service',
+    'StubLLM': 'llm_backends',
+    'LLMClient': 'llm_client',
+    'LLMError': 'llm_client',
+    'ConversationService': 'conversation_service',
+    'ConversationMemory': 'conversation_memory',
+    'LatencyTracker': 'metrics_service',
+    'Tracer': 'tracing_service',
+    'tracer': 'tracing_service',
+    'TrafficRecorder': 'traffic_recorder',
+    'recorder': 'traffic_recorder',
+    'UsageTracker': 'usage_service',
+    'usage_tracker': 'usage_service',
+    'IngestionService': 'ingestion_service',
+    'RSSService': 'rss_service',
+    'FeedFetcher': 'feed_fetcher',
+    'FeedRegistry': 'feed_registry',
+    'FeedPoller': 'feed_poller',
+    'ArticleEnricher': 'article_enricher',
+    'RSSSummarizer': 'rss_summarizer',
+    'AnalysisCache': 'analysis_cache',
+    'StoryClusterer': 'story_clusterer',
+    'NewsStore': 'news_store',
+    'NewsService': 'news_service'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'services' has no attribute '{name}'")
+
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
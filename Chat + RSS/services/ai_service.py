@@ -1,8 +1,11 @@
-import google.generativeai as genai
-from typing import List
+from typing import List, Optional
 
 from models.document import ConversationMessage
 from config.settings import settings
+from services.llm_client import LLMClient
+from services.tracing_service import tracer
+from services.token_utils import estimate_tokens
+from services.usage_service import extract_usage
 
 
 class AIService:
@@ -10,19 +13,37 @@ class AIService:
     Servicio para comunicarse con Gemini (IA de Google)
     """
 
-    def __init__(self):
+    def __init__(self, model=None, **client_options):
         """
         Inicializa el cliente de Gemini
+        
+        Args:
+            model: Backend alternativo con `generate_content(prompt)` (por ejemplo
+                   StubLLM para pruebas offline). None = Gemini.
+            **client_options: Límites del LLMClient (max_concurrency, rate_limited,
+                   deduplicate...); por defecto los de settings
         """
-        genai.configure(api_key=settings.GOOGLE_API_KEY)
-        self.model = genai.GenerativeModel(settings.GEMINI_MODEL_NAME)
-        print(f"Gemini configurado: {settings.GEMINI_MODEL_NAME}")
+        if model is not None:
+            self.model = model
+            print(f"Backend de LLM personalizado: {type(model).__name__}")
+        else:
+            import google.generativeai as genai
+            
+            genai.configure(api_key=settings.GOOGLE_API_KEY)
+            self.model = genai.GenerativeModel(settings.GEMINI_MODEL_NAME)
+            print(f"Gemini configurado: {settings.GEMINI_MODEL_NAME}")
+        
+        # Límites de cuota, reintentos, timeouts y deduplicación
+        self.client = LLMClient(self.model, **client_options)
 
     def generate_response(
         self, 
         context: str, 
         question: str, 
-        history: List[ConversationMessage]
+        history: List[ConversationMessage],
+        session_id: Optional[str] = None,
+        document_id: Optional[str] = None,
+        memory: Optional[List[str]] = None
     ) -> str:
         """
         Genera una respuesta usando Gemini basándose en el contexto y el historial
@@ -30,19 +51,55 @@ class AIService:
         Args:
             context: Fragmentos del PDF relevantes
             question: Pregunta actual del usuario
-            history: Historial de conversación
+            history: Historial de conversación (mensajes recientes)
+            session_id: Sesión a la que se imputa el consumo de tokens
+            document_id: Documento consultado (hash) para la contabilidad
+            memory: Turnos antiguos relevantes recuperados de la memoria de largo plazo
             
         Returns:
             Respuesta generada por Gemini
         """
-        # Formatear el historial
-        chat_history_formatted = self._format_history(history)
-        
-        # Crear el prompt
-        prompt = self._build_prompt(context, question, chat_history_formatted)
+        with tracer.span("prompt_build", history_messages=len(history), memory_turns=len(memory or [])) as span:
+            # Formatear el historial
+            chat_history_formatted = self._format_history(history)
+            
+            # Crear el prompt
+            prompt = self._build_prompt(context, question, chat_history_formatted, "\n\n".join(memory or []))
+            span["tokens"] = estimate_tokens(prompt)
         
         # Generar respuesta
-        response = self.model.generate_content(prompt)
+        return self._generate(prompt, "answer", session_id=session_id, document_id=document_id)
+    
+    def _generate(
+        self,
+        prompt: str,
+        operation: str,
+        session_id: Optional[str] = None,
+        document_id: Optional[str] = None,
+        feed_url: Optional[str] = None
+    ) -> str:
+        """
+        Envía el prompt al modelo a través del cliente (que registra el consumo)
+        
+        Args:
+            prompt: Prompt completo
+            operation: Tipo de llamada ("answer", "simple", "rss_analysis")
+            session_id, document_id, feed_url: Ámbito al que se imputan los tokens
+            
+        Returns:
+            Texto de la respuesta
+            
+        Raises:
+            LLMError: Si el modelo falla tras los reintentos
+        """
+        with tracer.span("llm_generation", operation=operation, bytes=len(prompt)) as span:
+            response = self.client.generate(
+                prompt, operation, session_id=session_id, document_id=document_id, feed_url=feed_url
+            )
+            
+            prompt_tokens, completion_tokens, _ = extract_usage(prompt, response)
+            span["prompt_tokens"] = prompt_tokens
+            span["completion_tokens"] = completion_tokens
         
         return response.text
 
@@ -65,7 +122,7 @@ class AIService:
         
         return formatted
 
-    def _build_prompt(self, context: str, question: str, history: str) -> str:
+    def _build_prompt(self, context: str, question: str, history: str, memory: str = "") -> str:
         """
         Construye el prompt completo para Gemini
         
@@ -73,14 +130,20 @@ class AIService:
             context: Contexto del PDF
             question: Pregunta actual
             history: Historial formateado
+            memory: Turnos antiguos relevantes (se omite la sección si está vacío)
             
         Returns:
             Prompt completo
         """
+        memory_section = f"""
+PARTES ANTERIORES DE LA CONVERSACIÓN RELACIONADAS CON LA PREGUNTA:
+{memory}
+""" if memory else ""
+        
         prompt = f"""
 Eres un asistente que responde basándose en el contexto del PDF y en el historial de nuestra charla.
 Si la respuesta no está en el contexto, indícalo claramente.
-
+{memory_section}
 HISTORIAL DE LA CONVERSACIÓN:
 {history}
 
@@ -98,22 +161,55 @@ Instrucciones:
 """
         return prompt
 
-    def generate_simple_response(self, prompt: str) -> str:
+    def generate_simple_response(self, prompt: str, session_id: Optional[str] = None) -> str:
         """
         Genera una respuesta simple sin contexto ni historial
         
         Args:
             prompt: Pregunta o instrucción directa
+            session_id: Sesión a la que se imputa el consumo de tokens
             
         Returns:
             Respuesta generada
         """
-        response = self.model.generate_content(prompt)
-        return response.text
+        return self._generate(prompt, "simple", session_id=session_id)
+
+    def generate_news_answer(self, context: str, question: str, session_id: Optional[str] = None) -> str:
+        """
+        Responde una pregunta usando las noticias guardadas más relevantes
+        
+        Args:
+            context: Noticias recuperadas del índice
+            question: Pregunta del usuario
+            session_id: Sesión a la que se imputa el consumo de tokens
+        """
+        prompt = f"""
+Eres un asistente que responde preguntas sobre noticias recientes.
+Usa sólo las noticias del contexto; si no alcanzan para responder, indícalo claramente.
 
-    def generate_rss_analysis(self, rss_text: str) -> str:
+NOTICIAS:
+{context}
+
+PREGUNTA:
+{question}
+
+Responde de forma clara y concisa, mencionando de qué noticias sale la información.
+"""
+        return self._generate(prompt, "news_answer", session_id=session_id)
+
+    def generate_rss_analysis(
+        self,
+        rss_text: str,
+        session_id: Optional[str] = None,
+        feed_url: Optional[str] = None
+    ) -> str:
         """
         Analiza contenido RSS y genera un resumen estructurado
+        
+        Args:
+            rss_text: Entradas del feed formateadas
+            session_id: Sesión a la que se imputa el consumo de tokens
+            feed_url: Feed analizado, para la contabilidad por feed
         """
         prompt = f"""
 Analiza el siguiente contenido RSS y genera:
@@ -126,5 +222,67 @@ Contenido:
 
 Responde en formato claro y estructurado.
 """
-        response = self.model.generate_content(prompt)
-        return response.text
+        return self._generate(prompt, "rss_analysis", session_id=session_id, feed_url=feed_url)
+
+    def generate_rss_batch_summary(
+        self,
+        rss_text: str,
+        session_id: Optional[str] = None,
+        feed_url: Optional[str] = None
+    ) -> str:
+        """
+        Resume un lote de entradas RSS (etapa "map" del resumen jerárquico)
+        
+        Args:
+            rss_text: Entradas del lote formateadas
+            session_id: Sesión a la que se imputa el consumo de tokens
+            feed_url: Feed analizado, para la contabilidad por feed
+        """
+        prompt = f"""
+Resume las siguientes noticias en un máximo de 5 viñetas breves.
+Conserva nombres, cifras y fechas importantes; omite lo anecdótico.
+
+Noticias:
+{rss_text}
+"""
+        return self._generate(prompt, "rss_batch_summary", session_id=session_id, feed_url=feed_url)
+
+    def generate_rss_reduce(
+        self,
+        partial_summaries: List[str],
+        final: bool = True,
+        session_id: Optional[str] = None,
+        feed_url: Optional[str] = None
+    ) -> str:
+        """
+        Combina resúmenes parciales (etapa "reduce" del resumen jerárquico)
+        
+        Args:
+            partial_summaries: Resúmenes de cada lote
+            final: True = resultado final (resumen + 3 puntos); False = resumen intermedio
+            session_id: Sesión a la que se imputa el consumo de tokens
+            feed_url: Feed analizado, para la contabilidad por feed
+        """
+        summaries = "\n\n".join(f"Parte {i + 1}:\n{summary}" for i, summary in enumerate(partial_summaries))
+        
+        if not final:
+            prompt = f"""
+Combina los siguientes resúmenes parciales de noticias en un máximo de 5 viñetas, sin repetir información.
+
+{summaries}
+"""
+            return self._generate(prompt, "rss_reduce", session_id=session_id, feed_url=feed_url)
+        
+        prompt = f"""
+Los siguientes son resúmenes parciales de todas las entradas de un feed RSS.
+A partir de ellos genera:
+
+1) Un resumen general breve.
+2) Los 3 puntos más relevantes encontrados.
+
+Resúmenes parciales:
+{summaries}
+
+Responde en formato claro y estructurado.
+"""
+        return self._generate(prompt, "rss_analysis", session_id=session_id, feed_url=feed_url)
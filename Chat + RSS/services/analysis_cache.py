@@ -0,0 +1,98 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from config.settings import settings
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    key TEXT PRIMARY KEY,
+    analysis TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_expiry ON analyses (expires_at);
+"""
+
+
+class AnalysisCache:
+    """
+    Caché persistente (SQLite) de análisis de feeds con vencimiento
+
+    La clave es la huella de las entradas analizadas (GUID + fecha de cada
+    una, ver RSSService.fingerprint) junto con el modo y el modelo; si el
+    feed no cambió, el análisis se devuelve sin llamar al LLM, incluso
+    después de reiniciar la app. Las entradas vencidas se borran al
+    escribir.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            db_path: Base SQLite (usa settings.RSS_ANALYSIS_CACHE_PATH)
+            ttl_seconds: Vigencia de cada análisis (usa settings.RSS_ANALYSIS_CACHE_TTL_SECONDS)
+            clock: Reloj (inyectable en pruebas)
+        """
+        self.db_path = db_path or settings.RSS_ANALYSIS_CACHE_PATH
+        self.ttl_seconds = ttl_seconds or settings.RSS_ANALYSIS_CACHE_TTL_SECONDS
+        self.clock = clock
+
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        """
+        Clave de caché a partir de sus componentes (modo, modelo, huella...)
+        """
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Análisis guardado y vigente, o None
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT analysis FROM analyses WHERE key = ? AND expires_at > ?", (key, self.clock())
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            return row[0]
+
+    def put(self, key: str, analysis: str) -> None:
+        now = self.clock()
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM analyses WHERE expires_at <= ?", (now,))
+            self._db.execute(
+                "INSERT OR REPLACE INTO analyses (key, analysis, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, analysis, now, now + self.ttl_seconds)
+            )
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute(
+                "SELECT COUNT(*) FROM analyses WHERE expires_at > ?", (self.clock(),)
+            ).fetchone()[0]
+            lookups = self._hits + self._misses
+            return {
+                "entries": entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0
+            }
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,248 @@
+import hashlib
+import ipaddress
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from urllib.request import HTTPRedirectHandler, Request, build_opener
+
+from models.feed import FeedEntry
+from config.settings import settings
+from services.article_extractor import extract_article
+from services.feed_fetcher import DeadlineStream, time_left
+from services.tracing_service import tracer
+
+
+class ArticleEnricher:
+    """
+    Completa las entradas de un feed con el texto del artículo enlazado
+
+    Las páginas se descargan en paralelo (RSS_ARTICLE_WORKERS) respetando
+    a cada sitio: como mucho RSS_ARTICLE_PER_DOMAIN descargas simultáneas
+    por dominio y RSS_ARTICLE_DOMAIN_DELAY_SECONDS entre el inicio de una y
+    la siguiente. El texto principal se extrae con extract_article y se
+    guarda en disco por URL, así cada artículo se descarga una sola vez.
+    Un artículo que falla (descarga, extracción) deja la entrada como
+    estaba. RSS_ARTICLE_TIMEOUT_SECONDS es un plazo total por página
+    (conexión y lectura), no por operación del socket.
+
+    Los enlaces vienen de feeds de terceros: sólo se siguen URLs http(s)
+    hacia direcciones públicas (también en cada redirección), así un feed
+    no puede hacer leer archivos locales ni servicios de la red interna.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        workers: Optional[int] = None,
+        per_domain: Optional[int] = None,
+        domain_delay: Optional[float] = None,
+        timeout: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        allow_private_hosts: Optional[bool] = None
+    ):
+        """
+        Args:
+            cache_dir: Carpeta de la caché (usa settings.RSS_ARTICLE_CACHE_DIR; "" = sin caché)
+            workers: Descargas simultáneas en total (usa settings.RSS_ARTICLE_WORKERS)
+            per_domain: Descargas simultáneas por dominio (usa settings.RSS_ARTICLE_PER_DOMAIN)
+            domain_delay: Segundos entre descargas al mismo dominio (usa settings.RSS_ARTICLE_DOMAIN_DELAY_SECONDS)
+            timeout: Segundos máximos por página (usa settings.RSS_ARTICLE_TIMEOUT_SECONDS)
+            max_bytes: Bytes máximos leídos de cada página (usa settings.RSS_ARTICLE_MAX_BYTES)
+            allow_private_hosts: Permite hosts locales o privados (usa settings.RSS_ARTICLE_ALLOW_PRIVATE_HOSTS)
+        """
+        self.cache_dir = settings.RSS_ARTICLE_CACHE_DIR if cache_dir is None else cache_dir
+        self.workers = workers or settings.RSS_ARTICLE_WORKERS
+        self.per_domain = per_domain or settings.RSS_ARTICLE_PER_DOMAIN
+        self.domain_delay = settings.RSS_ARTICLE_DOMAIN_DELAY_SECONDS if domain_delay is None else domain_delay
+        self.timeout = timeout or settings.RSS_ARTICLE_TIMEOUT_SECONDS
+        self.max_bytes = max_bytes or settings.RSS_ARTICLE_MAX_BYTES
+        self.allow_private_hosts = (
+            settings.RSS_ARTICLE_ALLOW_PRIVATE_HOSTS if allow_private_hosts is None else allow_private_hosts
+        )
+        self._opener = build_opener(_CheckedRedirectHandler(self))
+
+        self._domain_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._domain_next: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stats = {"downloaded": 0, "cache_hits": 0, "failures": 0, "bytes": 0}
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    # -------------------------
+    # API PÚBLICA
+    # -------------------------
+
+    def enrich(self, entries: List[FeedEntry]) -> List[FeedEntry]:
+        """
+        Agrega el texto del artículo (`content`) a cada entrada con enlace
+
+        Args:
+            entries: Entradas del feed
+
+        Returns:
+            Entradas nuevas en el mismo orden (las originales no se modifican)
+        """
+        links = [entry.link for entry in entries if entry.link]
+        if not links:
+            return list(entries)
+
+        with tracer.span("article_enrichment", articles=len(links)) as span:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(links)), thread_name_prefix="article") as executor:
+                texts = dict(zip(links, executor.map(self.fetch_text, links)))
+            span["enriched"] = sum(1 for text in texts.values() if text)
+
+        return [
+            replace(entry, content=texts[entry.link]) if texts.get(entry.link) else entry
+            for entry in entries
+        ]
+
+    def fetch_text(self, url: str) -> str:
+        """
+        Texto principal del artículo (desde la caché si ya se descargó)
+
+        Returns:
+            Texto extraído; "" si la página no se pudo descargar
+        """
+        cached = self._load_cache(url)
+        if cached is not None:
+            with self._lock:
+                self._stats["cache_hits"] += 1
+            return cached
+
+        try:
+            with self._polite(url):
+                html, size = self._download(url)
+            text = extract_article(html)
+        except Exception as e:
+            print(f"No se pudo obtener el artículo {url}: {type(e).__name__}: {e}")
+            with self._lock:
+                self._stats["failures"] += 1
+            return ""
+
+        try:
+            self._save_cache(url, text)
+        except OSError as e:
+            # Sin caché el artículo se vuelve a descargar la próxima vez, pero el texto sirve
+            print(f"No se pudo guardar en caché el artículo {url}: {e}")
+
+        with self._lock:
+            self._stats["downloaded"] += 1
+            self._stats["bytes"] += size
+        return text
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    # -------------------------
+    # DESCARGA
+    # -------------------------
+
+    @contextmanager
+    def _polite(self, url: str):
+        """
+        Limita las descargas simultáneas por dominio y espacia su inicio
+        """
+        domain = urlparse(url).netloc.lower()
+        with self._lock:
+            if domain not in self._domain_limits:
+                self._domain_limits[domain] = threading.BoundedSemaphore(self.per_domain)
+            limit = self._domain_limits[domain]
+
+        with limit:
+            # Cada descarga reserva su turno; así dos hilos nunca esperan el mismo hueco
+            with self._lock:
+                now = time.monotonic()
+                start_at = max(now, self._domain_next.get(domain, 0.0))
+                self._domain_next[domain] = start_at + self.domain_delay
+            if start_at > now:
+                time.sleep(start_at - now)
+            yield
+
+    def check_url(self, url: str) -> None:
+        """
+        Valida que un enlace se pueda descargar
+
+        Raises:
+            ValueError: Si el esquema no es http(s) o el host resuelve a una
+                        dirección local, privada o reservada
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https"):
+            raise ValueError(f"esquema no permitido ({parsed.scheme or 'sin esquema'})")
+        if not parsed.hostname:
+            raise ValueError("URL sin host")
+        if self.allow_private_hosts:
+            return
+
+        try:
+            addresses = {info[4][0] for info in socket.getaddrinfo(parsed.hostname, parsed.port or None)}
+        except socket.gaierror as e:
+            raise ValueError(f"no se pudo resolver {parsed.hostname}: {e}") from e
+
+        for address in addresses:
+            ip = ipaddress.ip_address(address.split("%")[0])
+            if not ip.is_global:
+                raise ValueError(f"host no público ({parsed.hostname} -> {ip})")
+
+    def _download(self, url: str) -> tuple:
+        deadline = time.monotonic() + self.timeout
+        self.check_url(url)
+        request = Request(url, headers={"User-Agent": settings.FEED_USER_AGENT, "Accept": "text/html"})
+        with self._opener.open(request, timeout=time_left(deadline, self.timeout)) as response:
+            content_type = response.headers.get_content_type()
+            if content_type not in ("text/html", "application/xhtml+xml"):
+                raise ValueError(f"contenido no HTML ({content_type})")
+
+            # Las páginas enormes se cortan: el cuerpo de la nota suele estar al principio
+            data = DeadlineStream(response, deadline, self.timeout).read_all(self.max_bytes)
+            charset = response.headers.get_content_charset() or "utf-8"
+
+        return data.decode(charset, errors="replace"), len(data)
+
+    # -------------------------
+    # CACHÉ
+    # -------------------------
+
+    def _cache_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + ".json")
+
+    def _load_cache(self, url: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(url), encoding="utf-8") as f:
+                return json.load(f)["text"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_cache(self, url: str, text: str) -> None:
+        if not self.cache_dir:
+            return
+        # Escritura atómica: otro hilo o proceso nunca lee un JSON a medias
+        path = self._cache_path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "text": text, "fetched_at": time.time()}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+class _CheckedRedirectHandler(HTTPRedirectHandler):
+    """
+    Valida cada redirección con las mismas reglas que el enlace original
+    """
+
+    def __init__(self, enricher: ArticleEnricher):
+        self.enricher = enricher
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        self.enricher.check_url(newurl)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
@@ -0,0 +1,150 @@
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+from services.text_normalizer import html_to_text
+
+
+# Elementos que nunca contienen el cuerpo del artículo
+_SKIP_TAGS = {
+    "script", "style", "noscript", "iframe", "svg", "template", "form", "button",
+    "nav", "aside", "footer", "header", "figure"
+}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+_PARAGRAPH_TAGS = {"p", "pre", "blockquote"}
+
+# Pistas en class / id (mismas ideas que Readability)
+_NEGATIVE = re.compile(
+    r"comment|share|social|sidebar|footer|masthead|menu|promo|related|recommend|"
+    r"subscri|newsletter|advert|sponsor|cookie|banner|breadcrumb|popup|widget|\bads?\b",
+    re.IGNORECASE
+)
+_POSITIVE = re.compile(r"article|body|content|entry|main|post|story|text", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+# Párrafos más cortos no puntúan (pies de foto, botones, fechas...)
+MIN_PARAGRAPH_CHARS = 25
+# Párrafos con más de esta fracción de texto en enlaces se descartan
+MAX_LINK_DENSITY = 0.5
+
+
+class _ArticleParser(HTMLParser):
+    """
+    Recorre el HTML guardando cada párrafo con la cadena de elementos que lo contienen
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[Tuple[str, int]] = []  # (etiqueta, id de nodo)
+        self.weights: Dict[int, float] = {}
+        self.paragraphs: List[Tuple[str, float, Tuple[int, ...]]] = []  # (texto, densidad de enlaces, ancestros)
+        self._next_id = 0
+        self._skip_at: Optional[int] = None
+        self._parts: Optional[List[str]] = None
+        self._link_chars = 0
+        self._in_link = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _VOID_TAGS:
+            if tag == "br" and self._parts is not None:
+                self._parts.append(" ")
+            return
+
+        if tag == "p" and self.stack and self.stack[-1][0] == "p":
+            # <p> sin cerrar: el siguiente párrafo cierra el anterior
+            self.handle_endtag("p")
+        elif tag in _PARAGRAPH_TAGS:
+            # Párrafo dentro de <blockquote>: el texto previo queda como párrafo propio
+            self._close_paragraph()
+
+        node = self._next_id
+        self._next_id += 1
+        self.stack.append((tag, node))
+
+        hints = " ".join(value or "" for name, value in attrs if name in ("class", "id"))
+        negative = bool(_NEGATIVE.search(hints))
+        positive = bool(_POSITIVE.search(hints))
+        self.weights[node] = (25 if positive else 0) - (25 if negative else 0)
+
+        if self._skip_at is None and (tag in _SKIP_TAGS or (negative and not positive)):
+            self._skip_at = len(self.stack)
+        elif tag in _PARAGRAPH_TAGS and self._skip_at is None:
+            self._parts, self._link_chars = [], 0
+        elif tag == "a":
+            self._in_link += 1
+
+    def handle_endtag(self, tag):
+        if not any(open_tag == tag for open_tag, _ in self.stack):
+            return
+
+        while self.stack:
+            open_tag, _ = self.stack[-1]
+            if open_tag in _PARAGRAPH_TAGS:
+                self._close_paragraph()
+            self.stack.pop()
+            if open_tag == "a":
+                self._in_link = max(0, self._in_link - 1)
+            if self._skip_at is not None and len(self.stack) < self._skip_at:
+                self._skip_at = None
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self._parts is not None and self._skip_at is None:
+            self._parts.append(data)
+            if self._in_link:
+                self._link_chars += len(data.strip())
+
+    def _close_paragraph(self):
+        if self._parts is None:
+            return
+        text = _SPACES.sub(" ", "".join(self._parts)).strip()
+        self._parts = None
+        if text:
+            # El último elemento de la pila es el propio párrafo
+            ancestors = tuple(node for _, node in self.stack[:-1])
+            self.paragraphs.append((text, self._link_chars / len(text), ancestors))
+
+
+def extract_article(html: str) -> str:
+    """
+    Extrae el texto principal de una página de noticia
+
+    Versión reducida del algoritmo de Readability: cada párrafo suma
+    puntos (longitud y comas) a su contenedor y la mitad al contenedor de
+    éste; las pistas de class/id suman o restan, y se descartan menús,
+    pies de página, barras laterales y párrafos que son casi sólo
+    enlaces. Se devuelven los párrafos del contenedor con más puntos.
+
+    Args:
+        html: Página completa
+
+    Returns:
+        Texto del artículo (si no hay párrafos, el texto visible de la página)
+    """
+    parser = _ArticleParser()
+    parser.feed(html)
+    parser.close()
+    parser._close_paragraph()
+
+    paragraphs = [
+        (text, ancestors) for text, link_density, ancestors in parser.paragraphs
+        if link_density <= MAX_LINK_DENSITY
+    ]
+
+    scores: Dict[int, float] = {}
+    for text, ancestors in paragraphs:
+        if len(text) < MIN_PARAGRAPH_CHARS or not ancestors:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        for level, node in enumerate(reversed(ancestors[-2:])):
+            scores[node] = scores.get(node, parser.weights.get(node, 0)) + score / (level + 1)
+
+    if not scores:
+        return html_to_text(html)
+
+    best = max(scores, key=scores.get)
+    return "\n\n".join(
+        text for text, ancestors in paragraphs
+        if best in ancestors and len(text) >= MIN_PARAGRAPH_CHARS
+    )
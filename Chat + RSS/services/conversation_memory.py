@@ -0,0 +1,173 @@
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from config.settings import settings
+from services.conversation_service import ConversationService
+from services.embedding_service import EmbeddingService
+from services.tracing_service import tracer
+
+
+@dataclass
+class MemoryTurn:
+    """
+    Turno pasado (pregunta + respuesta) recuperado de la memoria
+    """
+    position: int  # Posición del primer mensaje del turno en la conversación
+    text: str
+    score: float = 0.0
+
+
+class ConversationMemory:
+    """
+    Memoria de largo plazo de una conversación
+
+    Cada turno (mensaje del usuario + respuesta) se convierte en un
+    embedding una sola vez, con el mismo EmbeddingService de los
+    documentos, y se guarda en una matriz en memoria. Al preguntar, sólo
+    los turnos antiguos más parecidos a la pregunta entran en el prompt, así
+    su tamaño no crece con la duración de la conversación.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        top_k: Optional[int] = None,
+        min_similarity: Optional[float] = None
+    ):
+        """
+        Args:
+            embedding_service: Servicio de embeddings compartido
+            top_k: Turnos a recuperar (usa settings.CONVERSATION_MEMORY_TOP_K)
+            min_similarity: Similitud coseno mínima (usa settings.CONVERSATION_MEMORY_MIN_SIMILARITY)
+        """
+        self.embedding_service = embedding_service
+        self.top_k = top_k or settings.CONVERSATION_MEMORY_TOP_K
+        self.min_similarity = (
+            settings.CONVERSATION_MEMORY_MIN_SIMILARITY if min_similarity is None else min_similarity
+        )
+
+        self._vectors: Optional[np.ndarray] = None  # Filas normalizadas; capacidad >= _size
+        self._size = 0
+        self._turns: List[MemoryTurn] = []
+        self._positions: List[int] = []
+        self._indexed_messages = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def sync(self, conversation: ConversationService) -> int:
+        """
+        Indexa los turnos de la conversación que todavía no están en memoria
+
+        Sólo se procesan los mensajes nuevos desde la última llamada; al
+        retomar una conversación, la primera llamada indexa todo el historial
+        en un único lote.
+
+        Args:
+            conversation: Conversación a indexar
+
+        Returns:
+            Número de turnos nuevos indexados
+        """
+        with self._lock:
+            if conversation.get_message_count() < self._indexed_messages:
+                # La conversación se limpió: se empieza de cero
+                self.reset()
+
+            messages = conversation.get_messages_since(self._indexed_messages)
+
+            turns = []
+            current: List[str] = []
+            start = self._indexed_messages
+            consumed = 0
+            for offset, message in enumerate(messages):
+                if message.role == "Usuario" and current:
+                    turns.append(MemoryTurn(position=start, text="\n".join(current)))
+                    start = self._indexed_messages + offset
+                    consumed = offset
+                    current = []
+                current.append(f"{message.role}: {message.content}")
+
+            # El último turno sólo se indexa si ya tiene respuesta
+            if current and len(current) > 1:
+                turns.append(MemoryTurn(position=start, text="\n".join(current)))
+                consumed = len(messages)
+
+            if not turns:
+                return 0
+
+            with tracer.span("memory_index", turns=len(turns)):
+                vectors = self.embedding_service.encode_array([turn.text for turn in turns])
+                self._append(vectors)
+
+            self._turns.extend(turns)
+            self._positions.extend(turn.position for turn in turns)
+            self._indexed_messages += consumed
+            return len(turns)
+
+    def _append(self, vectors: np.ndarray) -> None:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+
+        needed = self._size + len(vectors)
+        if self._vectors is None or needed > len(self._vectors):
+            # Crecimiento geométrico para que agregar turnos sea O(1) amortizado
+            capacity = max(needed, 2 * (len(self._vectors) if self._vectors is not None else 16))
+            grown = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+            if self._vectors is not None:
+                grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+
+        self._vectors[self._size:needed] = vectors
+        self._size = needed
+
+    def search(self, question: str, before_position: Optional[int] = None, k: Optional[int] = None) -> List[MemoryTurn]:
+        """
+        Recupera los turnos pasados más relacionados con la pregunta
+
+        Args:
+            question: Pregunta actual
+            before_position: Sólo turnos que empiezan antes de esta posición
+                             (para no repetir los que ya van en el historial reciente)
+            k: Turnos a devolver (usa self.top_k)
+
+        Returns:
+            Turnos en orden cronológico
+        """
+        k = k or self.top_k
+
+        with self._lock:
+            limit = self._size
+            if before_position is not None:
+                limit = bisect_left(self._positions, before_position)
+            if limit == 0:
+                return []
+            matrix = self._vectors[:limit]
+            turns = self._turns[:limit]
+
+        with tracer.span("memory_search", turns=limit) as span:
+            query = np.asarray(self.embedding_service.encode_text(question), dtype=np.float32)
+            query /= max(float(np.linalg.norm(query)), 1e-12)
+
+            scores = matrix @ query
+            best = np.argsort(-scores)[:k]
+            result = [
+                MemoryTurn(position=turns[i].position, text=turns[i].text, score=float(scores[i]))
+                for i in best
+                if scores[i] >= self.min_similarity
+            ]
+            span["recalled"] = len(result)
+
+        return sorted(result, key=lambda turn: turn.position)
+
+    def reset(self) -> None:
+        self._vectors = None
+        self._size = 0
+        self._turns = []
+        self._positions = []
+        self._indexed_messages = 0
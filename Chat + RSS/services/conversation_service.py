@@ -1,18 +1,105 @@
-from typing import List
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from itertools import islice
+from typing import List, Optional
+
 from models.document import ConversationMessage
+from config.settings import settings
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    document_hash TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    conversation_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (conversation_id, seq)
+);
+"""
 
 
 class ConversationService:
     """
     Servicio para manejar el historial de conversación
+    
+    Los mensajes recientes viven en un buffer circular de tamaño fijo
+    (CONVERSATION_MAX_MESSAGES); todos los mensajes se guardan además en
+    SQLite, así los turnos antiguos salen de memoria sin perderse y una
+    conversación se puede retomar después de reiniciar la app.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        conversation_id: Optional[str] = None,
+        max_messages: Optional[int] = None,
+        db_path: Optional[str] = None,
+        persist: Optional[bool] = None
+    ):
         """
-        Inicializa el historial vacío
+        Inicializa el historial (vacío o retomado desde SQLite)
+        
+        Args:
+            conversation_id: Conversación a retomar (None = nueva)
+            max_messages: Mensajes en memoria (usa settings.CONVERSATION_MAX_MESSAGES)
+            db_path: Base SQLite (usa settings.CONVERSATION_DB_PATH)
+            persist: Si es False, no se usa SQLite y los mensajes antiguos se descartan
         """
-        self.history: List[ConversationMessage] = []
-        print("Servicio de conversación inicializado")
+        self.conversation_id = conversation_id or uuid.uuid4().hex
+        self.max_messages = max_messages or settings.CONVERSATION_MAX_MESSAGES
+        self.persist = settings.CONVERSATION_PERSIST if persist is None else persist
+        self.history: deque = deque(maxlen=self.max_messages)
+        self.document_hash: Optional[str] = None
+        self._count = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        
+        if self.persist:
+            # Streamlit ejecuta cada interacción en un hilo distinto
+            self._db = sqlite3.connect(db_path or settings.CONVERSATION_DB_PATH, check_same_thread=False)
+            self._db.executescript(_SCHEMA)
+            self._resume()
+        
+        print(f"Servicio de conversación inicializado ({self.conversation_id}, {self._count} mensajes)")
+    
+    def _resume(self) -> None:
+        """
+        Carga los últimos mensajes de la conversación si ya existía
+        """
+        row = self._db.execute(
+            "SELECT document_hash FROM conversations WHERE id = ?", (self.conversation_id,)
+        ).fetchone()
+        
+        if row is None:
+            now = time.time()
+            with self._db:
+                self._db.execute(
+                    "INSERT INTO conversations (id, document_hash, created_at, updated_at) VALUES (?, NULL, ?, ?)",
+                    (self.conversation_id, now, now)
+                )
+            return
+        
+        self.document_hash = row[0]
+        self._count = self._db.execute(
+            "SELECT COUNT(*) FROM messages WHERE conversation_id = ?", (self.conversation_id,)
+        ).fetchone()[0]
+        self.history.extend(self._query_last(self.max_messages))
+    
+    def _query_last(self, n: int) -> List[ConversationMessage]:
+        rows = self._db.execute(
+            "SELECT role, content FROM messages WHERE conversation_id = ? ORDER BY seq DESC LIMIT ?",
+            (self.conversation_id, n)
+        ).fetchall()
+        return [ConversationMessage(role=role, content=content) for role, content in reversed(rows)]
     
     def add_message(self, role: str, content: str) -> None:
         """
@@ -23,7 +110,30 @@ class ConversationService:
             content: Contenido del mensaje
         """
         message = ConversationMessage(role=role, content=content)
-        self.history.append(message)
+        
+        with self._lock:
+            # El deque descarta el mensaje más antiguo al llenarse
+            self.history.append(message)
+            
+            if self._db is None:
+                self._count += 1
+                return
+            
+            now = time.time()
+            with self._db:
+                # El número de secuencia sale de la base dentro de la misma escritura: otra
+                # pestaña u otro proceso con la misma conversación no puede repetirlo
+                self._db.execute(
+                    "INSERT INTO messages (conversation_id, seq, role, content, created_at) "
+                    "SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, ? FROM messages WHERE conversation_id = ?",
+                    (self.conversation_id, role, content, now, self.conversation_id)
+                )
+                self._count = self._db.execute(
+                    "SELECT MAX(seq) FROM messages WHERE conversation_id = ?", (self.conversation_id,)
+                ).fetchone()[0]
+                self._db.execute(
+                    "UPDATE conversations SET updated_at = ? WHERE id = ?", (now, self.conversation_id)
+                )
     
     def add_user_message(self, content: str) -> None:
         """
@@ -45,44 +155,124 @@ class ConversationService:
     
     def get_history(self) -> List[ConversationMessage]:
         """
-        Obtiene todo el historial
+        Obtiene el historial reciente (como mucho `max_messages` mensajes)
         
         Returns:
             Lista de mensajes
         """
-        return self.history
+        return list(self.history)
+    
+    def set_document(self, document_hash: Optional[str]) -> None:
+        """
+        Asocia la conversación a un documento; si cambia de documento, el historial se limpia
+        
+        Args:
+            document_hash: Hash del documento activo
+        """
+        if document_hash == self.document_hash:
+            return
+        
+        if self.document_hash is not None or self._count:
+            self.clear_history()
+        
+        self.document_hash = document_hash
+        if self._db is not None:
+            with self._db:
+                self._db.execute(
+                    "UPDATE conversations SET document_hash = ? WHERE id = ?", (document_hash, self.conversation_id)
+                )
     
     def clear_history(self) -> None:
         """
         Limpia todo el historial
         """
-        self.history = []
+        with self._lock:
+            self.history.clear()
+            self._count = 0
+            
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM messages WHERE conversation_id = ?", (self.conversation_id,))
+        
         print("Historial limpiado")
     
     def get_last_n_messages(self, n: int) -> List[ConversationMessage]:
         """
         Obtiene los últimos N mensajes
         
+        Recorre el buffer desde el final (O(n)); si se piden más mensajes de
+        los que hay en memoria, los lee de SQLite.
+        
         Args:
             n: Número de mensajes a obtener
             
         Returns:
             Lista de los últimos N mensajes
         """
-        return self.history[-n:] if len(self.history) >= n else self.history
+        if n <= 0:
+            return []
+        
+        with self._lock:
+            if n <= len(self.history) or self._db is None:
+                return list(islice(reversed(self.history), n))[::-1]
+            return self._query_last(n)
+    
+    def get_page(self, page: int = 0, page_size: int = 20) -> List[ConversationMessage]:
+        """
+        Obtiene una página del historial completo, del más reciente al más antiguo
+        
+        Args:
+            page: Número de página (0 = los mensajes más recientes)
+            page_size: Mensajes por página
+        
+        Returns:
+            Mensajes de la página en orden cronológico
+        """
+        with self._lock:
+            if self._db is None:
+                end = len(self.history) - page * page_size
+                return list(self.history)[max(0, end - page_size):max(0, end)]
+            
+            rows = self._db.execute(
+                "SELECT role, content FROM messages WHERE conversation_id = ? "
+                "ORDER BY seq DESC LIMIT ? OFFSET ?",
+                (self.conversation_id, page_size, page * page_size)
+            ).fetchall()
+        
+        return [ConversationMessage(role=role, content=content) for role, content in reversed(rows)]
+    
+    def get_messages_since(self, start: int) -> List[ConversationMessage]:
+        """
+        Mensajes a partir de la posición `start` (0 = el primero), en orden cronológico
+        
+        Permite procesar el historial de forma incremental (por ejemplo, la
+        memoria de largo plazo sólo indexa lo que aún no vio). Sin SQLite
+        sólo están disponibles los mensajes que siguen en memoria.
+        """
+        with self._lock:
+            if self._db is None:
+                first_in_memory = self._count - len(self.history)
+                return list(self.history)[max(0, start - first_in_memory):]
+            
+            rows = self._db.execute(
+                "SELECT role, content FROM messages WHERE conversation_id = ? AND seq > ? ORDER BY seq",
+                (self.conversation_id, start)
+            ).fetchall()
+        
+        return [ConversationMessage(role=role, content=content) for role, content in rows]
     
     def get_message_count(self) -> int:
         """
-        Obtiene el número total de mensajes en el historial
+        Obtiene el número total de mensajes (incluidos los que ya salieron de memoria)
         
         Returns:
             Cantidad de mensajes
         """
-        return len(self.history)
+        return self._count
     
     def format_for_display(self) -> List[dict]:
         """
-        Formatea el historial para mostrarlo en Streamlit
+        Formatea el historial reciente para mostrarlo en Streamlit
         
         Returns:
             Lista de diccionarios con role y content
@@ -91,4 +281,8 @@ class ConversationService:
             {"role": msg.role, "content": msg.content}
             for msg in self.history
         ]
-
+    
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -1,21 +1,45 @@
-import chromadb
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
+
+import numpy as np
 
 from models.document import Document, Chunk, RetrievalResult
 from services.embedding_service import EmbeddingService
+from services.tracing_service import tracer
+from services.token_utils import estimate_tokens
 from config.settings import settings
 
+if TYPE_CHECKING:
+    from services.index_bundle import IndexBundle
+
 
 class DatabaseService:
     """
     Servicio para manejar ChromaDB (base de datos vectorial)
     """
     
-    def __init__(self, embedding_service: EmbeddingService):
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        persist_directory: Optional[str] = None,
+        collection_name: Optional[str] = None
+    ):
         """
         Inicializa el cliente de ChromaDB
+        
+        Args:
+            embedding_service: Servicio de embeddings
+            persist_directory: Carpeta para persistir la base (None = en memoria)
+            collection_name: Nombre de la colección (usa settings.COLLECTION_NAME por defecto)
         """
-        self.client = chromadb.Client()
+        self.collection_name = collection_name or settings.COLLECTION_NAME
+        self.top_k = settings.RETRIEVAL_TOP_K
+        import chromadb
+        
+        persist_directory = persist_directory or settings.CHROMA_PERSIST_DIR
+        if persist_directory:
+            self.client = chromadb.PersistentClient(path=persist_directory)
+        else:
+            self.client = chromadb.Client()
         self.embedding_service = embedding_service
         self.collection = None
         print("Base de datos ChromaDB inicializada")
@@ -27,16 +51,11 @@ class DatabaseService:
         Args:
             document: Documento con sus chunks a almacenar
         """
-        # Eliminar colección anterior si existe
-        try:
-            self.client.delete_collection(settings.COLLECTION_NAME)
-            print(f"Colección anterior '{settings.COLLECTION_NAME}' eliminada")
-        except:
-            pass
+        self.reset_collection()
         
-        # Crear nueva colección
-        self.collection = self.client.create_collection(name=settings.COLLECTION_NAME)
-        print(f"Nueva colección '{settings.COLLECTION_NAME}' creada")
+        # Número de fragmentos según el perfil del tipo de documento
+        extension = document.file_name.split(".")[-1].lower()
+        self.top_k = settings.get_retrieval_profile(extension)["top_k"]
         
         # Preparar datos
         texts = [chunk.content for chunk in document.chunks]
@@ -56,23 +75,101 @@ class DatabaseService:
             for i, chunk in enumerate(document.chunks)
         ]
         
-        # Agregar a la colección
-        self.collection.add(
-            documents=texts,
-            embeddings=embeddings,
-            ids=chunk_ids,
-            metadatas=metadatas
-        )
+        self.add_chunks(texts, chunk_ids, embeddings, metadatas)
         
         print(f"Colección creada con {len(texts)} chunks")
     
+    def reset_collection(self) -> None:
+        """
+        Elimina la colección anterior (si existe) y crea una vacía
+        """
+        try:
+            self.client.delete_collection(self.collection_name)
+            print(f"Colección anterior '{self.collection_name}' eliminada")
+        except:
+            pass
+        
+        self.collection = self.client.create_collection(name=self.collection_name)
+        print(f"Nueva colección '{self.collection_name}' creada")
+    
+    def add_chunks(
+        self,
+        texts: List[str],
+        chunk_ids: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[dict]
+    ) -> None:
+        """
+        Agrega chunks ya vectorizados a la colección actual
+        
+        Args:
+            texts: Contenido de los chunks
+            chunk_ids: IDs únicos dentro de la colección
+            embeddings: Vectores de cada chunk
+            metadatas: Metadatos de cada chunk
+        """
+        if self.collection is None:
+            raise ValueError("No hay colección creada. Primero procesa un PDF.")
+        
+        if not texts:
+            return
+        
+        with tracer.span("index_add", chunks=len(texts), bytes=sum(len(t) for t in texts)):
+            self.collection.add(
+                documents=texts,
+                embeddings=embeddings,
+                ids=chunk_ids,
+                metadatas=metadatas
+            )
+    
+    def delete_chunks(self, chunk_ids: List[str]) -> None:
+        """
+        Quita chunks de la colección actual (los IDs que no existan se ignoran)
+        
+        Args:
+            chunk_ids: IDs de los chunks a quitar
+        """
+        if self.collection is None or not chunk_ids:
+            return
+        
+        self.collection.delete(ids=chunk_ids)
+    
+    @staticmethod
+    def document_chunk_entries(document: Document) -> tuple:
+        """
+        Prepara IDs y metadatos para guardar varios documentos en la misma colección
+        
+        Los IDs se prefijan con el hash del archivo para que no choquen
+        entre documentos distintos.
+        
+        Args:
+            document: Documento procesado
+            
+        Returns:
+            Tupla (textos, ids, metadatos)
+        """
+        prefix = document.file_hash[:12]
+        texts = [chunk.content for chunk in document.chunks]
+        chunk_ids = [f"{prefix}_{chunk.id}" for chunk in document.chunks]
+        metadatas = [
+            {
+                "chunk_index": i,
+                "start_index": chunk.start_index,
+                "chunk_size": chunk.size,
+                "file_name": document.file_name,
+                "file_hash": document.file_hash
+            }
+            for i, chunk in enumerate(document.chunks)
+        ]
+        return texts, chunk_ids, metadatas
+    
     def retrieve_context(self, query: str, k: Optional[int] = None) -> RetrievalResult:
         """
         Busca los chunks más relevantes para una pregunta
         
         Args:
             query: Pregunta del usuario
-            k: Número de chunks a recuperar (usa settings.RETRIEVAL_TOP_K por defecto)
+            k: Número de chunks a recuperar (por defecto el top_k del perfil del documento)
             
         Returns:
             RetrievalResult con los chunks encontrados
@@ -81,16 +178,18 @@ class DatabaseService:
             raise ValueError("No hay colección creada. Primero procesa un PDF.")
         
         if k is None:
-            k = settings.RETRIEVAL_TOP_K
+            k = self.top_k
         
         # Generar embedding de la pregunta
-        query_embedding = self.embedding_service.encode_text(query)
+        with tracer.span("query_embedding", bytes=len(query), tokens=estimate_tokens(query)):
+            query_embedding = self.embedding_service.encode_text(query)
         
         # Buscar en la colección
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=k
-        )
+        with tracer.span("vector_search", k=k):
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=k
+            )
         
         # Crear objeto RetrievalResult
         retrieval_result = RetrievalResult(
@@ -103,6 +202,84 @@ class DatabaseService:
         
         return retrieval_result
     
+    def export_data(self) -> dict:
+        """
+        Obtiene todo el contenido de la colección (para guardarlo en disco)
+        
+        Returns:
+            Diccionario con ids, documents, metadatas, embeddings (float32) y top_k
+        """
+        if self.collection is None:
+            raise ValueError("No hay colección creada. Primero procesa un PDF.")
+        
+        data = self.collection.get(include=["documents", "metadatas", "embeddings"])
+        return {
+            "ids": list(data["ids"]),
+            "documents": list(data["documents"]),
+            "metadatas": list(data["metadatas"]),
+            "embeddings": np.asarray(data["embeddings"], dtype=np.float32),
+            "top_k": self.top_k
+        }
+    
+    def import_data(self, data: dict) -> None:
+        """
+        Recrea la colección a partir de datos exportados (sin recalcular embeddings)
+        
+        Args:
+            data: Diccionario devuelto por export_data()
+        """
+        self.reset_collection()
+        self.top_k = data.get("top_k", self.top_k)
+        self.add_chunks(
+            data["documents"],
+            data["ids"],
+            np.asarray(data["embeddings"], dtype=np.float32).tolist(),
+            data["metadatas"]
+        )
+    
+    def load_bundle(self, bundle: "IndexBundle", batch_size: int = 1024) -> None:
+        """
+        Recrea la colección desde un paquete de índice (sin recalcular embeddings)
+        
+        Args:
+            bundle: Paquete abierto con IndexBundle.open()
+            batch_size: Chunks copiados a ChromaDB por lote
+            
+        Raises:
+            ValueError: Si el paquete se armó con otro modelo de embeddings u otro chunking
+        """
+        manifest = bundle.manifest
+        if manifest.embedding_model != settings.EMBEDDING_MODEL_NAME:
+            raise ValueError(
+                f"El paquete usa el modelo '{manifest.embedding_model}' "
+                f"y la app '{settings.EMBEDDING_MODEL_NAME}'"
+            )
+        
+        # Un paquete troceado con otros parámetros no daría los mismos chunks que procesar el archivo
+        profile = settings.get_retrieval_profile(manifest.file_name.split(".")[-1].lower())
+        if (manifest.chunk_size, manifest.chunk_overlap) != (profile["chunk_size"], profile["chunk_overlap"]):
+            raise ValueError(
+                f"El paquete usa chunks de {manifest.chunk_size}/{manifest.chunk_overlap} "
+                f"y el perfil actual {profile['chunk_size']}/{profile['chunk_overlap']}"
+            )
+        
+        self.reset_collection()
+        self.top_k = bundle.manifest.top_k
+        for texts, chunk_ids, embeddings, metadatas in bundle.iter_batches(batch_size):
+            self.add_chunks(texts, chunk_ids, embeddings.tolist(), metadatas)
+        
+        print(f"Colección cargada desde el paquete {bundle.path} ({len(bundle)} chunks)")
+    
+    def drop_collection(self) -> None:
+        """
+        Elimina la colección actual y libera su memoria
+        """
+        try:
+            self.client.delete_collection(self.collection_name)
+        except Exception:
+            pass
+        self.collection = None
+    
     def get_collection_info(self) -> dict:
         """
         Obtiene información sobre la colección actual
@@ -116,7 +293,7 @@ class DatabaseService:
         count = self.collection.count()
         return {
             "exists": True,
-            "name": settings.COLLECTION_NAME,
+            "name": self.collection_name,
             "total_chunks": count
         }
 
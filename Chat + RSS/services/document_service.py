@@ -1,8 +1,9 @@
 import hashlib
-from typing import List
+from typing import List, Optional
 from models.document import Document, Chunk
 from config.settings import settings
 from services.extractor_service import ExtractorService 
+from services.tracing_service import tracer
 
 class DocumentService:
     """
@@ -16,10 +17,17 @@ class DocumentService:
         # Crea una huella digital del archivo
         return hashlib.sha256(file.getvalue()).hexdigest()
 
-    def chunk_text(self, text: str) -> List[Chunk]:
-        # Divide el texto en pedazos
-        chunk_size = settings.CHUNK_SIZE
-        overlap = settings.CHUNK_OVERLAP
+    def chunk_text(
+        self,
+        text: str,
+        chunk_size: Optional[int] = None,
+        overlap: Optional[int] = None
+    ) -> List[Chunk]:
+        # Divide el texto en pedazos (por defecto usa CHUNK_SIZE / CHUNK_OVERLAP)
+        chunk_size = chunk_size or settings.CHUNK_SIZE
+        overlap = settings.CHUNK_OVERLAP if overlap is None else overlap
+        if overlap >= chunk_size:
+            raise ValueError("CHUNK_OVERLAP debe ser menor que CHUNK_SIZE")
         chunks = []
         start = 0
         chunk_id = 0
@@ -46,10 +54,14 @@ class DocumentService:
         file.seek(0)
         
         # 1. Extraer texto (usando el nuevo servicio)
-        full_text = self.extractor.extract_text(file, extension)
+        with tracer.span("extraction", bytes=len(file.getvalue()), format=extension):
+            full_text = self.extractor.extract_text(file, extension)
         
-        # 2. Trocear texto
-        chunks = self.chunk_text(full_text)
+        # 2. Trocear texto (con el perfil del tipo de documento)
+        profile = settings.get_retrieval_profile(extension)
+        with tracer.span("chunking", bytes=len(full_text)) as span:
+            chunks = self.chunk_text(full_text, profile["chunk_size"], profile["chunk_overlap"])
+            span["chunks"] = len(chunks)
         
         return Document(
             file_name=file_name,
@@ -0,0 +1,201 @@
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, InvalidStateError
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from config.settings import settings
+
+
+class EmbeddingBatcher:
+    """
+    Agrupa peticiones de embedding concurrentes en un solo lote
+
+    Cada llamada a `submit` encola un texto y devuelve un Future. Un hilo
+    de fondo junta las peticiones que llegan durante `max_wait_ms` (o hasta
+    `max_batch_size` textos), ejecuta un único forward del modelo y
+    resuelve los Futures con su vector. Por cada tamaño de lote guarda
+    cuántos lotes hubo y cuánto tardó el modelo, y además la espera media
+    de los textos en la cola.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None
+    ):
+        """
+        Args:
+            encode_fn: Función que convierte una lista de textos en una matriz
+            max_batch_size: Máximo de textos por lote (usa settings.EMBEDDING_COALESCE_MAX_BATCH)
+            max_wait_ms: Espera máxima para completar un lote (usa settings.EMBEDDING_COALESCE_MAX_WAIT_MS)
+        """
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size or settings.EMBEDDING_COALESCE_MAX_BATCH)
+        self.max_wait = (
+            max_wait_ms if max_wait_ms is not None else settings.EMBEDDING_COALESCE_MAX_WAIT_MS
+        ) / 1000.0
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._histogram: Counter = Counter()
+        self._encode_seconds: Counter = Counter()  # Tiempo del modelo acumulado por tamaño de lote
+        self._wait_seconds = 0.0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(self, text: str) -> Future:
+        """
+        Encola un texto para el próximo lote
+
+        Args:
+            text: Texto a convertir
+
+        Returns:
+            Future que se resuelve con el vector (lista de floats)
+        """
+        future: Future = Future()
+        # Bajo el lock: nada se encola después de la marca de cierre
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("El agrupador de embeddings está cerrado")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+            self._queue.put((text, future, time.monotonic()))
+        return future
+
+    def encode(self, text: str) -> List[float]:
+        """
+        Versión bloqueante de `submit`
+        """
+        return self.submit(text).result()
+
+    def get_histogram(self) -> Dict[int, int]:
+        """
+        Obtiene cuántos lotes se ejecutaron para cada tamaño de lote
+
+        Returns:
+            Diccionario {tamaño de lote: número de lotes}
+        """
+        with self._lock:
+            return dict(sorted(self._histogram.items()))
+
+    def get_stats(self) -> dict:
+        """
+        Resumen del agrupador: lotes, textos, tamaño medio de lote y latencias
+
+        Returns:
+            Diccionario con el histograma de tamaños, el tiempo medio del modelo
+            por tamaño de lote (ms) y la espera media en la cola (ms)
+        """
+        with self._lock:
+            histogram = dict(sorted(self._histogram.items()))
+            encode_seconds = dict(self._encode_seconds)
+            wait_seconds = self._wait_seconds
+        batches = sum(histogram.values())
+        items = sum(size * count for size, count in histogram.items())
+        return {
+            "batches": batches,
+            "items": items,
+            "mean_batch_size": items / batches if batches else 0.0,
+            "mean_wait_ms": round(wait_seconds / items * 1000, 2) if items else 0.0,
+            "histogram": histogram,
+            "encode_ms_by_size": {
+                size: round(encode_seconds[size] / count * 1000, 2) for size, count in histogram.items()
+            }
+        }
+
+    def close(self) -> None:
+        """
+        Detiene el hilo de fondo después de procesar lo pendiente
+        """
+        with self._lock:
+            self._closed = True
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._queue.put(None)
+        if thread is not None:
+            thread.join()
+
+    def _run(self) -> None:
+        """
+        Bucle del hilo de fondo: arma lotes y los ejecuta
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._fail_pending()
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._execute(batch)
+
+            if stop:
+                self._fail_pending()
+                return
+
+    def _fail_pending(self) -> None:
+        """
+        Rechaza lo que haya quedado en la cola después de la marca de cierre
+        """
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and item[1].set_running_or_notify_cancel():
+                self._resolve(item[1].set_exception, RuntimeError("El agrupador de embeddings está cerrado"))
+
+    def _execute(self, batch: list) -> None:
+        # Los futures cancelados por quien esperaba no se calculan
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        start = time.monotonic()
+        try:
+            embeddings = self.encode_fn([text for text, _, _ in batch])
+            if len(embeddings) != len(batch):
+                raise ValueError(f"Se esperaban {len(batch)} embeddings y llegaron {len(embeddings)}")
+            results = [embedding.tolist() for embedding in embeddings]
+        except Exception as e:
+            # Un lote fallido sólo afecta a sus futures: el hilo de fondo sigue vivo
+            for _, future, _ in batch:
+                self._resolve(future.set_exception, e)
+            return
+        finally:
+            with self._lock:
+                self._histogram[len(batch)] += 1
+                self._encode_seconds[len(batch)] += time.monotonic() - start
+                self._wait_seconds += sum(start - submitted for _, _, submitted in batch)
+
+        for (_, future, _), result in zip(batch, results):
+            self._resolve(future.set_result, result)
+
+    @staticmethod
+    def _resolve(setter, value) -> None:
+        try:
+            setter(value)
+        except InvalidStateError:
+            pass
@@ -0,0 +1,104 @@
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from config.settings import settings
+
+
+# Modelo cargado en cada proceso del pool (uno por proceso)
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int) -> None:
+    """
+    Carga una copia del modelo en el proceso hijo
+    """
+    global _worker_model
+
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+
+    from sentence_transformers import SentenceTransformer
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+
+
+def _encode_worker(texts: List[str], batch_size: int) -> np.ndarray:
+    """
+    Genera los embeddings de una porción de textos en el proceso hijo
+    """
+    embeddings = _worker_model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+class EmbeddingPool:
+    """
+    Pool de procesos donde cada worker mantiene su propia copia del modelo
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        model_name: Optional[str] = None,
+        threads_per_worker: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        """
+        Args:
+            workers: Número de procesos
+            model_name: Modelo a cargar (usa settings.EMBEDDING_MODEL_NAME por defecto)
+            threads_per_worker: Hilos intra-op de cada proceso (por defecto reparte los núcleos)
+            batch_size: Tamaño de lote interno del modelo
+        """
+        self.workers = max(1, workers)
+        self.model_name = model_name or settings.EMBEDDING_MODEL_NAME
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+
+        if threads_per_worker is None:
+            threads_per_worker = max(1, (multiprocessing.cpu_count() or 1) // self.workers)
+        self.threads_per_worker = threads_per_worker
+
+        # "spawn" evita heredar el estado de hilos de torch del proceso padre
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.threads_per_worker)
+        )
+        print(f"Pool de embeddings iniciado: {self.workers} procesos x {self.threads_per_worker} hilos")
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Reparte los textos entre los procesos y une el resultado
+
+        Args:
+            texts: Lista de textos a convertir
+
+        Returns:
+            Matriz float32 contigua (len(texts) x dimensión) en el orden original
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        # Varias porciones por worker para balancear la carga
+        slice_size = max(self.batch_size, math.ceil(len(texts) / (self.workers * 4)))
+        slices = [texts[i:i + slice_size] for i in range(0, len(texts), slice_size)]
+
+        result = None
+        offset = 0
+        for part in self.executor.map(_encode_worker, slices, [self.batch_size] * len(slices)):
+            if result is None:
+                result = np.empty((len(texts), part.shape[1]), dtype=np.float32)
+            result[offset:offset + len(part)] = part
+            offset += len(part)
+
+        return result
+
+    def close(self) -> None:
+        """
+        Detiene los procesos del pool
+        """
+        self.executor.shutdown(wait=True)
@@ -1,8 +1,11 @@
-from sentence_transformers import SentenceTransformer
-from typing import List
+import threading
+from typing import List, Optional
 import numpy as np
 
 from config.settings import settings
+from services.embedding_pool import EmbeddingPool
+from services.embedding_batcher import EmbeddingBatcher
+from services.tracing_service import tracer
 
 
 class EmbeddingService:
@@ -10,12 +13,84 @@ class EmbeddingService:
     Servicio para generar embeddings (vectores) de texto
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        threads: Optional[int] = None,
+        coalesce: Optional[bool] = None,
+        background: Optional[bool] = None
+    ):
         """
         Inicializa el modelo de embeddings
+        
+        Con background=True el modelo se carga y se calienta (una codificación
+        de prueba) en un hilo aparte; el primer uso real espera a que termine.
+        
+        Args:
+            workers: Procesos para lotes grandes (usa settings.EMBEDDING_WORKERS por defecto)
+            batch_size: Tamaño de lote del modelo (usa settings.EMBEDDING_BATCH_SIZE)
+            threads: Hilos intra-op de este proceso (usa settings.EMBEDDING_THREADS, 0 = por defecto)
+            coalesce: Agrupar consultas concurrentes de encode_text (usa settings.EMBEDDING_COALESCE)
+            background: Cargar el modelo en segundo plano (usa settings.EMBEDDING_BACKGROUND_LOAD)
+        """
+        self.workers = workers if workers is not None else settings.EMBEDDING_WORKERS
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        self.threads = threads if threads is not None else settings.EMBEDDING_THREADS
+        self.pool: Optional[EmbeddingPool] = None
+        
+        coalesce = settings.EMBEDDING_COALESCE if coalesce is None else coalesce
+        self.batcher = EmbeddingBatcher(self._encode_queries) if coalesce else None
+        
+        self._model = None
+        self._load_error: Optional[BaseException] = None
+        self._ready = threading.Event()
+        
+        background = settings.EMBEDDING_BACKGROUND_LOAD if background is None else background
+        if background:
+            threading.Thread(target=self._load_model, name="embedding-warmup", daemon=True).start()
+        else:
+            self._load_model()
+    
+    def _load_model(self) -> None:
+        """
+        Importa sentence_transformers, carga el modelo y lo calienta
+        """
+        try:
+            with tracer.span("model_load"):
+                if self.threads:
+                    import torch
+                    torch.set_num_threads(self.threads)
+                
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+                
+                # Primera codificación: paga las inicializaciones perezosas aquí
+                model.encode(["calentamiento del modelo"])
+            
+            self._model = model
+            print(f" Modelo de embeddings cargado: {settings.EMBEDDING_MODEL_NAME}")
+        except BaseException as e:
+            self._load_error = e
+            print(f"Error cargando el modelo de embeddings: {e}")
+        finally:
+            self._ready.set()
+    
+    @property
+    def model(self):
+        """
+        Modelo de SentenceTransformer (espera a la carga en segundo plano)
+        """
+        self._ready.wait()
+        if self._load_error is not None:
+            raise RuntimeError("No se pudo cargar el modelo de embeddings") from self._load_error
+        return self._model
+    
+    def is_ready(self) -> bool:
         """
-        self.model = SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
-        print(f" Modelo de embeddings cargado: {settings.EMBEDDING_MODEL_NAME}")
+        Indica si el modelo ya está cargado (sin bloquear)
+        """
+        return self._ready.is_set() and self._load_error is None
     
     def encode_text(self, text: str) -> List[float]:
         """
@@ -27,9 +102,32 @@ class EmbeddingService:
         Returns:
             Lista de números (vector)
         """
+        if self.batcher is not None:
+            # Se agrupa con las consultas de otras sesiones/hilos
+            return self.batcher.encode(text)
+        
         embedding = self.model.encode([text])
         return embedding[0].tolist()
     
+    def _encode_queries(self, texts: List[str]) -> np.ndarray:
+        """
+        Ejecuta un lote de consultas agrupadas en un solo forward
+        """
+        embeddings = self.model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+        return np.asarray(embeddings, dtype=np.float32)
+    
+    def get_batching_stats(self) -> dict:
+        """
+        Histograma de tamaños de lote y latencias del agrupador de consultas
+        
+        Returns:
+            Diccionario con lotes, consultas, tamaño medio, histograma y latencias
+        """
+        if self.batcher is None:
+            return {"enabled": False}
+        
+        return {"enabled": True, **self.batcher.get_stats()}
+    
     def encode_batch(self, texts: List[str]) -> List[List[float]]:
         """
         Convierte múltiples textos en vectores (más eficiente)
@@ -40,8 +138,41 @@ class EmbeddingService:
         Returns:
             Lista de vectores
         """
-        embeddings = self.model.encode(texts)
-        return embeddings.tolist()
+        return self.encode_array(texts).tolist()
+    
+    def encode_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Convierte múltiples textos en una matriz contigua float32
+        
+        Con workers > 1 y suficientes textos, los lotes se reparten
+        entre procesos que tienen cada uno su copia del modelo.
+        
+        Args:
+            texts: Lista de textos a convertir
+            
+        Returns:
+            Matriz (len(texts) x dimensión) en float32
+        """
+        with tracer.span("embedding", chunks=len(texts), bytes=sum(len(t) for t in texts)):
+            if self.workers > 1 and len(texts) >= settings.EMBEDDING_POOL_MIN_TEXTS:
+                if self.pool is None:
+                    self.pool = EmbeddingPool(self.workers, batch_size=self.batch_size)
+                return self.pool.encode(texts)
+            
+            embeddings = self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True)
+            return np.ascontiguousarray(embeddings, dtype=np.float32)
+    
+    def close(self) -> None:
+        """
+        Libera el pool de procesos y el hilo del agrupador
+        """
+        if self.batcher is not None:
+            self.batcher.close()
+            self.batcher = None
+        
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
     
     def calculate_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """
@@ -67,6 +198,7 @@ class EmbeddingService:
 ##- **`__init__()`**: Carga el modelo de embeddings al iniciar
 ##- **`encode_text()`**: Convierte 1 texto en vector
 ##- **`encode_batch()`**: Convierte muchos textos de una vez (más rápido)
+##- **`encode_array()`**: Igual que `encode_batch()` pero devuelve una matriz float32 (y usa varios procesos si se configuran)
 ##- **`calculate_similarity()`**: Calcula qué tan parecidos son dos textos
 
 
@@ -1,24 +1,25 @@
-import pandas as pd
-from docx import Document as DocxReader
-from pypdf import PdfReader
-import io
-
 class ExtractorService:
     """
     Clase especializada en extraer texto de diferentes formatos.
+    
+    Las librerías de cada formato se importan al usarse por primera vez
+    para no cargarlas todas al arrancar la app.
     """
     @staticmethod
     def extract_text(file, extension: str) -> str:
         if extension == "pdf":
+            from pypdf import PdfReader
             reader = PdfReader(file)
             return "\n".join([page.extract_text() for page in reader.pages if page.extract_text()])
         
         elif extension == "docx":
+            from docx import Document as DocxReader
             doc = DocxReader(file)
             return "\n".join([para.text for para in doc.paragraphs])
         
         elif extension == "xlsx":
             # Convertimos el Excel a un formato de texto legible (CSV tabulado)
+            import pandas as pd
             df_dict = pd.read_excel(file, sheet_name=None)
             full_text = ""
             for sheet_name, df in df_dict.items():
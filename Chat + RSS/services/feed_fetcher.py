@@ -0,0 +1,277 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
+
+from models.feed import FeedEntry, FeedResult
+from config.settings import settings
+from services.feed_parser import parse_stream
+from services.tracing_service import tracer
+
+
+# Tamaño de cada lectura cuando se lee hasta el final
+_READ_CHUNK = 64 * 1024
+
+
+def time_left(deadline: float, timeout: float) -> float:
+    """
+    Segundos que quedan de un plazo total (time.monotonic())
+
+    Raises:
+        TimeoutError: Si el plazo ya venció
+    """
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError(f"La descarga no terminó en {timeout}s")
+    return remaining
+
+
+class DeadlineStream:
+    """
+    Respuesta HTTP que deja de leerse al vencer un plazo total
+
+    El timeout de urlopen acota cada operación del socket; un servidor que
+    envía de a poco nunca lo dispara. Aquí cada lectura usa read1 (devuelve
+    lo que ya llegó en vez de esperar `size` bytes) y el plazo se revisa
+    antes y después, también al leer hasta el final.
+    """
+
+    def __init__(self, response, deadline: float, timeout: float):
+        self.response = response
+        self.deadline = deadline
+        self.timeout = timeout
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size <= 0:
+            return self.read_all()
+
+        time_left(self.deadline, self.timeout)
+        data = self.response.read1(size)
+        time_left(self.deadline, self.timeout)
+        return data
+
+    def read_all(self, limit: Optional[int] = None) -> bytes:
+        """
+        Lee hasta el final (o hasta `limit` bytes) de a trozos, revisando el plazo en cada uno
+        """
+        parts = []
+        received = 0
+        while limit is None or received < limit:
+            size = _READ_CHUNK if limit is None else min(_READ_CHUNK, limit - received)
+            data = self.read(size)
+            if not data:
+                break
+            parts.append(data)
+            received += len(data)
+        return b"".join(parts)
+
+
+class FeedFetcher:
+    """
+    Descarga concurrente de feeds con GET condicional
+
+    Los feeds se descargan en un pool de hilos con un límite de conexiones
+    por host y se parsean mientras llegan (StreamingFeedParser), así con
+    `max_entries` se deja de descargar en cuanto hay suficientes entradas.
+    Cada respuesta guarda su ETag / Last-Modified y las entradas parseadas
+    en una caché en disco; la siguiente descarga envía
+    If-None-Match / If-Modified-Since y, si el servidor responde 304, se
+    reutilizan las entradas sin volver a parsear. Un feed que falla o
+    excede su timeout se reporta en su FeedResult sin afectar al resto.
+
+    El timeout es un plazo total por feed: cuenta la espera por el límite
+    del host, la conexión y toda la lectura (el timeout de urlopen sólo
+    acota cada operación del socket, y un servidor que envía de a poco
+    nunca lo dispararía).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        workers: Optional[int] = None,
+        per_host: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            cache_dir: Carpeta de la caché (usa settings.FEED_CACHE_DIR; "" = sin caché)
+            workers: Descargas simultáneas en total (usa settings.FEED_FETCH_WORKERS)
+            per_host: Descargas simultáneas por host (usa settings.FEED_PER_HOST_LIMIT)
+            timeout: Plazo total por feed en segundos (usa settings.FEED_TIMEOUT_SECONDS)
+        """
+        self.cache_dir = settings.FEED_CACHE_DIR if cache_dir is None else cache_dir
+        self.workers = workers or settings.FEED_FETCH_WORKERS
+        self.per_host = per_host or settings.FEED_PER_HOST_LIMIT
+        self.timeout = timeout or settings.FEED_TIMEOUT_SECONDS
+
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    # -------------------------
+    # API PÚBLICA
+    # -------------------------
+
+    def fetch(self, url: str, max_entries: Optional[int] = None) -> FeedResult:
+        """
+        Descarga un feed (usando la caché si el servidor responde 304)
+
+        Args:
+            url: URL del feed
+            max_entries: Entradas a leer (None = todas)
+
+        Returns:
+            FeedResult; nunca lanza excepciones de red o parseo
+        """
+        start = time.perf_counter()
+
+        with tracer.span("feed_fetch") as span:
+            try:
+                result = self._fetch(url, max_entries)
+            except Exception as e:
+                result = FeedResult(url=url, status="error", error=f"{type(e).__name__}: {e}")
+                if isinstance(e, HTTPError):
+                    result.http_status = e.code
+
+            result.elapsed_seconds = time.perf_counter() - start
+            span["bytes"] = result.bytes_downloaded
+            span["entries"] = len(result.entries)
+            span["cache_hit"] = result.status == "not_modified"
+
+        return result
+
+    def fetch_many(self, urls: List[str], max_entries: Optional[int] = None) -> List[FeedResult]:
+        """
+        Descarga varios feeds en paralelo
+
+        Args:
+            urls: URLs de los feeds
+            max_entries: Entradas a leer de cada feed (None = todas)
+
+        Returns:
+            Un FeedResult por URL, en el mismo orden
+        """
+        if not urls:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(urls)), thread_name_prefix="feed") as executor:
+            return list(executor.map(lambda url: self.fetch(url, max_entries), urls))
+
+    # -------------------------
+    # DESCARGA
+    # -------------------------
+
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._host_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def _fetch(self, url: str, max_entries: Optional[int]) -> FeedResult:
+        deadline = time.monotonic() + self.timeout
+        cached = self._load_cache(url)
+        # Una caché parcial (leída con un max_entries menor) no sirve para un 304
+        if cached and not cached.get("complete") and (max_entries is None or len(cached["entries"]) < max_entries):
+            cached = None
+
+        headers = {
+            "User-Agent": settings.FEED_USER_AGENT,
+            "Accept-Encoding": "gzip, deflate"
+        }
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        host_limit = self._host_limit(url)
+        if not host_limit.acquire(timeout=time_left(deadline, self.timeout)):
+            raise TimeoutError(f"Sin turno para el host {urlparse(url).netloc} en {self.timeout}s")
+
+        try:
+            try:
+                response = urlopen(Request(url, headers=headers), timeout=time_left(deadline, self.timeout))
+            except HTTPError as e:
+                if e.code != 304 or not cached:
+                    raise
+                return FeedResult(
+                    url=url,
+                    status="not_modified",
+                    title=cached["title"],
+                    entries=[FeedEntry(**entry) for entry in cached["entries"][:max_entries]],
+                    http_status=304
+                )
+            except URLError as e:
+                # Los timeouts de conexión llegan envueltos en URLError
+                raise e.reason if isinstance(e.reason, Exception) else e
+
+            with response:
+                raw = DeadlineStream(response, deadline, self.timeout)
+                stream = self._decoded_stream(raw, response.headers.get("Content-Encoding", ""))
+                title, entries, size = parse_stream(stream, max_entries=max_entries)
+        finally:
+            host_limit.release()
+
+        self._save_cache(url, {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "title": title,
+            "complete": max_entries is None or len(entries) < max_entries,
+            "entries": [entry.to_dict() for entry in entries]
+        })
+
+        return FeedResult(
+            url=url,
+            status="ok",
+            title=title,
+            entries=entries,
+            http_status=response.status,
+            bytes_downloaded=size
+        )
+
+    @staticmethod
+    def _decoded_stream(response, encoding: str):
+        encoding = encoding.lower()
+        if encoding == "gzip":
+            # Se descomprime a medida que se lee
+            return gzip.GzipFile(fileobj=response)
+        if encoding == "deflate":
+            return io.BytesIO(zlib.decompress(response.read()))
+        return response
+
+    # -------------------------
+    # CACHÉ
+    # -------------------------
+
+    def _cache_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + ".json")
+
+    def _load_cache(self, url: str) -> Optional[dict]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(url), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_cache(self, url: str, data: dict) -> None:
+        if not self.cache_dir:
+            return
+        # Escritura atómica: otro hilo o proceso nunca lee un JSON a medias
+        path = self._cache_path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
@@ -0,0 +1,227 @@
+import io
+from typing import BinaryIO, List, Optional, Tuple
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+from models.feed import FeedEntry
+from services.tracing_service import tracer
+
+
+# Bytes leídos por iteración del parser incremental
+_READ_SIZE = 64 * 1024
+
+# Elementos de cada entrada que se conservan (nombre local -> campo de FeedEntry)
+_ENTRY_FIELDS = {
+    "title": "title",
+    "link": "link",
+    "guid": "guid",
+    "id": "guid",
+    "description": "summary",
+    "summary": "summary",
+    "pubDate": "published",
+    "published": "published",
+    "updated": "updated",
+    "date": "published"  # dc:date (RSS 1.0)
+}
+
+_ENTRY_TAGS = {"item", "entry"}
+_FEED_TAGS = {"channel", "feed"}
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_with_feedparser(data: bytes, max_entries: Optional[int] = None) -> Tuple[str, List[FeedEntry]]:
+    """
+    Parsea un feed completo con feedparser (tolerante a feeds mal formados)
+
+    Returns:
+        Tupla (título del feed, lista de FeedEntry)
+
+    Raises:
+        ValueError: Si el contenido no es un feed válido
+    """
+    import feedparser
+
+    feed = feedparser.parse(data)
+    if feed.bozo and not feed.entries:
+        raise ValueError(f"Feed inválido: {feed.get('bozo_exception', 'formato desconocido')}")
+
+    entries = [
+        FeedEntry(
+            title=entry.get("title", ""),
+            link=entry.get("link", ""),
+            guid=entry.get("id") or entry.get("link", ""),
+            summary=entry.get("summary", ""),
+            published=entry.get("published") or entry.get("updated", ""),
+            updated=entry.get("updated", "")
+        )
+        for entry in feed.entries[:max_entries]
+    ]
+    return feed.feed.get("title", "RSS"), entries
+
+
+class StreamingFeedParser:
+    """
+    Lector incremental de feeds RSS 2.0, RSS 1.0 y Atom
+
+    Lee el documento por bloques con XMLPullParser y construye cada
+    FeedEntry al cerrarse su elemento; los elementos que no se usan
+    (content:encoded, media:*, comentarios...) se descartan al terminar
+    en vez de quedarse en memoria. Al llegar a `max_entries` deja de leer,
+    así en un feed de varios MB sólo se descarga y parsea el principio.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Args:
+            max_entries: Entradas a leer (None = todas)
+        """
+        self.max_entries = max_entries
+        self.title = ""
+        self.entries: List[FeedEntry] = []
+        self.bytes_read = 0
+
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._stack: List[str] = []
+        self._current: Optional[dict] = None
+        self._done = False
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def feed(self, data: bytes) -> None:
+        """
+        Procesa un bloque de bytes
+
+        Raises:
+            ParseError: Si el XML está mal formado
+        """
+        self.bytes_read += len(data)
+        self._parser.feed(data)
+        self._process_events()
+
+    def close(self) -> None:
+        """
+        Termina el documento (valida que el XML esté completo)
+        """
+        if not self._done:
+            self._parser.close()
+            self._process_events()
+
+    def _process_events(self) -> None:
+        for event, element in self._parser.read_events():
+            name = _local_name(element.tag)
+
+            if event == "start":
+                self._stack.append(name)
+                if name in _ENTRY_TAGS and self._current is None:
+                    self._current = {}
+                continue
+
+            self._stack.pop()
+            parent = self._stack[-1] if self._stack else ""
+
+            if self._current is not None:
+                if name in _ENTRY_TAGS and parent not in _ENTRY_TAGS:
+                    self._finish_entry()
+                    element.clear()
+                    if self.max_entries is not None and len(self.entries) >= self.max_entries:
+                        self._done = True
+                        return
+                elif parent in _ENTRY_TAGS:
+                    self._read_field(name, element)
+                    element.clear()
+            elif name == "title" and parent in _FEED_TAGS and not self.title:
+                self.title = (element.text or "").strip()
+
+    def _read_field(self, name: str, element) -> None:
+        field = _ENTRY_FIELDS.get(name)
+        if field is None or self._current.get(field):
+            return
+
+        if name == "link" and element.get("href") is not None:
+            # Atom: <link rel="alternate" href="..."/>
+            if element.get("rel", "alternate") != "alternate":
+                return
+            value = element.get("href")
+        else:
+            value = "".join(element.itertext())
+
+        self._current[field] = value.strip()
+
+    def _finish_entry(self) -> None:
+        current = self._current
+        self._current = None
+        self.entries.append(FeedEntry(
+            title=current.get("title", ""),
+            link=current.get("link", ""),
+            guid=current.get("guid") or current.get("link", ""),
+            summary=current.get("summary", ""),
+            # Sin fecha de publicación (Atom sólo con <updated>) se usa la de edición
+            published=current.get("published") or current.get("updated", ""),
+            updated=current.get("updated", "")
+        ))
+
+
+def parse_stream(
+    stream: BinaryIO,
+    max_entries: Optional[int] = None,
+    read_size: int = _READ_SIZE
+) -> Tuple[str, List[FeedEntry], int]:
+    """
+    Lee un feed desde un stream, parando al llegar a `max_entries`
+
+    Si el XML está mal formado (entidades HTML, etiquetas sin cerrar...),
+    lee el resto del stream y usa feedparser como respaldo.
+
+    Args:
+        stream: Objeto con `read(n)` (respuesta HTTP, archivo, BytesIO)
+        max_entries: Entradas a leer (None = todas)
+        read_size: Bytes por lectura
+
+    Returns:
+        Tupla (título, entradas, bytes leídos del stream)
+
+    Raises:
+        ValueError: Si el contenido no es un feed ni siquiera para feedparser
+    """
+    parser = StreamingFeedParser(max_entries=max_entries)
+    received = []
+
+    with tracer.span("feed_parse", max_entries=max_entries or 0) as span:
+        try:
+            while not parser.done:
+                data = stream.read(read_size)
+                if not data:
+                    parser.close()
+                    break
+                received.append(data)
+                parser.feed(data)
+
+            if not parser.entries and not parser.title:
+                raise ParseError("no es un feed RSS/Atom")
+
+            span["fallback"] = 0
+            span["bytes"] = parser.bytes_read
+            span["entries"] = len(parser.entries)
+            return parser.title or "RSS", parser.entries, parser.bytes_read
+
+        except ParseError:
+            received.append(stream.read())
+            data = b"".join(received)
+            title, entries = parse_with_feedparser(data, max_entries)
+
+            span["fallback"] = 1
+            span["bytes"] = len(data)
+            span["entries"] = len(entries)
+            return title, entries, len(data)
+
+
+def parse_bytes(data: bytes, max_entries: Optional[int] = None) -> Tuple[str, List[FeedEntry]]:
+    """
+    Atajo de `parse_stream` para un documento que ya está en memoria
+    """
+    title, entries, _ = parse_stream(io.BytesIO(data), max_entries=max_entries)
+    return title, entries
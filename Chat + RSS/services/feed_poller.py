@@ -0,0 +1,206 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Union
+
+from models.feed import FeedSubscription
+from config.settings import settings
+from services.ai_service import AIService
+from services.feed_registry import FeedRegistry
+from services.rss_service import RSSService
+from services.tracing_service import tracer
+
+
+# Fallos consecutivos a partir de los cuales la espera tras un error deja de duplicarse
+_MAX_BACKOFF_EXPONENT = 16
+
+
+class FeedPoller:
+    """
+    Actualizador de feeds suscritos en segundo plano
+
+    Un hilo revisa los feeds cuya próxima revisión ya llegó (varios en
+    paralelo), y sólo cuando las entradas cambiaron genera y guarda un
+    análisis nuevo en FeedRegistry. El intervalo de cada feed se adapta:
+    se reduce a la mitad cuando el feed cambió y crece un 50 % cuando no,
+    entre FEED_POLL_MIN_SECONDS y FEED_POLL_MAX_SECONDS. Tras un error se
+    espera el doble por cada fallo consecutivo, y a toda espera se le suma
+    un ±FEED_POLL_JITTER aleatorio para que los feeds no se revisen todos
+    a la vez.
+    """
+
+    def __init__(
+        self,
+        registry: FeedRegistry,
+        rss_service: RSSService,
+        ai_service: Union[AIService, Callable[[], AIService]],
+        workers: Optional[int] = None,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        max_error_delay: Optional[float] = None,
+        jitter: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Args:
+            registry: Suscripciones y análisis guardados
+            rss_service: Descarga y formateo de feeds
+            ai_service: Servicio de IA para los análisis, o función que lo crea; en ese caso
+                        se llama recién con el primer análisis (crear el poller no carga el LLM)
+            workers: Feeds revisados en paralelo (usa settings.FEED_POLLER_WORKERS)
+            min_interval, max_interval: Límites del intervalo adaptativo (segundos)
+            max_error_delay: Espera máxima tras errores consecutivos (segundos)
+            jitter: Fracción aleatoria que se suma o resta a cada espera
+            clock, rng: Reloj y generador aleatorio (inyectables en pruebas)
+        """
+        self.registry = registry
+        self.rss_service = rss_service
+        self._ai_service = ai_service
+        self.workers = workers or settings.FEED_POLLER_WORKERS
+        self.min_interval = min_interval or settings.FEED_POLL_MIN_SECONDS
+        self.max_interval = max_interval or settings.FEED_POLL_MAX_SECONDS
+        self.max_error_delay = max_error_delay or settings.FEED_POLL_ERROR_MAX_SECONDS
+        self.jitter = settings.FEED_POLL_JITTER if jitter is None else jitter
+        self.clock = clock
+        self.rng = rng or random.Random()
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="feed-poll")
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._ai_lock = threading.Lock()
+        self._stats = {"polls": 0, "changed": 0, "unchanged": 0, "errors": 0}
+
+    @property
+    def ai_service(self) -> AIService:
+        if callable(self._ai_service):
+            with self._ai_lock:
+                if callable(self._ai_service):
+                    self._ai_service = self._ai_service()
+        return self._ai_service
+
+    # -------------------------
+    # CICLO DE VIDA
+    # -------------------------
+
+    def start(self) -> None:
+        """
+        Arranca el hilo de revisión (si no estaba corriendo)
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="feed-poller", daemon=True)
+                self._thread.start()
+
+    def wake(self) -> None:
+        """
+        Revisa ya los feeds pendientes (por ejemplo, tras una suscripción nueva)
+        """
+        self._wake.set()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll_due()
+            except Exception as e:
+                print(f"Error en el actualizador de feeds: {e}")
+
+            next_poll = self.registry.next_poll_at()
+            wait = 60.0 if next_poll is None else min(60.0, max(1.0, next_poll - self.clock()))
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    # -------------------------
+    # REVISIÓN
+    # -------------------------
+
+    def poll_due(self) -> int:
+        """
+        Revisa en paralelo todas las suscripciones pendientes
+
+        Returns:
+            Número de feeds revisados
+        """
+        due = self.registry.due(self.clock())
+        if due:
+            list(self._executor.map(self.poll, due))
+        return len(due)
+
+    def poll(self, subscription: FeedSubscription) -> FeedSubscription:
+        """
+        Revisa un feed, lo analiza si cambió y programa la próxima revisión
+
+        Returns:
+            La suscripción actualizada (también guardada en el registro)
+        """
+        now = self.clock()
+        interval = subscription.interval_seconds or settings.FEED_POLL_INTERVAL_SECONDS
+
+        with tracer.span("feed_poll") as span:
+            try:
+                # Mismas entradas que el análisis de la pestaña RSS
+                feed = self.rss_service.fetch_entries(subscription.url, max_entries=5)
+                fingerprint = RSSService.fingerprint(feed.entries)
+                # La primera revisión no cuenta como cambio: todavía no hay con qué comparar
+                changed = subscription.fingerprint is not None and fingerprint != subscription.fingerprint
+
+                if fingerprint != subscription.fingerprint or subscription.analysis is None:
+                    subscription.analysis = self.ai_service.generate_rss_analysis(
+                        RSSService.format_feed(feed.title, feed.entries),
+                        feed_url=subscription.url
+                    )
+                    subscription.analyzed_at = now
+                    subscription.fingerprint = fingerprint
+
+                if changed:
+                    subscription.last_changed_at = now
+                    interval = max(self.min_interval, interval / 2)
+                elif subscription.last_polled_at is not None:
+                    interval = min(self.max_interval, interval * 1.5)
+
+                subscription.title = feed.title or subscription.title
+                subscription.failures = 0
+                subscription.last_error = None
+                delay = interval
+                outcome = "changed" if changed else "unchanged"
+
+            except Exception as e:
+                subscription.failures += 1
+                subscription.last_error = f"{type(e).__name__}: {e}"
+                # El exponente se acota: con miles de fallos 2 ** n ya no cabe en un float
+                delay = min(self.max_error_delay, interval * 2 ** min(subscription.failures, _MAX_BACKOFF_EXPONENT))
+                outcome = "errors"
+                print(f"Error revisando {subscription.url}: {subscription.last_error}")
+
+            span["outcome"] = outcome
+
+        subscription.interval_seconds = interval
+        subscription.last_polled_at = now
+        subscription.next_poll_at = now + delay * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+        self.registry.update(subscription)
+
+        with self._lock:
+            self._stats["polls"] += 1
+            self._stats[outcome] += 1
+        return subscription
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["running"] = self._thread is not None and self._thread.is_alive()
+        stats["next_poll_in_s"] = None
+        next_poll = self.registry.next_poll_at()
+        if next_poll is not None:
+            stats["next_poll_in_s"] = round(max(0.0, next_poll - self.clock()), 1)
+        return stats
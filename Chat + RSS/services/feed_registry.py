@@ -0,0 +1,108 @@
+import sqlite3
+import threading
+import time
+from dataclasses import astuple, fields
+from typing import List, Optional
+
+from models.feed import FeedSubscription
+from config.settings import settings
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscriptions (
+    url TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    interval_seconds REAL NOT NULL,
+    next_poll_at REAL NOT NULL,
+    last_polled_at REAL,
+    last_changed_at REAL,
+    failures INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    fingerprint TEXT,
+    analysis TEXT,
+    analyzed_at REAL
+);
+CREATE INDEX IF NOT EXISTS subscriptions_next_poll ON subscriptions (next_poll_at);
+"""
+
+_COLUMNS = [f.name for f in fields(FeedSubscription)]
+
+
+class FeedRegistry:
+    """
+    Feeds suscritos y su último análisis, en SQLite
+
+    Lo escribe el actualizador en segundo plano (FeedPoller) y lo lee la
+    interfaz, que muestra el análisis guardado sin esperar red ni LLM.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: Base SQLite (usa settings.FEED_POLLER_DB_PATH)
+        """
+        self.db_path = db_path or settings.FEED_POLLER_DB_PATH
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def subscribe(self, url: str, interval_seconds: Optional[float] = None) -> FeedSubscription:
+        """
+        Agrega un feed (si ya estaba, no cambia nada); se revisa en la próxima pasada
+
+        Returns:
+            La suscripción guardada
+        """
+        url = url.strip()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO subscriptions (url, interval_seconds, next_poll_at) VALUES (?, ?, ?)",
+                (url, interval_seconds or settings.FEED_POLL_INTERVAL_SECONDS, time.time())
+            )
+        return self.get(url)
+
+    def unsubscribe(self, url: str) -> bool:
+        with self._lock, self._db:
+            return self._db.execute("DELETE FROM subscriptions WHERE url = ?", (url.strip(),)).rowcount > 0
+
+    def get(self, url: str) -> Optional[FeedSubscription]:
+        rows = self._select("WHERE url = ?", (url.strip(),))
+        return rows[0] if rows else None
+
+    def list(self) -> List[FeedSubscription]:
+        return self._select("ORDER BY url")
+
+    def due(self, now: Optional[float] = None) -> List[FeedSubscription]:
+        """
+        Suscripciones cuya próxima revisión ya llegó, la más atrasada primero
+        """
+        return self._select("WHERE next_poll_at <= ? ORDER BY next_poll_at", (now or time.time(),))
+
+    def next_poll_at(self) -> Optional[float]:
+        """
+        Momento de la próxima revisión (None si no hay suscripciones)
+        """
+        with self._lock:
+            return self._db.execute("SELECT MIN(next_poll_at) FROM subscriptions").fetchone()[0]
+
+    def update(self, subscription: FeedSubscription) -> None:
+        """
+        Guarda el estado de una suscripción (si se quitó mientras se revisaba, no la vuelve a crear)
+        """
+        assignments = ", ".join(f"{column} = ?" for column in _COLUMNS[1:])
+        values = astuple(subscription)
+        with self._lock, self._db:
+            self._db.execute(
+                f"UPDATE subscriptions SET {assignments} WHERE url = ?",
+                values[1:] + values[:1]
+            )
+
+    def _select(self, clause: str, params: tuple = ()) -> List[FeedSubscription]:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM subscriptions {clause}", params
+            ).fetchall()
+        return [FeedSubscription(*row) for row in rows]
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,287 @@
+import json
+import mmap
+import os
+import shutil
+import time
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from models.bundle import BUNDLE_FORMAT_VERSION, BundleManifest
+from models.document import Chunk, Document, RetrievalResult
+from config.settings import settings
+
+
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+OFFSETS_FILE = "offsets.npy"
+TEXT_FILE = "text.txt"
+METADATA_FILE = "chunks.jsonl"
+
+# Columnas de offsets.npy (bytes dentro de text.txt y chunks.jsonl)
+_TEXT_START, _TEXT_END, _META_START, _META_END = range(4)
+
+
+def _map_file(path: str):
+    """
+    Mapea un archivo en memoria (sólo lectura); los archivos vacíos no se pueden mapear
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class IndexBundle:
+    """
+    Paquete portable con el índice ya procesado de un documento
+
+    Es una carpeta con:
+        manifest.json  modelo de embeddings, parámetros de chunking, tamaños
+        embeddings.npy matriz float32 (chunks x dimensión) en formato .npy
+        text.txt       texto completo del documento en UTF-8
+        chunks.jsonl   metadatos de cada chunk, uno por línea
+        offsets.npy    por chunk, rango de bytes de su texto y de su línea de metadatos
+
+    Abrirlo sólo lee el manifiesto: los demás archivos se mapean en
+    memoria (mmap), así el costo no depende del tamaño del documento y
+    varios procesos comparten las mismas páginas del sistema operativo.
+    Los paquetes se arman una vez (build_index_bundle.py) y se copian a
+    todas las instancias de la app.
+    """
+
+    def __init__(self, path: str):
+        """
+        Abre un paquete existente
+
+        Args:
+            path: Carpeta del paquete
+
+        Raises:
+            ValueError: Si el paquete es de otra versión del formato
+        """
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            self.manifest = BundleManifest.from_dict(json.load(f))
+
+        if self.manifest.format_version != BUNDLE_FORMAT_VERSION:
+            raise ValueError(
+                f"Formato de paquete {self.manifest.format_version} no soportado "
+                f"(se esperaba {BUNDLE_FORMAT_VERSION})"
+            )
+
+        self.embeddings: np.ndarray = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r")
+        self.offsets: np.ndarray = np.load(os.path.join(path, OFFSETS_FILE), mmap_mode="r")
+        self._text = _map_file(os.path.join(path, TEXT_FILE))
+        self._metadata = _map_file(os.path.join(path, METADATA_FILE))
+
+    @classmethod
+    def open(cls, path: str) -> "IndexBundle":
+        return cls(path)
+
+    def __len__(self) -> int:
+        return self.manifest.chunk_count
+
+    def __repr__(self):
+        return f"IndexBundle(path={self.path}, {self.manifest!r})"
+
+    # -------------------------
+    # ESCRITURA
+    # -------------------------
+
+    @staticmethod
+    def write(
+        path: str,
+        document: Document,
+        embeddings: np.ndarray,
+        embedding_model: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None,
+        top_k: Optional[int] = None
+    ) -> BundleManifest:
+        """
+        Guarda un documento procesado y sus embeddings como paquete
+
+        Se escribe en una carpeta temporal que luego se renombra, así
+        nunca queda un paquete a medias en `path`.
+
+        Args:
+            path: Carpeta destino (se reemplaza si existe)
+            document: Documento con sus chunks
+            embeddings: Matriz (chunks x dimensión), en el orden de document.chunks
+            embedding_model: Modelo con que se calcularon (usa settings.EMBEDDING_MODEL_NAME)
+            chunk_size, chunk_overlap, top_k: Parámetros usados (por defecto, el perfil del tipo de documento)
+
+        Returns:
+            Manifiesto del paquete
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or len(embeddings) != len(document.chunks):
+            raise ValueError(
+                f"Se esperaban {len(document.chunks)} embeddings y llegaron {embeddings.shape}"
+            )
+
+        extension = document.file_name.split(".")[-1].lower()
+        profile = settings.get_retrieval_profile(extension)
+
+        tmp_path = f"{path.rstrip(os.sep)}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        text_bytes = document.full_text.encode("utf-8")
+        with open(os.path.join(tmp_path, TEXT_FILE), "wb") as f:
+            f.write(text_bytes)
+
+        offsets = np.zeros((len(document.chunks), 4), dtype=np.int64)
+        with open(os.path.join(tmp_path, METADATA_FILE), "wb") as f:
+            for i, chunk, text_start, text_end in IndexBundle._chunk_byte_ranges(document):
+                line = json.dumps({
+                    "id": chunk.id,
+                    "chunk_index": i,
+                    "start_index": chunk.start_index,
+                    "chunk_size": chunk.size,
+                    "page_number": chunk.page_number
+                }, ensure_ascii=False).encode("utf-8")
+                offsets[i] = (text_start, text_end, f.tell(), f.tell() + len(line))
+                f.write(line + b"\n")
+
+        np.save(os.path.join(tmp_path, EMBEDDINGS_FILE), embeddings)
+        np.save(os.path.join(tmp_path, OFFSETS_FILE), offsets)
+
+        manifest = BundleManifest(
+            file_name=document.file_name,
+            file_hash=document.file_hash,
+            chunk_count=len(document.chunks),
+            dimension=int(embeddings.shape[1]) if len(embeddings) else 0,
+            embedding_model=embedding_model or settings.EMBEDDING_MODEL_NAME,
+            chunk_size=chunk_size or profile["chunk_size"],
+            chunk_overlap=profile["chunk_overlap"] if chunk_overlap is None else chunk_overlap,
+            top_k=top_k or profile["top_k"],
+            total_pages=document.total_pages,
+            text_bytes=len(text_bytes),
+            created_at=time.time(),
+            files={
+                "embeddings": EMBEDDINGS_FILE,
+                "offsets": OFFSETS_FILE,
+                "text": TEXT_FILE,
+                "metadata": METADATA_FILE
+            }
+        )
+        with open(os.path.join(tmp_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest.to_dict(), f, ensure_ascii=False, indent=2)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        return manifest
+
+    @staticmethod
+    def _chunk_byte_ranges(document: Document) -> Iterator[Tuple[int, Chunk, int, int]]:
+        """
+        Rango de bytes UTF-8 de cada chunk dentro del texto completo
+
+        Los chunks son cortes del texto (start_index en caracteres); los
+        bytes se acumulan avanzando por el texto una sola vez. Un chunk que
+        no coincide con el texto (por ejemplo, editado después de trocear)
+        no se puede ubicar y se rechaza.
+
+        Yields:
+            Tuplas (posición en document.chunks, chunk, byte inicial, byte final)
+        """
+        text = document.full_text
+        char_pos = byte_pos = 0
+        for index, chunk in sorted(enumerate(document.chunks), key=lambda item: item[1].start_index):
+            if chunk.start_index < char_pos:
+                # Solapamiento: se retrocede contando sólo el tramo compartido
+                byte_pos -= len(text[chunk.start_index:char_pos].encode("utf-8"))
+            else:
+                byte_pos += len(text[char_pos:chunk.start_index].encode("utf-8"))
+            char_pos = chunk.start_index
+
+            if text[chunk.start_index:chunk.start_index + chunk.size] != chunk.content:
+                raise ValueError(f"El chunk {chunk.id} no coincide con el texto del documento")
+            yield index, chunk, byte_pos, byte_pos + len(chunk.content.encode("utf-8"))
+
+    # -------------------------
+    # LECTURA
+    # -------------------------
+
+    def chunk_text(self, index: int) -> str:
+        start, end = self.offsets[index, _TEXT_START], self.offsets[index, _TEXT_END]
+        return self._text[start:end].decode("utf-8")
+
+    def chunk_metadata(self, index: int) -> dict:
+        start, end = self.offsets[index, _META_START], self.offsets[index, _META_END]
+        return json.loads(self._metadata[start:end])
+
+    def chunk(self, index: int) -> Chunk:
+        metadata = self.chunk_metadata(index)
+        return Chunk(
+            id=metadata["id"],
+            content=self.chunk_text(index),
+            start_index=metadata["start_index"],
+            size=metadata["chunk_size"],
+            page_number=metadata.get("page_number")
+        )
+
+    def iter_batches(self, batch_size: int = 1024) -> Iterator[Tuple[List[str], List[str], np.ndarray, List[dict]]]:
+        """
+        Recorre el paquete por lotes (para cargarlo en ChromaDB sin copiarlo entero)
+
+        Yields:
+            Tuplas (textos, ids, embeddings, metadatos)
+        """
+        for start in range(0, len(self), batch_size):
+            indexes = range(start, min(start + batch_size, len(self)))
+            metadatas = [self.chunk_metadata(i) for i in indexes]
+            yield (
+                [self.chunk_text(i) for i in indexes],
+                [metadata.pop("id") for metadata in metadatas],
+                np.asarray(self.embeddings[start:start + len(indexes)]),
+                [{key: value for key, value in metadata.items() if value is not None} for metadata in metadatas]
+            )
+
+    def to_document(self) -> Document:
+        """
+        Reconstruye el Document completo (lee todos los chunks)
+        """
+        return Document(
+            file_name=self.manifest.file_name,
+            file_hash=self.manifest.file_hash,
+            full_text=self._text[:].decode("utf-8") if len(self._text) else "",
+            chunks=[self.chunk(i) for i in range(len(self))],
+            total_pages=self.manifest.total_pages
+        )
+
+    def search(self, query_embedding: List[float], k: Optional[int] = None) -> RetrievalResult:
+        """
+        Búsqueda exacta por similitud coseno directamente sobre el mmap (sin ChromaDB)
+
+        Args:
+            query_embedding: Vector de la pregunta
+            k: Chunks a devolver (usa el top_k del manifiesto)
+
+        Returns:
+            RetrievalResult con distancia coseno (1 - similitud), como ChromaDB
+        """
+        k = min(k or self.manifest.top_k, len(self))
+        if k == 0:
+            return RetrievalResult(chunks=[], chunk_ids=[], distances=[])
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        norms = np.linalg.norm(self.embeddings, axis=1)
+        similarities = (self.embeddings @ query) / np.maximum(norms, 1e-12)
+
+        best = np.argpartition(-similarities, k - 1)[:k]
+        best = best[np.argsort(-similarities[best])]
+        return RetrievalResult(
+            chunks=[self.chunk_text(i) for i in best],
+            chunk_ids=[self.chunk_metadata(i)["id"] for i in best],
+            distances=[float(1 - similarities[i]) for i in best]
+        )
+
+    def close(self) -> None:
+        for mapped in (self._text, self._metadata):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+        self._text = self._metadata = b""
@@ -0,0 +1,473 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+import numpy as np
+
+from models.document import Document
+from services.database_service import DatabaseService
+from services.embedding_service import EmbeddingService
+from services.index_bundle import IndexBundle
+from config.settings import settings
+
+
+# Bytes extra estimados por chunk (IDs, metadatos, estructuras del índice)
+_CHUNK_OVERHEAD_BYTES = 256
+
+# Nombres de índices retirados que se recuerdan para explicar un KeyError
+_RELEASED_HISTORY = 1024
+
+
+class IndexReleasedError(KeyError):
+    """
+    El índice pedido ya no está registrado
+
+    `reason` explica por qué: se descartó para liberar memoria, la sesión
+    estuvo inactiva más de INDEX_SESSION_TTL_SECONDS, se eliminó o nunca existió.
+    """
+
+    def __init__(self, name: str, reason: str):
+        super().__init__(name)
+        self.reason = reason
+
+    def __str__(self):
+        return f"{self.args[0]}: {self.reason}"
+
+
+@dataclass
+class IndexEntry:
+    """
+    Índice de un documento dentro de una sesión
+
+    `lock` serializa la E/S del índice (guardar en disco, recargar,
+    borrar); el lock del registro sólo protege la contabilidad.
+    """
+    name: str
+    session_id: str
+    file_hash: str
+    database: Optional[DatabaseService]
+    memory_bytes: int = 0
+    last_used: float = 0.0
+    spilled: bool = False
+    pins: int = 0  # Usos en curso; un índice fijado no se desaloja
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def in_memory(self) -> bool:
+        return self.database is not None
+
+    @property
+    def evictable(self) -> bool:
+        return self.in_memory and not self.pins
+
+
+class IndexRegistry:
+    """
+    Colecciones separadas por sesión y documento con un presupuesto de memoria
+
+    Cada documento de cada sesión vive en su propia colección de ChromaDB,
+    así dos usuarios no se pisan. Cuando la memoria estimada supera
+    INDEX_MEMORY_BUDGET_MB, los índices menos usados recientemente se
+    guardan en disco (o se descartan) y se recargan al volver a usarse.
+
+    Un índice en uso (`use`) o a medio llenar (`open` hasta `commit`) queda
+    fijado y nunca se desaloja. Streamlit no avisa cuando una sesión
+    termina: las sesiones sin actividad durante INDEX_SESSION_TTL_SECONDS
+    se borran por completo (memoria y disco).
+
+    El lock del registro sólo se toma para elegir qué hacer; guardar,
+    recargar y borrar índices ocurre fuera de él, con el lock de cada
+    índice, así la E/S de una sesión no frena las consultas de las demás.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        budget_mb: Optional[float] = None,
+        spill_dir: Optional[str] = None,
+        spill_to_disk: Optional[bool] = None,
+        idle_seconds: Optional[float] = None,
+        session_ttl: Optional[float] = None
+    ):
+        """
+        Args:
+            embedding_service: Servicio de embeddings compartido
+            budget_mb: Memoria máxima para índices en memoria (usa settings.INDEX_MEMORY_BUDGET_MB)
+            spill_dir: Carpeta donde se guardan los índices desalojados (usa settings.INDEX_SPILL_DIR)
+            spill_to_disk: Si es False, los índices desalojados se descartan
+            idle_seconds: Inactividad tras la cual un índice se desaloja aunque haya memoria
+            session_ttl: Inactividad tras la cual se borran todos los índices de una sesión
+                         (usa settings.INDEX_SESSION_TTL_SECONDS)
+        """
+        self.embedding_service = embedding_service
+        self.budget_bytes = int((budget_mb or settings.INDEX_MEMORY_BUDGET_MB) * 1024 * 1024)
+        self.spill_dir = spill_dir or settings.INDEX_SPILL_DIR
+        self.spill_to_disk = settings.INDEX_SPILL_TO_DISK if spill_to_disk is None else spill_to_disk
+        self.idle_seconds = settings.INDEX_IDLE_SECONDS if idle_seconds is None else idle_seconds
+        self.session_ttl = settings.INDEX_SESSION_TTL_SECONDS if session_ttl is None else session_ttl
+
+        self._entries: "OrderedDict[str, IndexEntry]" = OrderedDict()
+        self._released: "OrderedDict[str, str]" = OrderedDict()  # nombre -> motivo
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def namespace(session_id: str, file_hash: str) -> str:
+        """
+        Nombre de colección para un documento de una sesión
+        """
+        session = re.sub(r"[^a-zA-Z0-9]", "", session_id)[:16]
+        return f"s{session}_d{file_hash[:16]}"
+
+    # -------------------------
+    # API PÚBLICA
+    # -------------------------
+
+    def create(self, session_id: str, document: Document) -> DatabaseService:
+        """
+        Indexa un documento en la colección de la sesión
+
+        Args:
+            session_id: Identificador de la sesión
+            document: Documento procesado
+
+        Returns:
+            DatabaseService listo para consultas
+        """
+        database = self.open(session_id, document.file_hash)
+        try:
+            database.create_collection(document)
+        except BaseException:
+            self.drop(session_id, document.file_hash)
+            raise
+        self.commit(session_id, document.file_hash)
+        return database
+
+    def create_from_bundle(self, session_id: str, bundle: IndexBundle) -> DatabaseService:
+        """
+        Carga un paquete de índice precalculado en la colección de la sesión
+
+        Args:
+            session_id: Identificador de la sesión
+            bundle: Paquete del documento (mismo file_hash que el archivo subido)
+
+        Returns:
+            DatabaseService listo para consultas
+        """
+        database = self.open(session_id, bundle.manifest.file_hash)
+        try:
+            database.load_bundle(bundle)
+        except BaseException:
+            self.drop(session_id, bundle.manifest.file_hash)
+            raise
+        self.commit(session_id, bundle.manifest.file_hash)
+        return database
+
+    def open(self, session_id: str, file_hash: str) -> DatabaseService:
+        """
+        Crea una colección vacía para llenarla por fuera (por ejemplo, ingesta de un ZIP)
+
+        El índice queda fijado hasta `commit`, que hay que llamar siempre al
+        terminar (también si el llenado falla) para actualizar la memoria usada.
+        """
+        name = self.namespace(session_id, file_hash)
+        database = DatabaseService(self.embedding_service, collection_name=name)
+        database.reset_collection()
+
+        with self._lock:
+            previous = self._entries.pop(name, None)
+            self._released.pop(name, None)
+            self._entries[name] = IndexEntry(
+                name=name,
+                session_id=session_id,
+                file_hash=file_hash,
+                database=database,
+                last_used=time.monotonic(),
+                pins=1
+            )
+
+        if previous is not None:
+            # Su colección ya la reemplazó reset_collection(); sólo queda la copia en disco
+            with previous.lock:
+                self._remove_spill(previous)
+
+        return database
+
+    def commit(self, session_id: str, file_hash: str) -> None:
+        """
+        Recalcula la memoria de un índice recién llenado, lo libera y aplica el presupuesto
+        """
+        with self._lock:
+            entry = self._entries.get(self.namespace(session_id, file_hash))
+        if entry is None:
+            return
+
+        with entry.lock:
+            memory_bytes = self._estimate_memory(entry.database) if entry.in_memory else 0
+        with self._lock:
+            entry.pins = max(0, entry.pins - 1)
+            entry.memory_bytes = memory_bytes
+        self._enforce_budget(keep=entry.name)
+
+    @contextmanager
+    def use(self, session_id: str, file_hash: str) -> Iterator[DatabaseService]:
+        """
+        Usa el índice de un documento, recargándolo desde disco si fue desalojado
+
+        Mientras dura el bloque `with` el índice está fijado: otra sesión que
+        necesite memoria no puede desalojarlo a mitad de una consulta.
+
+        Raises:
+            IndexReleasedError: (un KeyError) Si el índice no existe o se retiró;
+                                `reason` dice por qué
+        """
+        name = self.namespace(session_id, file_hash)
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries.move_to_end(name)
+                entry.last_used = time.monotonic()
+                entry.pins += 1
+            reason = self._released.get(name, "no se encontró el índice")
+
+        # Después de fijar el índice: la sesión que lo usa nunca cuenta como abandonada
+        self._sweep()
+        if entry is None:
+            raise IndexReleasedError(name, reason)
+
+        try:
+            # Si otro hilo lo está guardando en disco, se espera aquí y luego se recarga
+            with entry.lock:
+                if not entry.in_memory:
+                    self._reload(entry)
+                database = entry.database
+        except BaseException:
+            with self._lock:
+                entry.pins -= 1
+            raise
+
+        if database is None:
+            # Se liberó toda la sesión mientras se esperaba
+            with self._lock:
+                entry.pins -= 1
+                reason = self._released.get(name, "el índice se eliminó")
+            raise IndexReleasedError(name, reason)
+
+        self._enforce_budget(keep=entry.name)
+        try:
+            yield database
+        finally:
+            with self._lock:
+                entry.pins -= 1
+                entry.last_used = time.monotonic()
+            self._enforce_budget()
+
+    def drop(self, session_id: str, file_hash: str) -> None:
+        """
+        Elimina el índice de un documento (memoria y disco)
+        """
+        name = self.namespace(session_id, file_hash)
+        with self._lock:
+            entry = self._entries.pop(name, None)
+            if entry is not None:
+                self._mark_released(name, "el índice se eliminó")
+        if entry is not None:
+            self._discard(entry)
+
+    def release_session(self, session_id: str, reason: str = "la sesión se cerró") -> None:
+        """
+        Elimina todos los índices de una sesión (también los que estén en uso)
+
+        Args:
+            session_id: Identificador de la sesión
+            reason: Motivo que verá quien intente usar luego esos índices
+        """
+        with self._lock:
+            entries = [self._entries.pop(n) for n, e in list(self._entries.items()) if e.session_id == session_id]
+            for entry in entries:
+                self._mark_released(entry.name, reason)
+        for entry in entries:
+            self._discard(entry)
+
+    def get_stats(self) -> dict:
+        """
+        Uso de memoria y estado de los índices registrados
+        """
+        with self._lock:
+            in_memory = [e for e in self._entries.values() if e.in_memory]
+            return {
+                "budget_mb": round(self.budget_bytes / 1_048_576, 1),
+                "used_mb": round(sum(e.memory_bytes for e in in_memory) / 1_048_576, 2),
+                "indexes_in_memory": len(in_memory),
+                "indexes_on_disk": sum(1 for e in self._entries.values() if e.spilled and not e.in_memory),
+                "sessions": len({e.session_id for e in self._entries.values()})
+            }
+
+    # -------------------------
+    # DESALOJO
+    # -------------------------
+
+    def _used_bytes(self) -> int:
+        return sum(e.memory_bytes for e in self._entries.values() if e.in_memory)
+
+    def _mark_released(self, name: str, reason: str) -> None:
+        # Se llama con self._lock tomado
+        self._released[name] = reason
+        self._released.move_to_end(name)
+        while len(self._released) > _RELEASED_HISTORY:
+            self._released.popitem(last=False)
+
+    def _enforce_budget(self, keep: Optional[str] = None) -> None:
+        """
+        Desaloja índices LRU (no fijados) hasta quedar dentro del presupuesto
+        """
+        with self._lock:
+            excess = self._used_bytes() - self.budget_bytes
+            victims = []
+            for entry in self._entries.values():
+                if excess <= 0:
+                    break
+                if entry.evictable and entry.name != keep:
+                    victims.append(entry)
+                    excess -= entry.memory_bytes
+
+        for entry in victims:
+            self._evict(entry)
+
+    def _sweep(self) -> None:
+        """
+        Borra las sesiones abandonadas y desaloja los índices sin uso reciente
+        """
+        now = time.monotonic()
+        expired = []
+        idle = []
+
+        with self._lock:
+            if self.session_ttl:
+                last_activity = {}
+                for entry in self._entries.values():
+                    # Una sesión con un índice en uso sigue viva
+                    active = now if entry.pins else entry.last_used
+                    last_activity[entry.session_id] = max(last_activity.get(entry.session_id, 0.0), active)
+                expired = [s for s, last_used in last_activity.items() if last_used < now - self.session_ttl]
+
+            if self.idle_seconds:
+                limit = now - self.idle_seconds
+                for entry in self._entries.values():
+                    if entry.last_used >= limit:
+                        break
+                    if entry.evictable and entry.session_id not in expired:
+                        idle.append(entry)
+
+        for session_id in expired:
+            print(f"Sesión '{session_id}' inactiva: se liberan sus índices")
+            self.release_session(session_id, "la sesión estuvo inactiva demasiado tiempo")
+        for entry in idle:
+            self._evict(entry)
+
+    def _evict(self, entry: IndexEntry) -> None:
+        """
+        Guarda en disco (o descarta) un índice elegido como víctima
+
+        Se vuelve a comprobar con el lock del índice tomado: entre la
+        elección y este punto pudo fijarse, desalojarse o eliminarse.
+        """
+        with entry.lock:
+            with self._lock:
+                if not entry.evictable or self._entries.get(entry.name) is not entry:
+                    return
+                database = entry.database
+
+            if self.spill_to_disk:
+                try:
+                    self._spill(entry, database)
+                except Exception as e:
+                    print(f"No se pudo guardar el índice '{entry.name}' en disco: {e}")
+                    return
+                print(f"Índice '{entry.name}' guardado en disco ({entry.memory_bytes / 1_048_576:.1f} MB)")
+            else:
+                print(f"Índice '{entry.name}' descartado ({entry.memory_bytes / 1_048_576:.1f} MB)")
+
+            with self._lock:
+                entry.database = None
+                if not self.spill_to_disk:
+                    self._entries.pop(entry.name, None)
+                    self._mark_released(entry.name, "se descartó para liberar memoria")
+            database.drop_collection()
+
+    def _spill(self, entry: IndexEntry, database: DatabaseService) -> None:
+        data = database.export_data()
+        path = os.path.join(self.spill_dir, entry.name)
+        os.makedirs(path, exist_ok=True)
+
+        np.save(os.path.join(path, "embeddings.npy"), data["embeddings"])
+        with open(os.path.join(path, "chunks.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "ids": data["ids"],
+                "documents": data["documents"],
+                "metadatas": data["metadatas"],
+                "top_k": data["top_k"]
+            }, f, ensure_ascii=False)
+
+        entry.spilled = True
+
+    def _reload(self, entry: IndexEntry) -> None:
+        # Se llama con entry.lock tomado (no el del registro)
+        if not entry.spilled:
+            return
+
+        path = os.path.join(self.spill_dir, entry.name)
+        with open(os.path.join(path, "chunks.json"), encoding="utf-8") as f:
+            data = json.load(f)
+        data["embeddings"] = np.load(os.path.join(path, "embeddings.npy"))
+
+        database = DatabaseService(self.embedding_service, collection_name=entry.name)
+        database.import_data(data)
+        memory_bytes = self._estimate_memory(database)
+
+        with self._lock:
+            if self._entries.get(entry.name) is not entry:
+                # Se eliminó mientras se recargaba
+                database.drop_collection()
+                return
+            entry.database = database
+            entry.memory_bytes = memory_bytes
+        print(f"Índice '{entry.name}' recargado desde disco")
+
+    def _discard(self, entry: IndexEntry) -> None:
+        with entry.lock:
+            with self._lock:
+                database, entry.database = entry.database, None
+            if database is not None:
+                database.drop_collection()
+            self._remove_spill(entry)
+
+    def _remove_spill(self, entry: IndexEntry) -> None:
+        if entry.spilled:
+            shutil.rmtree(os.path.join(self.spill_dir, entry.name), ignore_errors=True)
+            entry.spilled = False
+
+    @staticmethod
+    def _estimate_memory(database: DatabaseService) -> int:
+        """
+        Estima la memoria de una colección: vectores float32 + texto + overhead
+        """
+        if database.collection is None:
+            return 0
+
+        count = database.collection.count()
+        if count == 0:
+            return 0
+
+        sample = database.collection.get(limit=min(count, 50), include=["documents", "embeddings"])
+        dimension = len(sample["embeddings"][0])
+        avg_text = sum(len(text.encode("utf-8")) for text in sample["documents"]) / len(sample["documents"])
+
+        return int(count * (dimension * 4 + avg_text + _CHUNK_OVERHEAD_BYTES))
@@ -0,0 +1,314 @@
+import io
+import os
+import queue
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from models.document import Document
+from models.ingestion import IngestionFailure, IngestionReport
+from services.database_service import DatabaseService
+from services.document_service import DocumentService
+from services.embedding_service import EmbeddingService
+from config.settings import settings
+
+
+# Marca de fin para la etapa de escritura
+_STOP = None
+
+
+def _extract_source(source: str, member: Optional[str]) -> Tuple[Document, int]:
+    """
+    Extrae y trocea un archivo dentro de un proceso del pool
+
+    Args:
+        source: Ruta del archivo o del ZIP que lo contiene
+        member: Nombre del archivo dentro del ZIP (None si es un archivo suelto)
+
+    Returns:
+        Tupla (documento procesado, tamaño en bytes)
+    """
+    if member is None:
+        data = Path(source).read_bytes()
+        file_name = os.path.basename(source)
+    else:
+        with zipfile.ZipFile(source) as archive:
+            data = archive.read(member)
+        file_name = member
+
+    document = DocumentService().process_file(io.BytesIO(data), file_name)
+    return document, len(data)
+
+
+class IngestionService:
+    """
+    Servicio para indexar carpetas o archivos ZIP completos
+
+    El trabajo se divide en tres etapas:
+    1. Extracción + troceado en un pool de procesos (un archivo por tarea)
+    2. Embeddings en lotes grandes que mezclan chunks de varios archivos
+    3. Escritura en ChromaDB desde un único hilo escritor
+
+    Los archivos con el mismo contenido (mismo hash) se indexan una sola
+    vez, porque los IDs de sus chunks coincidirían. Si falla el embedding
+    o la escritura de un lote, el fallo se anota para cada archivo del
+    lote y la ingesta sigue con los demás. Al final se quitan de la
+    colección los chunks que sí se escribieron de los archivos fallidos,
+    así el reporte coincide con lo indexado.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        database_service: DatabaseService,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        """
+        Args:
+            embedding_service: Servicio de embeddings
+            database_service: Base vectorial donde se escriben los chunks
+            workers: Procesos de extracción (usa settings.INGEST_WORKERS por defecto)
+            batch_size: Chunks por lote de embeddings (usa settings.INGEST_EMBED_BATCH_SIZE)
+        """
+        self.embedding_service = embedding_service
+        self.database_service = database_service
+        self.workers = max(1, workers or settings.INGEST_WORKERS)
+        self.batch_size = max(1, batch_size or settings.INGEST_EMBED_BATCH_SIZE)
+
+    @staticmethod
+    def collect_sources(path: str) -> List[Tuple[str, Optional[str]]]:
+        """
+        Lista los archivos soportados de una carpeta (recursiva) o de un ZIP
+
+        Args:
+            path: Carpeta o archivo .zip
+
+        Returns:
+            Lista de tuplas (origen, miembro del ZIP o None)
+        """
+        def supported(name: str) -> bool:
+            return name.split(".")[-1].lower() in settings.SUPPORTED_EXTENSIONS
+
+        root = Path(path)
+
+        if root.is_dir():
+            return [
+                (str(file_path), None)
+                for file_path in sorted(root.rglob("*"))
+                if file_path.is_file() and supported(file_path.name)
+            ]
+
+        if zipfile.is_zipfile(root):
+            with zipfile.ZipFile(root) as archive:
+                return [
+                    (str(root), info.filename)
+                    for info in archive.infolist()
+                    if not info.is_dir() and supported(info.filename)
+                ]
+
+        raise ValueError(f"'{path}' no es una carpeta ni un archivo ZIP válido")
+
+    def ingest(self, path: str, reset: bool = True) -> IngestionReport:
+        """
+        Indexa todos los archivos soportados de una carpeta o ZIP
+
+        Los fallos de un archivo se registran en el reporte y no detienen
+        el resto de la ingesta.
+
+        Args:
+            path: Carpeta o archivo .zip
+            reset: Si True, vacía la colección antes de escribir
+
+        Returns:
+            IngestionReport con el rendimiento agregado y los fallos
+        """
+        sources = self.collect_sources(path)
+        report = IngestionReport(total_files=len(sources), workers=self.workers)
+        start = time.perf_counter()
+
+        if reset or self.database_service.collection is None:
+            self.database_service.reset_collection()
+
+        # Etapa 3: un solo hilo escribe en la colección
+        write_queue: "queue.Queue" = queue.Queue(maxsize=4)
+        writer_errors: List[Tuple[List[str], str]] = []
+        # Errores de embedding por archivo (los de escritura llegan en writer_errors)
+        embed_errors: Dict[str, str] = {}
+        # IDs de los chunks de cada archivo aceptado, para deshacer los que fallen
+        file_chunk_ids: Dict[str, List[str]] = {}
+        writer = threading.Thread(
+            target=self._writer_loop,
+            args=(write_queue, writer_errors),
+            daemon=True
+        )
+        writer.start()
+
+        pending_texts: List[str] = []
+        pending_ids: List[str] = []
+        pending_metadatas: List[dict] = []
+        seen_hashes = {}
+
+        # Etapa 1: extracción en paralelo
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(_extract_source, source, member): member or os.path.basename(source)
+                for source, member in sources
+            }
+
+            for future in as_completed(futures):
+                file_name = futures[future]
+                try:
+                    document, size = future.result()
+                except Exception as e:
+                    report.failures.append(IngestionFailure(file_name=file_name, error=str(e)))
+                    print(f"Error procesando {file_name}: {e}")
+                    continue
+
+                if document.file_hash in seen_hashes:
+                    report.duplicate_files += 1
+                    print(f"{file_name} tiene el mismo contenido que {seen_hashes[document.file_hash]}; se omite")
+                    continue
+                seen_hashes[document.file_hash] = file_name
+
+                report.processed_files += 1
+                report.total_bytes += size
+                report.total_chunks += len(document.chunks)
+
+                texts, chunk_ids, metadatas = DatabaseService.document_chunk_entries(document)
+                file_chunk_ids[file_name] = chunk_ids
+                pending_texts.extend(texts)
+                pending_ids.extend(chunk_ids)
+                pending_metadatas.extend(metadatas)
+
+                # Etapa 2: embeddings en lotes que cruzan archivos
+                while len(pending_texts) >= self.batch_size:
+                    self._embed_and_enqueue(
+                        write_queue,
+                        pending_texts[:self.batch_size],
+                        pending_ids[:self.batch_size],
+                        pending_metadatas[:self.batch_size],
+                        embed_errors
+                    )
+                    del pending_texts[:self.batch_size]
+                    del pending_ids[:self.batch_size]
+                    del pending_metadatas[:self.batch_size]
+
+        if pending_texts:
+            self._embed_and_enqueue(write_queue, pending_texts, pending_ids, pending_metadatas, embed_errors)
+
+        write_queue.put(_STOP)
+        writer.join()
+
+        failed_files = dict(embed_errors)
+        for file_names, error in writer_errors:
+            for file_name in file_names:
+                failed_files.setdefault(file_name, f"Error de escritura: {error}")
+        self._discard_failed_files(failed_files, file_chunk_ids, report)
+
+        report.elapsed_seconds = time.perf_counter() - start
+        print(f"Ingesta completada: {report.summary()}")
+
+        return report
+
+    def _embed_and_enqueue(
+        self,
+        write_queue: "queue.Queue",
+        texts: List[str],
+        chunk_ids: List[str],
+        metadatas: List[dict],
+        embed_errors: Dict[str, str]
+    ) -> None:
+        """
+        Genera los embeddings de un lote y lo envía al hilo escritor
+
+        Si el lote falla se reintenta archivo por archivo, así un archivo
+        problemático no arrastra a los demás; el fallo se anota en
+        `embed_errors` (archivo -> error).
+        """
+        try:
+            embeddings = self.embedding_service.encode_batch(texts)
+        except Exception as e:
+            print(f"Error generando embeddings de un lote de {len(texts)} chunks: {e}")
+            self._embed_per_file(write_queue, texts, chunk_ids, metadatas, embed_errors)
+            return
+
+        write_queue.put((list(texts), list(chunk_ids), embeddings, list(metadatas)))
+
+    def _embed_per_file(
+        self,
+        write_queue: "queue.Queue",
+        texts: List[str],
+        chunk_ids: List[str],
+        metadatas: List[dict],
+        embed_errors: Dict[str, str]
+    ) -> None:
+        by_file = {}
+        for index, metadata in enumerate(metadatas):
+            by_file.setdefault(metadata["file_name"], []).append(index)
+
+        for file_name, indexes in by_file.items():
+            if file_name in embed_errors:
+                # Ya falló en un lote anterior: el archivo se descarta entero
+                continue
+
+            file_texts = [texts[i] for i in indexes]
+            try:
+                embeddings = self.embedding_service.encode_batch(file_texts)
+            except Exception as e:
+                embed_errors[file_name] = f"Error generando embeddings: {e}"
+                print(f"Error generando embeddings de {file_name}: {e}")
+                continue
+
+            write_queue.put((
+                file_texts,
+                [chunk_ids[i] for i in indexes],
+                embeddings,
+                [metadatas[i] for i in indexes]
+            ))
+
+    def _discard_failed_files(
+        self,
+        failed_files: Dict[str, str],
+        file_chunk_ids: Dict[str, List[str]],
+        report: IngestionReport
+    ) -> None:
+        """
+        Quita de la colección y del reporte los archivos que fallaron
+
+        Los lotes mezclan archivos, así que de un archivo fallido pueden
+        haberse escrito algunos chunks en lotes anteriores; se borran para
+        que el archivo no quede indexado a medias. Si el borrado también
+        falla, el error lo indica (el archivo queda parcial).
+        """
+        for file_name, error in failed_files.items():
+            chunk_ids = file_chunk_ids.get(file_name, [])
+            try:
+                self.database_service.delete_chunks(chunk_ids)
+            except Exception as e:
+                error = f"{error} (quedó indexado en parte: no se pudieron quitar sus chunks: {e})"
+                print(f"Error quitando los chunks de {file_name}: {e}")
+
+            report.processed_files -= 1
+            report.total_chunks -= len(chunk_ids)
+            report.failures.append(IngestionFailure(file_name=file_name, error=error))
+
+    def _writer_loop(self, write_queue: "queue.Queue", errors: List[Tuple[List[str], str]]) -> None:
+        """
+        Consume lotes de la cola y los escribe en ChromaDB
+        """
+        while True:
+            item = write_queue.get()
+            if item is _STOP:
+                return
+
+            texts, chunk_ids, embeddings, metadatas = item
+            try:
+                self.database_service.add_chunks(texts, chunk_ids, embeddings, metadatas)
+            except Exception as e:
+                file_names = list(dict.fromkeys(metadata["file_name"] for metadata in metadatas))
+                errors.append((file_names, str(e)))
+                print(f"Error escribiendo lote de {len(texts)} chunks: {e}")
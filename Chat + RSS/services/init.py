@@ -1,15 +0,0 @@
-from .document_service import DocumentService # <--- Cambio importante aquí
-from .extractor_service import ExtractorService # <--- Agregamos esto
-from .embedding_service import EmbeddingService
-from .database_service import DatabaseService
-from .ai_service import AIService
-from .conversation_service import ConversationService
-
-__all__ = [
-    'DocumentService',
-    'ExtractorService',
-    'EmbeddingService',
-    'DatabaseService',
-    'AIService',
-    'ConversationService'
-]
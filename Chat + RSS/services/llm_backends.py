@@ -0,0 +1,86 @@
+import hashlib
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class StubResponse:
+    """
+    Respuesta con la misma forma que la de Gemini (atributo `text`)
+    """
+    text: str
+    usage_metadata: Optional[object] = None
+
+
+class StubServiceUnavailable(Exception):
+    """
+    Error transitorio simulado (equivale a un 503 de la API de Gemini)
+    """
+    code = 503
+
+
+class StubLLM:
+    """
+    Modelo local de pruebas que imita `genai.GenerativeModel`
+
+    No usa red: responde con un texto determinista derivado del prompt
+    después de una latencia configurable. Sirve para pruebas offline y
+    mediciones de rendimiento sin gastar cuota de la API.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, failure_rate: float = 0.0, seed: Optional[int] = None):
+        """
+        Args:
+            latency_ms: Milisegundos que tarda cada llamada simulada
+            failure_rate: Probabilidad (0-1) de que una llamada falle con un error transitorio
+            seed: Semilla para que los fallos sean reproducibles
+        """
+        self.latency = latency_ms / 1000.0
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def generate_content(self, prompt: str, **kwargs) -> StubResponse:
+        """
+        Simula una llamada a Gemini
+
+        Args:
+            prompt: Prompt completo
+
+        Returns:
+            StubResponse con un texto de respuesta
+
+        Raises:
+            StubServiceUnavailable: Con probabilidad `failure_rate`
+        """
+        self.calls += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise StubServiceUnavailable("Servicio no disponible (simulado)")
+
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        return StubResponse(text=f"[stub {digest}] Respuesta simulada para un prompt de {len(prompt)} caracteres.")
+
+
+def create_llm_backend(name: str, latency_ms: float = 0.0, failure_rate: float = 0.0):
+    """
+    Crea el backend de LLM indicado por nombre
+
+    Args:
+        name: "gemini" (usa la configuración por defecto de AIService) o "stub"
+        latency_ms: Latencia simulada para el stub
+        failure_rate: Probabilidad de errores transitorios simulados en el stub
+
+    Returns:
+        Objeto con `generate_content(prompt)` o None para usar Gemini
+    """
+    if name == "stub":
+        return StubLLM(latency_ms=latency_ms, failure_rate=failure_rate)
+    if name == "gemini":
+        return None
+    raise ValueError(f"Backend de LLM desconocido: {name}")
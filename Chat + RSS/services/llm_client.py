@@ -0,0 +1,322 @@
+import hashlib
+import inspect
+import random
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional
+
+from models.usage import LLMUsage
+from config.settings import settings
+from services.token_utils import estimate_tokens
+from services.usage_service import UsageTracker, extract_usage, usage_tracker as default_usage_tracker
+
+
+# Errores transitorios de la API de Google (google.api_core.exceptions) y de red
+_RETRYABLE_NAMES = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable",
+    "DeadlineExceeded", "InternalServerError", "GatewayTimeout"
+}
+_RETRYABLE_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """
+    Error de una llamada al LLM después de agotar los reintentos
+    """
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Indica si un error merece reintentarse (cuota, sobrecarga, timeout, red)
+    """
+    if isinstance(error, (TimeoutError, ConnectionError, FutureTimeout)):
+        return True
+    if type(error).__name__ in _RETRYABLE_NAMES:
+        return True
+    return getattr(error, "code", None) in _RETRYABLE_CODES
+
+
+class TokenBucket:
+    """
+    Cubeta de tokens: permite ráfagas de hasta `capacity` y repone `rate` por segundo
+    """
+
+    def __init__(self, capacity: float, rate: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.capacity = capacity
+        self.rate = rate
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Consume `amount` tokens esperando si hace falta
+
+        Returns:
+            Segundos esperados
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+
+                delay = (amount - self._tokens) / self.rate
+
+            self.sleep(delay)
+            waited += delay
+
+
+class LLMClient:
+    """
+    Cliente del LLM con límites de uso y tolerancia a fallos
+
+    Envuelve cualquier backend con `generate_content(prompt)` (Gemini o
+    StubLLM) y añade:
+    - límite de peticiones y de tokens por minuto (token bucket)
+    - máximo de llamadas simultáneas
+    - reintentos con espera exponencial y jitter para errores transitorios
+    - timeout por llamada
+    - deduplicación de prompts idénticos en vuelo (single-flight)
+
+    Los límites por minuto y la deduplicación se pueden desactivar para
+    backends sin cuota (StubLLM en benchmarks y pruebas de carga).
+    - registro de consumo (UsageTracker) una vez por llamada real al backend,
+      incluidos reintentos y fallos; quien comparte una respuesta no suma nada
+    """
+
+    def __init__(
+        self,
+        backend,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        timeout: Optional[float] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+        usage_tracker: Optional[UsageTracker] = None,
+        rate_limited: bool = True,
+        deduplicate: bool = True
+    ):
+        """
+        Args:
+            backend: Objeto con `generate_content(prompt)`
+            requests_per_minute: Límite de peticiones (usa settings.LLM_REQUESTS_PER_MINUTE)
+            tokens_per_minute: Límite de tokens de prompt (usa settings.LLM_TOKENS_PER_MINUTE)
+            max_concurrency: Llamadas simultáneas (usa settings.LLM_MAX_CONCURRENCY)
+            max_retries: Reintentos ante errores transitorios (usa settings.LLM_MAX_RETRIES)
+            timeout: Segundos máximos por llamada (usa settings.LLM_TIMEOUT_SECONDS)
+            base_delay: Espera inicial entre reintentos (usa settings.LLM_RETRY_BASE_DELAY)
+            max_delay: Espera máxima entre reintentos (usa settings.LLM_RETRY_MAX_DELAY)
+            sleep, clock: Inyectables para pruebas
+            usage_tracker: Dónde se registra el consumo (usa el global de usage_service)
+            rate_limited: Aplica los límites de peticiones y tokens por minuto
+            deduplicate: Comparte la respuesta entre prompts idénticos en vuelo
+        """
+        self.backend = backend
+        self.usage_tracker = usage_tracker or default_usage_tracker
+        self.max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.timeout = timeout or settings.LLM_TIMEOUT_SECONDS
+        self.base_delay = settings.LLM_RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = settings.LLM_RETRY_MAX_DELAY if max_delay is None else max_delay
+        self.sleep = sleep
+        self.rate_limited = rate_limited
+        self.deduplicate = deduplicate
+
+        rpm = requests_per_minute or settings.LLM_REQUESTS_PER_MINUTE
+        tpm = tokens_per_minute or settings.LLM_TOKENS_PER_MINUTE
+        self.request_bucket = TokenBucket(rpm, rpm / 60.0, clock=clock, sleep=sleep)
+        self.token_bucket = TokenBucket(tpm, tpm / 60.0, clock=clock, sleep=sleep)
+
+        concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+        self._semaphore = threading.BoundedSemaphore(concurrency)
+        self._accepts_request_options = self._accepts_kwarg(backend.generate_content, "request_options")
+
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "failures": 0,
+            "abandoned": 0,
+            "deduplicated": 0,
+            "rate_limit_wait_s": 0.0
+        }
+
+    def generate(self, prompt: str, operation: str = "generate", **scope):
+        """
+        Envía un prompt al backend respetando límites y reintentos
+
+        Si el mismo prompt ya está en vuelo, espera y comparte esa respuesta;
+        el consumo queda imputado sólo al ámbito de quien hizo la llamada.
+
+        Args:
+            prompt: Prompt completo
+            operation: Tipo de llamada para el registro de consumo
+            **scope: session_id, document_id, feed_url a los que se imputan los tokens
+
+        Returns:
+            Respuesta del backend (con atributo `text`)
+
+        Raises:
+            LLMError: Si la llamada falla después de los reintentos
+        """
+        if not self.deduplicate:
+            return self._call_with_retries(prompt, dict(scope, operation=operation))
+
+        key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            self._count("deduplicated")
+            return future.result()
+
+        try:
+            response = self._call_with_retries(prompt, dict(scope, operation=operation))
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _call_with_retries(self, prompt: str, scope: dict):
+        tokens = estimate_tokens(prompt)
+        attempt = 0
+
+        while True:
+            if self.rate_limited:
+                waited = self.request_bucket.acquire(1)
+                waited += self.token_bucket.acquire(tokens)
+                if waited:
+                    self._count("rate_limit_wait_s", waited)
+
+            try:
+                return self._call_once(prompt, scope)
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    self._count("failures")
+                    raise LLMError(f"La llamada al LLM falló tras {attempt + 1} intentos: {e}") from e
+
+                # Espera exponencial con "full jitter"
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+                attempt += 1
+                self._count("retries")
+                print(f"Error transitorio del LLM ({type(e).__name__}), reintento {attempt} en {delay:.1f}s")
+                self.sleep(delay)
+
+    @staticmethod
+    def _accepts_kwarg(func, name: str) -> bool:
+        """
+        Indica si `func` acepta el argumento `name` (explícito o por **kwargs)
+        """
+        try:
+            parameters = inspect.signature(func).parameters.values()
+        except (TypeError, ValueError):
+            return False
+        return any(p.name == name or p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters)
+
+    def _invoke(self, prompt: str):
+        # El contrato es `generate_content(prompt)`; Gemini además acepta un timeout propio
+        if self._accepts_request_options:
+            return self.backend.generate_content(prompt, request_options={"timeout": self.timeout})
+        return self.backend.generate_content(prompt)
+
+    def _record_usage(self, prompt: str, response, latency: float, scope: dict) -> None:
+        if response is None:
+            # Llamada fallida: no hay respuesta, se imputa el prompt estimado
+            prompt_tokens, completion_tokens, estimated = estimate_tokens(prompt), 0, True
+        else:
+            prompt_tokens, completion_tokens, estimated = extract_usage(prompt, response)
+        self.usage_tracker.record(LLMUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            latency_seconds=latency,
+            estimated=estimated,
+            failed=response is None,
+            **scope
+        ))
+
+    def _call_once(self, prompt: str, scope: dict):
+        # El lugar se ocupa hasta que el backend termina, aunque la llamada se abandone
+        # por timeout: las llamadas colgadas siguen contando para max_concurrency
+        if not self._semaphore.acquire(timeout=self.timeout):
+            self._count("timeouts")
+            raise TimeoutError(f"No se liberó ningún lugar para llamar al LLM en {self.timeout}s")
+
+        self._count("calls")
+        # Un hilo por llamada: el tiempo cuenta desde que empieza la llamada
+        future: Future = Future()
+
+        def run():
+            try:
+                if not future.set_running_or_notify_cancel():
+                    return
+                start = time.perf_counter()
+                response = error = None
+                try:
+                    response = self._invoke(prompt)
+                except BaseException as e:
+                    error = e
+
+                try:
+                    # Antes de resolver, para que quien recibe la respuesta ya la vea registrada;
+                    # también las llamadas abandonadas por timeout, cuando por fin terminan
+                    self._record_usage(prompt, response, time.perf_counter() - start, scope)
+                finally:
+                    if error is None:
+                        future.set_result(response)
+                    else:
+                        future.set_exception(error)
+            finally:
+                self._semaphore.release()
+
+        try:
+            threading.Thread(target=run, name="llm-call", daemon=True).start()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # No se puede interrumpir un hilo: se abandona y su resultado se descarta
+            if not future.cancel():
+                self._count("abandoned")
+            self._count("timeouts")
+            raise TimeoutError(f"El LLM no respondió en {self.timeout}s")
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def get_stats(self) -> dict:
+        """
+        Contadores de llamadas, reintentos, timeouts, deduplicaciones y espera por límites
+        """
+        with self._stats_lock:
+            return dict(self._stats)
@@ -0,0 +1,90 @@
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List
+
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    Percentil con interpolación lineal
+
+    Args:
+        values: Valores ya ordenados de menor a mayor
+        p: Percentil entre 0 y 100
+
+    Returns:
+        Valor del percentil (0.0 si no hay valores)
+    """
+    if not values:
+        return 0.0
+
+    position = (len(values) - 1) * p / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    fraction = position - lower
+    return values[lower] + (values[upper] - values[lower]) * fraction
+
+
+class LatencyTracker:
+    """
+    Registra latencias por operación y calcula percentiles
+
+    Guarda sólo las últimas `max_samples` muestras de cada operación para
+    que la memoria se mantenga acotada en procesos de larga duración.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self._samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.max_samples))
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Registra la duración de una operación
+
+        Args:
+            name: Nombre de la operación (por ejemplo "POST /answer")
+            seconds: Duración en segundos
+        """
+        with self._lock:
+            self._samples[name].append(seconds)
+            self._counts[name] += 1
+
+    def percentiles(self, name: str, points: Iterable[float] = (50, 95, 99)) -> Dict[str, float]:
+        """
+        Percentiles en milisegundos de una operación
+
+        Returns:
+            Diccionario {"p50": ..., "p95": ..., "p99": ...}
+        """
+        with self._lock:
+            values = sorted(self._samples.get(name, ()))
+        return {f"p{int(p)}": round(percentile(values, p) * 1000, 2) for p in points}
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        Resumen de todas las operaciones registradas
+
+        Returns:
+            Diccionario {operación: {count, mean_ms, p50, p95, p99}}
+        """
+        with self._lock:
+            names = list(self._samples.keys())
+
+        result = {}
+        for name in names:
+            with self._lock:
+                values = list(self._samples[name])
+                count = self._counts[name]
+            mean = sum(values) / len(values) if values else 0.0
+            result[name] = {
+                "count": count,
+                "mean_ms": round(mean * 1000, 2),
+                **self.percentiles(name)
+            }
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import List, Optional
+
+from models.document import RetrievalResult
+from models.feed import NewsIngestReport
+from config.settings import settings
+from services.database_service import DatabaseService
+from services.embedding_service import EmbeddingService
+from services.feed_fetcher import FeedFetcher
+from services.news_store import NewsStore
+from services.tracing_service import tracer
+
+
+class NewsService:
+    """
+    Índice de búsqueda sobre todas las noticias descargadas
+
+    Cada pasada descarga los feeds (con GET condicional), guarda en
+    NewsStore sólo las noticias que no estaban y vectoriza únicamente
+    esas. Las búsquedas usan una colección de ChromaDB que, al arrancar,
+    se reconstruye con los embeddings ya guardados en SQLite.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        store: Optional[NewsStore] = None,
+        fetcher: Optional[FeedFetcher] = None,
+        batch_size: Optional[int] = None
+    ):
+        """
+        Args:
+            embedding_service: Servicio de embeddings compartido
+            store: Almacén de noticias (por defecto NewsStore en settings.NEWS_DB_PATH)
+            fetcher: Descargador de feeds
+            batch_size: Noticias por lote de embeddings (usa settings.NEWS_EMBED_BATCH_SIZE)
+        """
+        self.embedding_service = embedding_service
+        self.store = store or NewsStore()
+        self.fetcher = fetcher or FeedFetcher()
+        self.batch_size = batch_size or settings.NEWS_EMBED_BATCH_SIZE
+        self._lock = threading.Lock()
+
+        self.database = DatabaseService(embedding_service, collection_name=settings.NEWS_COLLECTION_NAME)
+        self.database.top_k = settings.NEWS_TOP_K
+        self._restore_index()
+
+    def _restore_index(self) -> None:
+        """
+        Carga en ChromaDB las noticias ya vectorizadas (sin recalcular embeddings)
+        """
+        data = self.store.load_embedded()
+        if data["ids"]:
+            self.database.import_data({**data, "top_k": settings.NEWS_TOP_K})
+            print(f"Índice de noticias restaurado: {len(data['ids'])} noticias")
+        else:
+            self.database.reset_collection()
+
+    def ingest_feeds(self, urls: List[str]) -> NewsIngestReport:
+        """
+        Descarga los feeds y agrega al índice sólo las noticias nuevas
+
+        Args:
+            urls: URLs de los feeds
+
+        Returns:
+            NewsIngestReport con lo descargado, lo nuevo y los fallos
+        """
+        start = time.perf_counter()
+        report = NewsIngestReport(feeds=len(urls))
+
+        for result in self.fetcher.fetch_many(urls):
+            if not result.ok:
+                report.failures.append(result)
+                continue
+
+            if result.status == "not_modified":
+                # 304: el feed no cambió, pero la caché del fetcher es compartida (p. ej.
+                # con el resumen RSS) y estas entradas pueden no estar aún en el almacén
+                report.not_modified += 1
+            new = self.store.add_entries(result.url, result.title, result.entries)
+            report.new_entries += new
+            report.duplicate_entries += len(result.entries) - new
+
+        report.embedded_entries = self.embed_pending()
+        report.elapsed_seconds = time.perf_counter() - start
+        print(f"Ingesta de noticias: {report.summary()}")
+        return report
+
+    def embed_pending(self) -> int:
+        """
+        Vectoriza e indexa las noticias guardadas que aún no tienen embedding
+
+        Returns:
+            Número de noticias indexadas
+        """
+        total = 0
+        # Un solo hilo vectoriza a la vez: dos pasadas simultáneas no repiten trabajo
+        with self._lock:
+            while True:
+                pending = self.store.pending(self.batch_size)
+                if not pending:
+                    return total
+
+                ids = [row_id for row_id, _, _ in pending]
+                texts = [text for _, text, _ in pending]
+
+                with tracer.span("news_embedding", entries=len(pending)):
+                    embeddings = self.embedding_service.encode_array(texts)
+
+                self.database.add_chunks(
+                    texts,
+                    [f"news-{row_id}" for row_id in ids],
+                    embeddings.tolist(),
+                    [metadata for _, _, metadata in pending]
+                )
+                self.store.set_embeddings(ids, embeddings)
+                total += len(pending)
+
+    def search(self, question: str, k: Optional[int] = None) -> RetrievalResult:
+        """
+        Busca las noticias más relacionadas con una pregunta
+
+        Args:
+            question: Pregunta del usuario
+            k: Noticias a recuperar (usa settings.NEWS_TOP_K)
+
+        Returns:
+            RetrievalResult con el texto de cada noticia
+        """
+        if self.database.collection.count() == 0:
+            return RetrievalResult(chunks=[], chunk_ids=[], distances=[])
+
+        k = min(k or self.database.top_k, self.database.collection.count())
+        return self.database.retrieve_context(question, k=k)
+
+    def get_stats(self) -> dict:
+        return self.store.get_stats()
@@ -0,0 +1,171 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from models.feed import FeedEntry
+from config.settings import settings
+from services.text_normalizer import html_to_text
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    last_fetched REAL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entry_key TEXT NOT NULL UNIQUE,
+    feed_url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT,
+    guid TEXT,
+    summary TEXT,
+    published TEXT,
+    fetched_at REAL NOT NULL,
+    embedding BLOB
+);
+CREATE INDEX IF NOT EXISTS entries_pending ON entries (id) WHERE embedding IS NULL;
+"""
+
+
+def entry_key(feed_url: str, entry: FeedEntry) -> str:
+    """
+    Clave de deduplicación de una noticia
+
+    Usa el GUID (o, si no hay, el enlace), así la misma noticia publicada
+    en dos feeds o vista en dos descargas se guarda una sola vez. Sin
+    ninguno de los dos, se usa el feed + título + fecha.
+    """
+    identity = entry.guid or entry.link or f"{feed_url}\n{entry.title}\n{entry.published}"
+    return hashlib.sha256(identity.strip().encode("utf-8")).hexdigest()
+
+
+def entry_text(title: str, summary: str) -> str:
+    """
+    Texto de una noticia (sin HTML) que se convierte en embedding y va al contexto
+    """
+    return f"{html_to_text(title)}\n{html_to_text(summary)}".strip()
+
+
+class NewsStore:
+    """
+    Almacén local de noticias en SQLite
+
+    Guarda cada noticia una sola vez (clave por GUID o enlace) junto con su
+    embedding en float32, de modo que al reiniciar la app el índice se
+    reconstruye sin recalcular nada y cada descarga sólo vectoriza lo nuevo.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: Base SQLite (usa settings.NEWS_DB_PATH)
+        """
+        self.db_path = db_path or settings.NEWS_DB_PATH
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def add_entries(self, feed_url: str, feed_title: str, entries: List[FeedEntry]) -> int:
+        """
+        Guarda las noticias que no estaban
+
+        Args:
+            feed_url: Feed de origen
+            feed_title: Título del feed
+            entries: Noticias descargadas
+
+        Returns:
+            Número de noticias nuevas
+        """
+        now = time.time()
+        rows = [
+            (entry_key(feed_url, entry), feed_url, entry.title, entry.link, entry.guid,
+             entry.summary, entry.published, now)
+            for entry in entries
+        ]
+
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO feeds (url, title, last_fetched) VALUES (?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET title = excluded.title, last_fetched = excluded.last_fetched",
+                (feed_url, feed_title, now)
+            )
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO entries "
+                "(entry_key, feed_url, title, link, guid, summary, published, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return self._db.total_changes - before
+
+    def pending(self, limit: int) -> List[Tuple[int, str, dict]]:
+        """
+        Noticias guardadas que todavía no tienen embedding
+
+        Returns:
+            Lista de tuplas (id, texto, metadatos)
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, feed_url, title, link, summary, published FROM entries "
+                "WHERE embedding IS NULL ORDER BY id LIMIT ?",
+                (limit,)
+            ).fetchall()
+
+        return [
+            (row_id, entry_text(title, summary or ""),
+             {"feed_url": feed_url, "title": title, "link": link or "", "published": published or ""})
+            for row_id, feed_url, title, link, summary, published in rows
+        ]
+
+    def set_embeddings(self, ids: List[int], embeddings: np.ndarray) -> None:
+        """
+        Guarda los embeddings calculados (float32)
+        """
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE entries SET embedding = ? WHERE id = ?",
+                [(embeddings[i].tobytes(), row_id) for i, row_id in enumerate(ids)]
+            )
+
+    def load_embedded(self) -> dict:
+        """
+        Todas las noticias con embedding, con el formato de DatabaseService.export_data()
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, feed_url, title, link, summary, published, embedding FROM entries "
+                "WHERE embedding IS NOT NULL ORDER BY id"
+            ).fetchall()
+
+        return {
+            "ids": [f"news-{row[0]}" for row in rows],
+            "documents": [entry_text(row[2], row[4] or "") for row in rows],
+            "metadatas": [
+                {"feed_url": row[1], "title": row[2], "link": row[3] or "", "published": row[5] or ""}
+                for row in rows
+            ],
+            "embeddings": (
+                np.stack([np.frombuffer(row[6], dtype=np.float32) for row in rows])
+                if rows else np.empty((0, 0), dtype=np.float32)
+            )
+        }
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            total, embedded = self._db.execute(
+                "SELECT COUNT(*), COUNT(embedding) FROM entries"
+            ).fetchone()
+            feeds = self._db.execute("SELECT COUNT(*) FROM feeds").fetchone()[0]
+        return {"feeds": feeds, "entries": total, "embedded": embedded, "pending": total - embedded}
+
+    def close(self) -> None:
+        self._db.close()
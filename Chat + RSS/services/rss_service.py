@@ -1,19 +1,121 @@
-import feedparser
+import hashlib
+from typing import List, Optional
+
+from models.feed import FeedEntry, FeedResult, StoryCluster
+from config.settings import settings
+from services.article_enricher import ArticleEnricher
+from services.feed_fetcher import FeedFetcher
+from services.text_normalizer import html_to_text, normalize_text
+from services.token_utils import estimate_tokens
+from services.tracing_service import tracer
+
 
 class RSSService:
 
-    def fetch_and_format(self, url: str) -> str:
-        feed = feedparser.parse(url)
+    def __init__(self, fetcher: Optional[FeedFetcher] = None, enricher: Optional[ArticleEnricher] = None):
+        self.fetcher = fetcher or FeedFetcher()
+        self._enricher = enricher
+
+    @property
+    def enricher(self) -> ArticleEnricher:
+        # Se crea al usarse por primera vez (la mayoría de los análisis no lo necesitan)
+        if self._enricher is None:
+            self._enricher = ArticleEnricher()
+        return self._enricher
+
+    def enrich_entries(self, entries: List[FeedEntry]) -> List[FeedEntry]:
+        """
+        Agrega a cada entrada el texto del artículo enlazado (descarga en paralelo)
+        """
+        return self.enricher.enrich(entries)
+
+    def fetch_and_format(self, url: str, max_entries: int = 5) -> str:
+        # Sólo se leen las entradas que se van a usar
+        result = self.fetch_entries(url, max_entries=max_entries)
+        return self.format_feed(result.title, result.entries, max_entries)
+
+    def fetch_many(self, urls: List[str], max_entries: Optional[int] = None) -> List[FeedResult]:
+        """
+        Descarga varios feeds en paralelo; los errores vienen en cada FeedResult
+        """
+        return self.fetcher.fetch_many(urls, max_entries=max_entries)
+
+    def fetch_entries(self, url: str, max_entries: Optional[int] = None) -> FeedResult:
+        """
+        Descarga las entradas de un feed
+
+        Raises:
+            ValueError: Si el feed no se pudo descargar o parsear
+        """
+        result = self.fetcher.fetch(url, max_entries=max_entries)
 
-        if feed.bozo:
-            raise ValueError("URL inválida o RSS no accesible")
+        if not result.ok:
+            raise ValueError(f"URL inválida o RSS no accesible ({result.error})")
 
-        text = f"Fuente: {feed.feed.get('title', 'RSS')}\n\n"
+        return result
 
-        for entry in feed.entries[:5]:
-            text += f"Título: {entry.get('title', '')}\n"
-            text += f"Resumen: {entry.get('summary', '')}\n\n"
+    @staticmethod
+    def fingerprint(entries: List[FeedEntry]) -> str:
+        """
+        Huella de un conjunto de entradas (GUID o enlace + fechas de publicación y edición)
+
+        Cambia si se publica, quita o edita una entrada; no depende de
+        cómo el servidor sirva el XML.
+        """
+        digest = hashlib.sha256()
+        for entry in entries:
+            digest.update(
+                f"{entry.guid or entry.link or entry.title}\t{entry.published}\t{entry.updated}\n".encode("utf-8")
+            )
+        return digest.hexdigest()
+
+    @staticmethod
+    def format_entry(entry: FeedEntry, max_tokens: Optional[int] = None) -> str:
+        """
+        Formatea una entrada sin HTML ni relleno, recortada al presupuesto de tokens
+
+        Args:
+            entry: Entrada del feed
+            max_tokens: Tokens máximos del resumen (usa settings.RSS_ENTRY_MAX_TOKENS)
+        """
+        summary = normalize_text(entry.summary, max_tokens or settings.RSS_ENTRY_MAX_TOKENS)
+        text = f"Título: {html_to_text(entry.title)}\nResumen: {summary}\n"
+        if entry.content:
+            # El artículo ya viene como texto plano (extract_article)
+            text += f"Artículo: {normalize_text(entry.content, settings.RSS_ARTICLE_MAX_TOKENS)}\n"
+        return text + "\n"
+
+    @staticmethod
+    def format_feed(title: str, entries: List[FeedEntry], max_entries: Optional[int] = 5) -> str:
+        entries = entries[:max_entries]
+        text = f"Fuente: {title or 'RSS'}\n\n"
+
+        with tracer.span("rss_normalize", entries=len(entries)) as span:
+            # Tokens que habría costado pasar los resúmenes tal cual
+            tokens_before = estimate_tokens(text)
+            for entry in entries:
+                tokens_before += estimate_tokens(f"Título: {entry.title}\nResumen: {entry.summary}\n\n")
+                text += RSSService.format_entry(entry)
+
+            span["tokens_before"] = tokens_before
+            span["tokens_after"] = estimate_tokens(text)
 
         return text
 
+    @staticmethod
+    def format_clusters(clusters: List[StoryCluster], max_sources: int = 3) -> str:
+        """
+        Formatea una noticia por grupo, indicando cuántos feeds la publicaron
+        """
+        text = f"Fuente: {len(clusters)} noticias de varios feeds\n\n"
 
+        for cluster in clusters:
+            text += RSSService.format_entry(cluster.representative).rstrip("\n") + "\n"
+            if len(cluster.sources) > 1:
+                names = ", ".join(cluster.sources[:max_sources])
+                if len(cluster.sources) > max_sources:
+                    names += ", ..."
+                text += f"Publicada por {len(cluster.sources)} fuentes ({names})\n"
+            text += "\n"
+
+        return text
@@ -0,0 +1,303 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Optional, Tuple
+
+from models.feed import FeedEntry
+from config.settings import settings
+from services.ai_service import AIService
+from services.rss_service import RSSService
+from services.text_normalizer import truncate_to_tokens
+from services.token_utils import estimate_tokens
+from services.tracing_service import tracer
+
+
+class RSSSummarizer:
+    """
+    Resumen jerárquico (map-reduce) de feeds con muchas entradas
+
+    1. Map: las entradas se agrupan en lotes de RSS_SUMMARY_BATCH_TOKENS
+       tokens y cada lote se resume en paralelo.
+    2. Reduce: los resúmenes parciales se combinan (en varios niveles si
+       no caben en un prompt) en el "resumen + 3 puntos" final.
+
+    Los resúmenes parciales se guardan en caché por contenido del lote. Los
+    cortes entre lotes dependen del GUID de cada entrada y no de dónde
+    empieza el feed: cuando la ventana avanza (entran noticias nuevas y
+    salen las viejas) sólo cambian el primer y el último lote y el resto
+    se reutiliza. Si se alcanza el plazo, se reduce con los lotes que ya
+    terminaron y se indica cuántas entradas quedaron fuera. Los niveles
+    intermedios del reduce tienen su propio plazo y sus propios hilos.
+    """
+
+    def __init__(
+        self,
+        ai_service: AIService,
+        batch_tokens: Optional[int] = None,
+        workers: Optional[int] = None,
+        deadline_seconds: Optional[float] = None,
+        cache_size: Optional[int] = None,
+        reduce_deadline_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            ai_service: Servicio de IA
+            batch_tokens: Tokens de entradas por lote (usa settings.RSS_SUMMARY_BATCH_TOKENS)
+            workers: Lotes resumidos en paralelo (usa settings.RSS_SUMMARY_WORKERS)
+            deadline_seconds: Tiempo máximo de la etapa map (usa settings.RSS_SUMMARY_DEADLINE_SECONDS)
+            cache_size: Resúmenes parciales en caché (usa settings.RSS_SUMMARY_CACHE_SIZE)
+            reduce_deadline_seconds: Tiempo máximo de los niveles intermedios del reduce
+                                     (usa settings.RSS_SUMMARY_REDUCE_DEADLINE_SECONDS)
+        """
+        self.ai_service = ai_service
+        self.batch_tokens = batch_tokens or settings.RSS_SUMMARY_BATCH_TOKENS
+        self.workers = workers or settings.RSS_SUMMARY_WORKERS
+        self.deadline_seconds = deadline_seconds or settings.RSS_SUMMARY_DEADLINE_SECONDS
+        self.cache_size = cache_size or settings.RSS_SUMMARY_CACHE_SIZE
+        self.reduce_deadline_seconds = reduce_deadline_seconds or settings.RSS_SUMMARY_REDUCE_DEADLINE_SECONDS
+
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Compartido entre llamadas: los lotes que siguen corriendo tras el plazo llenan la caché
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rss-map")
+        # Aparte: los lotes del map que siguen corriendo no demoran el reduce
+        self._reduce_executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rss-reduce")
+
+    # -------------------------
+    # API PÚBLICA
+    # -------------------------
+
+    def summarize(
+        self,
+        feed_title: str,
+        entries: List[FeedEntry],
+        session_id: Optional[str] = None,
+        feed_url: Optional[str] = None
+    ) -> str:
+        """
+        Genera el "resumen + 3 puntos" de todas las entradas de un feed
+
+        Args:
+            feed_title: Título del feed
+            entries: Entradas en el orden del feed (más recientes primero)
+            session_id, feed_url: Ámbito para la contabilidad de tokens
+
+        Returns:
+            Análisis final
+        """
+        return self.summarize_with_coverage(feed_title, entries, session_id, feed_url)[0]
+
+    def summarize_with_coverage(
+        self,
+        feed_title: str,
+        entries: List[FeedEntry],
+        session_id: Optional[str] = None,
+        feed_url: Optional[str] = None
+    ) -> Tuple[str, int]:
+        """
+        Igual que `summarize`, indicando además cuántas entradas quedaron fuera por el plazo
+
+        Returns:
+            Tupla (análisis final, entradas omitidas)
+        """
+        scope = {"session_id": session_id, "feed_url": feed_url}
+        batches = self.make_batches(entries)
+
+        # Todo cabe en un prompt: mismo camino que el análisis simple
+        if len(batches) <= 1:
+            return self.ai_service.generate_rss_analysis(
+                RSSService.format_feed(feed_title, entries, max_entries=None), **scope
+            ), 0
+
+        with tracer.span("rss_map", batches=len(batches), entries=len(entries)) as span:
+            partials, omitted = self._map(feed_title, batches, scope)
+            span["omitted_entries"] = omitted
+
+        if not partials:
+            raise TimeoutError("No se pudo resumir ningún lote de entradas antes del plazo")
+
+        with tracer.span("rss_reduce", partials=len(partials)):
+            result = self._reduce(partials, scope)
+
+        if omitted:
+            result += f"\n\n(Análisis parcial: {omitted} entradas no se resumieron dentro del tiempo límite.)"
+        return result, omitted
+
+    def make_batches(self, entries: List[FeedEntry]) -> List[List[FeedEntry]]:
+        """
+        Agrupa las entradas en lotes que caben en `batch_tokens`
+
+        Los cortes se anclan al contenido: después de cada entrada se corta
+        si el hash de su GUID cae por debajo de tokens / (batch_tokens / 2),
+        así los lotes rondan la mitad del presupuesto y el mismo GUID corta
+        siempre en el mismo lugar, esté donde esté la ventana del feed. Un
+        lote que llegaría a `batch_tokens` se corta antes igualmente.
+
+        Returns:
+            Lotes de la más antigua a la más reciente
+        """
+        target = max(1, self.batch_tokens // 2)
+        batches: List[List[FeedEntry]] = []
+        current: List[FeedEntry] = []
+        current_tokens = 0
+
+        for entry in reversed(entries):
+            tokens = estimate_tokens(RSSService.format_entry(entry))
+            if current and current_tokens + tokens > self.batch_tokens:
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(entry)
+            current_tokens += tokens
+
+            if self._cut_score(entry) < tokens / target:
+                batches.append(current)
+                current, current_tokens = [], 0
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"cached_batches": len(self._cache)}
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._reduce_executor.shutdown(wait=False, cancel_futures=True)
+
+    # -------------------------
+    # MAP / REDUCE
+    # -------------------------
+
+    @staticmethod
+    def _cut_score(entry: FeedEntry) -> float:
+        """
+        Número estable en [0, 1) que depende sólo de la identidad de la entrada
+        """
+        identity = entry.guid or entry.link or entry.title
+        digest = hashlib.sha256(identity.encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+    @staticmethod
+    def _batch_key(batch: List[FeedEntry]) -> str:
+        digest = hashlib.sha256()
+        for entry in batch:
+            digest.update(f"{entry.guid}\n{entry.title}\n{entry.summary}\n{entry.content}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _cached(self, key: str) -> Optional[str]:
+        with self._lock:
+            summary = self._cache.get(key)
+            if summary is not None:
+                self._cache.move_to_end(key)
+            return summary
+
+    def _store(self, key: str, summary: str) -> None:
+        with self._lock:
+            self._cache[key] = summary
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _summarize_batch(self, feed_title: str, batch: List[FeedEntry], key: str, scope: dict) -> str:
+        # Dentro del lote se respeta el orden original del feed
+        text = RSSService.format_feed(feed_title, list(reversed(batch)), max_entries=None)
+        summary = self.ai_service.generate_rss_batch_summary(text, **scope)
+        self._store(key, summary)
+        return summary
+
+    def _map(self, feed_title: str, batches: List[List[FeedEntry]], scope: dict) -> tuple:
+        """
+        Resume los lotes en paralelo hasta el plazo
+
+        Returns:
+            Tupla (resúmenes en orden cronológico, entradas de los lotes que no terminaron a tiempo)
+        """
+        deadline = time.monotonic() + self.deadline_seconds
+        results: List[Optional[str]] = [None] * len(batches)
+        futures = {}
+
+        for index, batch in enumerate(batches):
+            key = self._batch_key(batch)
+            cached = self._cached(key)
+            if cached is not None:
+                results[index] = cached
+            else:
+                futures[self._executor.submit(self._summarize_batch, feed_title, batch, key, scope)] = index
+
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        for future in done:
+            if future.exception() is None:
+                results[futures[future]] = future.result()
+            else:
+                print(f"Error resumiendo un lote RSS: {future.exception()}")
+
+        for future in not_done:
+            # Los que no empezaron se cancelan; los que ya corren terminan y quedan en caché
+            future.cancel()
+
+        partials = [summary for summary in results if summary is not None]
+        omitted = sum(len(batch) for batch, summary in zip(batches, results) if summary is None)
+        return partials, omitted
+
+    def _reduce(self, partials: List[str], scope: dict) -> str:
+        """
+        Combina los resúmenes; si no caben en un prompt, se reducen por grupos primero
+
+        Los grupos que no terminan dentro de `reduce_deadline_seconds` pasan
+        sin combinar y, si hace falta, se recortan para que el reduce final
+        quepa en un prompt.
+        """
+        deadline = time.monotonic() + self.reduce_deadline_seconds
+
+        while sum(estimate_tokens(summary) for summary in partials) > self.batch_tokens and len(partials) > 1:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            groups: List[List[str]] = [[]]
+            group_tokens = 0
+            for summary in partials:
+                tokens = estimate_tokens(summary)
+                if groups[-1] and group_tokens + tokens > self.batch_tokens:
+                    groups.append([])
+                    group_tokens = 0
+                groups[-1].append(summary)
+                group_tokens += tokens
+
+            if len(groups) == len(partials):
+                # Cada resumen ocupa un prompt entero: no se puede agrupar más
+                break
+
+            futures = [
+                None if len(group) == 1 else
+                self._reduce_executor.submit(self.ai_service.generate_rss_reduce, group, final=False, **scope)
+                for group in groups
+            ]
+            wait([future for future in futures if future is not None], timeout=remaining)
+
+            reduced: List[str] = []
+            for group, future in zip(groups, futures):
+                if future is None:
+                    reduced.append(group[0])
+                elif future.done() and not future.cancelled() and future.exception() is None:
+                    reduced.append(future.result())
+                else:
+                    if future.done() and future.exception() is not None:
+                        print(f"Error combinando resúmenes RSS: {future.exception()}")
+                    future.cancel()
+                    reduced.extend(group)
+
+            if len(reduced) == len(partials):
+                # Ningún grupo se combinó a tiempo
+                break
+            partials = reduced
+
+        # Lo que no se llegó a combinar se recorta por igual para caber en el prompt final
+        if sum(estimate_tokens(summary) for summary in partials) > self.batch_tokens:
+            budget = max(1, self.batch_tokens // len(partials))
+            partials = [truncate_to_tokens(summary, budget) for summary in partials]
+
+        return self.ai_service.generate_rss_reduce(partials, final=True, **scope)
@@ -0,0 +1,111 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from models.feed import FeedEntry, FeedResult, StoryCluster
+from config.settings import settings
+from services.embedding_service import EmbeddingService
+from services.news_store import entry_text
+from services.tracing_service import tracer
+
+
+class StoryClusterer:
+    """
+    Agrupa la misma noticia publicada por varios feeds
+
+    Todos los títulos y resúmenes se convierten en embeddings en un solo
+    lote. Luego, recorriendo las entradas en orden, cada una que aún no
+    tiene grupo abre uno y se lleva todas las demás sin grupo cuya
+    similitud coseno supera el umbral (una sola multiplicación
+    matriz-vector por grupo, sin armar la matriz n x n). Así cada noticia
+    llega al LLM una sola vez, con el número de fuentes que la publicaron.
+    """
+
+    def __init__(self, embedding_service: EmbeddingService, threshold: Optional[float] = None):
+        """
+        Args:
+            embedding_service: Servicio de embeddings compartido
+            threshold: Similitud mínima para la misma noticia (usa settings.STORY_CLUSTER_THRESHOLD)
+        """
+        self.embedding_service = embedding_service
+        self.threshold = threshold or settings.STORY_CLUSTER_THRESHOLD
+
+    def cluster_feeds(self, feeds: List[FeedResult]) -> List[StoryCluster]:
+        """
+        Agrupa las entradas de varios feeds descargados
+
+        Args:
+            feeds: Resultados de FeedFetcher (los que fallaron se ignoran)
+
+        Returns:
+            Grupos ordenados por número de fuentes (las noticias más repetidas primero)
+        """
+        items = [
+            (feed.title or feed.url, entry)
+            for feed in feeds if feed.ok
+            for entry in feed.entries
+        ]
+        return self.cluster(items)
+
+    def cluster(self, items: List[Tuple[str, FeedEntry]]) -> List[StoryCluster]:
+        """
+        Agrupa entradas casi duplicadas
+
+        Args:
+            items: Tuplas (nombre de la fuente, entrada)
+
+        Returns:
+            Grupos ordenados por número de fuentes
+        """
+        if not items:
+            return []
+
+        with tracer.span("story_clustering", entries=len(items)) as span:
+            embeddings = self.embedding_service.encode_array(
+                [entry_text(entry.title, entry.summary) for _, entry in items]
+            )
+            groups = self._group(embeddings)
+            span["clusters"] = len(groups)
+
+        clusters = []
+        for members in groups:
+            entries = [items[i][1] for i in members]
+            sources = list(dict.fromkeys(items[i][0] for i in members))
+            clusters.append(StoryCluster(
+                # La versión con más texto es la que aporta más contexto
+                representative=max(entries, key=lambda entry: len(entry.summary)),
+                entries=entries,
+                sources=sources
+            ))
+
+        # sort es estable: a igual número de fuentes se mantiene el orden de los feeds
+        clusters.sort(key=lambda cluster: len(cluster.sources), reverse=True)
+        return clusters
+
+    def _group(self, embeddings: np.ndarray) -> List[List[int]]:
+        """
+        Agrupamiento "líder": cada entrada sin grupo abre uno con sus vecinas sin grupo
+
+        Returns:
+            Índices de cada grupo, en el orden de las entradas
+        """
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        normalized = embeddings / np.maximum(norms, 1e-12)
+
+        unassigned = np.ones(len(normalized), dtype=bool)
+        groups: List[List[int]] = []
+
+        for leader in range(len(normalized)):
+            if not unassigned[leader]:
+                continue
+
+            candidates = np.flatnonzero(unassigned)
+            similarities = normalized[candidates] @ normalized[leader]
+            members = candidates[similarities >= self.threshold]
+            # El líder siempre forma parte de su grupo (aunque su vector sea nulo)
+            members = np.union1d(members, [leader])
+
+            unassigned[members] = False
+            groups.append(members.tolist())
+
+        return groups
@@ -0,0 +1,137 @@
+import html
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+from services.token_utils import CHARS_PER_TOKEN
+
+
+# Etiquetas cuyo contenido nunca es texto de la noticia
+_SKIP_TAGS = {"script", "style", "noscript", "iframe", "svg", "head", "template", "form", "button"}
+
+# Etiquetas que separan bloques de texto
+_BLOCK_TAGS = {
+    "p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+    "blockquote", "section", "article", "header", "footer", "table", "tr", "figcaption"
+}
+
+# Líneas de relleno que agregan los CMS y agregadores (WordPress, Feedburner, redes sociales...)
+# Cada patrón describe la línea completa: "Más información sobre el terremoto..." o
+# "Imagen: el satélite captó..." son texto de la noticia y no se tocan
+_BOILERPLATE = re.compile(
+    r"^(?:"
+    r"the post .+ appeared first on .+"
+    r"|la entrada .+ (?:se publicó primero|apareció primero) en .+"
+    r"|(?:continue reading|read more|leer más|seguir leyendo|sigue leyendo|ver más|más información)"
+    r"\s*(?:»|›|→|>|:|\.{3}|…)?"
+    r"|(?:(?:compartir|comparte|share)(?: en| on)? (?:facebook|twitter|x|whatsapp|linkedin|telegram|e-?mail)\s*[,|·]?\s*)+"
+    r"|(?:suscríbete|subscribe)(?: (?:ahora|now))?(?: (?:a|al|to) .{0,40}(?:newsletter|boletín|canal|channel|podcast|feed|rss))?\s*[.!»›]?"
+    # Crédito de una foto: "Foto: EFE", "Photo: Getty Images / Reuters" (corto, con mayúscula y sin oraciones)
+    r"|(?:foto|fotografía|imagen|photo)s?\s*:\s*(?-i:[A-ZÁÉÍÓÚÑ])[^\s.!?…]*(?:\s+[^\s.!?…]+){0,5}"
+    r"|\[?(?:…|\.\.\.)\]?"
+    r")$",
+    re.IGNORECASE
+)
+
+# "[…]" o "[...]" al final de un extracto
+_TRAILING_ELLIPSIS = re.compile(r"\s*\[(?:…|\.\.\.)\]\s*$")
+_SPACES = re.compile(r"[ \t\r\f\v ]+")
+
+
+class _TextExtractor(HTMLParser):
+    """
+    Extrae el texto visible de un fragmento HTML, un bloque por línea
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_startendtag(self, tag, attrs):
+        # <img/> (píxeles de seguimiento incluidos) no aporta texto; <br/> separa líneas
+        if tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(raw: str) -> str:
+    """
+    Convierte HTML en texto plano y descarta las líneas de relleno
+
+    Args:
+        raw: Resumen de una entrada (HTML o texto)
+
+    Returns:
+        Texto con los espacios colapsados; los bloques se unen con un espacio
+    """
+    if not raw:
+        return ""
+
+    if "<" in raw:
+        extractor = _TextExtractor()
+        extractor.feed(raw)
+        extractor.close()
+        text = "".join(extractor.parts)
+    else:
+        # Camino rápido: texto sin etiquetas, sólo entidades
+        text = html.unescape(raw) if "&" in raw else raw
+
+    lines = []
+    for line in text.split("\n"):
+        line = _SPACES.sub(" ", line).strip()
+        if line and not _BOILERPLATE.match(line):
+            lines.append(line)
+
+    return _TRAILING_ELLIPSIS.sub("", " ".join(lines))
+
+
+def truncate_to_tokens(text: str, max_tokens: Optional[int]) -> str:
+    """
+    Recorta un texto al presupuesto de tokens (misma estimación que estimate_tokens)
+
+    Se corta al final de la última oración completa si queda al menos la
+    mitad del presupuesto; si no, en el último espacio.
+    """
+    if not max_tokens:
+        return text
+
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+
+    cut = text[:limit - 1]
+    sentence_end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+    if sentence_end >= limit // 2:
+        return cut[:sentence_end + 1]
+
+    space = cut.rfind(" ")
+    if space > 0:
+        cut = cut[:space]
+    return cut.rstrip(",;:") + "…"
+
+
+def normalize_text(raw: str, max_tokens: Optional[int] = None) -> str:
+    """
+    Texto limpio de una entrada, listo para el prompt
+
+    Args:
+        raw: Resumen original de la entrada
+        max_tokens: Presupuesto de tokens (None = sin recorte)
+    """
+    return truncate_to_tokens(html_to_text(raw), max_tokens)
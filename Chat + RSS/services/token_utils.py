@@ -0,0 +1,20 @@
+import math
+
+
+# Aproximación habitual para modelos tipo Gemini/GPT: ~4 caracteres por token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estima el número de tokens de un texto sin llamar a ningún tokenizador
+
+    Args:
+        text: Texto a medir
+
+    Returns:
+        Número aproximado de tokens
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
@@ -0,0 +1,268 @@
+import atexit
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from config.settings import settings
+from services.metrics_service import LatencyTracker
+
+
+# Atributos de los spans que se exportan a Prometheus como contadores (rag_stage_<clave>_total).
+# Los demás (k, max_entries, turns...) son parámetros, no cantidades acumulables: siguen en get_stats()
+PROMETHEUS_COUNTERS = {
+    "bytes": "Bytes procesados por etapa",
+    "chunks": "Chunks procesados por etapa",
+    "entries": "Entradas de feeds procesadas por etapa",
+    "articles": "Artículos enlazados procesados por etapa",
+    "enriched": "Entradas completadas con el texto del artículo",
+    "omitted_entries": "Entradas que quedaron fuera por el plazo",
+    "tokens": "Tokens estimados por etapa",
+    "prompt_tokens": "Tokens de prompt enviados al LLM",
+    "completion_tokens": "Tokens generados por el LLM"
+}
+
+
+def escape_label(value) -> str:
+    """
+    Escapa un valor de etiqueta según el formato de texto de Prometheus (\\, \" y salto de línea)
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Tracer:
+    """
+    Instrumentación ligera del pipeline RAG
+
+    Cada etapa (extracción, troceado, embeddings, búsqueda, prompt,
+    generación...) se mide con un span:
+
+        with tracer.span("vector_search", k=4) as span:
+            ...
+            span["cache_hit"] = False
+
+    Los atributos numéricos (bytes, tokens, chunks...) se acumulan por
+    etapa y `cache_hit` se cuenta como aciertos/fallos. Los datos se
+    exponen como diccionario (panel de depuración), como líneas JSON en
+    un archivo de trazas y en formato de texto de Prometheus (sólo los
+    contadores de PROMETHEUS_COUNTERS).
+    """
+
+    def __init__(self, enabled: bool = True, trace_file: Optional[str] = None, max_recent: int = 500):
+        """
+        Args:
+            enabled: Si es False, los spans no registran nada
+            trace_file: Archivo JSONL donde escribir cada span (None = desactivado)
+            max_recent: Spans recientes que se guardan en memoria
+        """
+        self.enabled = enabled
+        self.latency = LatencyTracker(max_samples=2000)
+        self._stats: Dict[str, dict] = {}
+        self._recent: deque = deque(maxlen=max_recent)
+        self._lock = threading.Lock()
+        self._trace_file = None
+        self._exporter = None
+        self._collectors: List[Callable[[], str]] = []
+
+        if trace_file:
+            self._trace_file = open(trace_file, "a", encoding="utf-8")
+            atexit.register(self._trace_file.close)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Mide la duración de un bloque de código
+
+        Args:
+            name: Nombre de la etapa
+            **attributes: Atributos iniciales (bytes, tokens, chunks, cache_hit...)
+
+        Yields:
+            Diccionario de atributos que el bloque puede completar
+        """
+        if not self.enabled:
+            yield attributes
+            return
+
+        start = time.perf_counter()
+        try:
+            yield attributes
+        finally:
+            self._finish(name, start, time.perf_counter() - start, attributes)
+
+    def _finish(self, name: str, start: float, duration: float, attributes: dict) -> None:
+        self.latency.record(name, duration)
+
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = {
+                    "count": 0,
+                    "total_seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "cache_hits": 0,
+                    "cache_misses": 0,
+                    "totals": defaultdict(float)
+                }
+
+            stats["count"] += 1
+            stats["total_seconds"] += duration
+            stats["max_seconds"] = max(stats["max_seconds"], duration)
+
+            for key, value in attributes.items():
+                if key == "cache_hit":
+                    stats["cache_hits" if value else "cache_misses"] += 1
+                elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                    stats["totals"][key] += value
+
+            record = {
+                "name": name,
+                "timestamp": time.time(),
+                "duration_ms": round(duration * 1000, 3),
+                **attributes
+            }
+            self._recent.append(record)
+
+            if self._trace_file is not None:
+                self._trace_file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def get_stats(self) -> Dict[str, dict]:
+        """
+        Estadísticas agregadas por etapa
+
+        Returns:
+            Diccionario {etapa: {count, total_ms, mean_ms, max_ms, p50, p95, p99, ...}}
+        """
+        with self._lock:
+            snapshot = {
+                name: {**stats, "totals": dict(stats["totals"])}
+                for name, stats in self._stats.items()
+            }
+
+        result = {}
+        for name, stats in snapshot.items():
+            result[name] = {
+                "count": stats["count"],
+                "total_ms": round(stats["total_seconds"] * 1000, 2),
+                "mean_ms": round(stats["total_seconds"] * 1000 / stats["count"], 2),
+                "max_ms": round(stats["max_seconds"] * 1000, 2),
+                **self.latency.percentiles(name),
+                "cache_hits": stats["cache_hits"],
+                "cache_misses": stats["cache_misses"],
+                **stats["totals"]
+            }
+        return result
+
+    def get_recent(self, n: int = 50) -> List[dict]:
+        """
+        Últimos N spans registrados (el más reciente al final)
+        """
+        with self._lock:
+            return list(self._recent)[-n:]
+
+    def add_collector(self, collector: Callable[[], str]) -> None:
+        """
+        Registra otra fuente de métricas que se exporta junto a los spans
+
+        Args:
+            collector: Función sin argumentos que devuelve texto en formato Prometheus
+        """
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def to_prometheus(self) -> str:
+        """
+        Exporta las métricas en formato de texto de Prometheus (spans y colectores registrados)
+        """
+        with self._lock:
+            snapshot = {
+                name: {**stats, "totals": dict(stats["totals"])}
+                for name, stats in self._stats.items()
+            }
+            collectors = list(self._collectors)
+
+        lines = [
+            "# HELP rag_stage_duration_seconds Duración de cada etapa del pipeline RAG",
+            "# TYPE rag_stage_duration_seconds summary"
+        ]
+        for name, stats in snapshot.items():
+            stage = escape_label(name)
+            for point, value in self.latency.percentiles(name).items():
+                quantile = int(point[1:]) / 100
+                lines.append(f'rag_stage_duration_seconds{{stage="{stage}",quantile="{quantile}"}} {value / 1000}')
+            lines.append(f'rag_stage_duration_seconds_sum{{stage="{stage}"}} {stats["total_seconds"]}')
+            lines.append(f'rag_stage_duration_seconds_count{{stage="{stage}"}} {stats["count"]}')
+
+        lines.append("# TYPE rag_stage_cache_hits_total counter")
+        for name, stats in snapshot.items():
+            lines.append(f'rag_stage_cache_hits_total{{stage="{escape_label(name)}"}} {stats["cache_hits"]}')
+        lines.append("# TYPE rag_stage_cache_misses_total counter")
+        for name, stats in snapshot.items():
+            lines.append(f'rag_stage_cache_misses_total{{stage="{escape_label(name)}"}} {stats["cache_misses"]}')
+
+        for key, help_text in PROMETHEUS_COUNTERS.items():
+            stages = [(name, stats["totals"][key]) for name, stats in snapshot.items() if key in stats["totals"]]
+            if not stages:
+                continue
+            lines.append(f"# HELP rag_stage_{key}_total {help_text}")
+            lines.append(f"# TYPE rag_stage_{key}_total counter")
+            for name, value in stages:
+                lines.append(f'rag_stage_{key}_total{{stage="{escape_label(name)}"}} {value}')
+
+        text = "\n".join(lines) + "\n"
+        for collector in collectors:
+            text += collector()
+        return text
+
+    def start_http_exporter(self, port: int, host: str = "127.0.0.1") -> None:
+        """
+        Sirve /metrics en formato Prometheus desde un hilo en segundo plano
+
+        Llamadas repetidas no abren más servidores (útil con Streamlit,
+        que vuelve a ejecutar el script en cada interacción).
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        with self._lock:
+            if self._exporter is not None:
+                return
+
+            tracer = self
+
+            class MetricsHandler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = tracer.to_prometheus().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self._exporter = ThreadingHTTPServer((host, port), MetricsHandler)
+
+        threading.Thread(target=self._exporter.serve_forever, name="metrics-exporter", daemon=True).start()
+        print(f"Métricas Prometheus en http://{host}:{port}/metrics")
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._trace_file is not None:
+                self._trace_file.flush()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._recent.clear()
+        self.latency.reset()
+
+
+# Instancia global de trazas
+tracer = Tracer(enabled=settings.TRACING_ENABLED, trace_file=settings.TRACE_FILE)
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config.settings import settings
+
+
+# Datos personales que se reemplazan antes de guardar una pregunta
+_PATTERNS = [
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"), "<email>"),
+    (re.compile(r"https?://\S+"), "<url>"),
+    (re.compile(r"\+?\d[\d\s().-]{6,}\d"), "<numero>"),
+]
+
+
+def anonymize_text(text: str) -> str:
+    """
+    Reemplaza correos, URLs y números largos (teléfonos, cédulas...) por marcadores
+    """
+    for pattern, placeholder in _PATTERNS:
+        text = pattern.sub(placeholder, text)
+    return text
+
+
+class TrafficRecorder:
+    """
+    Grabador opcional de interacciones para pruebas de carga
+
+    Escribe una línea JSON por evento (pregunta o análisis RSS) con el hash
+    del documento, la pregunta anonimizada, los IDs recuperados y los
+    tiempos de cada etapa. Los identificadores de sesión y las URLs de
+    feeds se guardan como hash con sal, nunca en claro.
+    """
+
+    def __init__(self, path: Optional[str] = None, salt: Optional[str] = None):
+        """
+        Args:
+            path: Archivo JSONL de salida (usa settings.TRAFFIC_CAPTURE_FILE; None = desactivado)
+            salt: Sal para los hashes (usa settings.TRAFFIC_CAPTURE_SALT o una aleatoria)
+        """
+        self.path = path or settings.TRAFFIC_CAPTURE_FILE
+        self.salt = salt or settings.TRAFFIC_CAPTURE_SALT or os.urandom(16).hex()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _hash(self, value: str) -> str:
+        return hashlib.sha256(f"{self.salt}:{value}".encode("utf-8")).hexdigest()[:16]
+
+    def _write(self, event: dict) -> None:
+        line = json.dumps(event, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def record_question(
+        self,
+        session_id: str,
+        document_hash: Optional[str],
+        question: str,
+        retrieved_ids: List[str],
+        timings: Dict[str, float],
+        history_length: int = 0
+    ) -> None:
+        """
+        Registra una pregunta sobre un documento
+
+        Args:
+            session_id: Identificador de la sesión (se guarda como hash)
+            document_hash: Hash SHA-256 del documento consultado
+            question: Pregunta del usuario (se anonimiza)
+            retrieved_ids: IDs de los chunks recuperados
+            timings: Segundos por etapa, por ejemplo {"retrieval": 0.03, "generation": 1.2}
+            history_length: Mensajes en el historial en el momento de la pregunta
+        """
+        if not self.enabled:
+            return
+
+        self._write({
+            "type": "question",
+            "timestamp": time.time(),
+            "session": self._hash(session_id),
+            "document_hash": document_hash,
+            "question": anonymize_text(question),
+            "retrieved_ids": retrieved_ids,
+            "history_length": history_length,
+            "timings_ms": {name: round(value * 1000, 2) for name, value in timings.items()}
+        })
+
+    def record_rss(self, session_id: str, feed_url: str, text_chars: int, timings: Dict[str, float]) -> None:
+        """
+        Registra un análisis de RSS
+
+        Args:
+            session_id: Identificador de la sesión (se guarda como hash)
+            feed_url: URL del feed (se guarda como hash)
+            text_chars: Tamaño del texto enviado al LLM
+            timings: Segundos por etapa, por ejemplo {"fetch": 0.4, "analysis": 2.1}
+        """
+        if not self.enabled:
+            return
+
+        self._write({
+            "type": "rss",
+            "timestamp": time.time(),
+            "session": self._hash(session_id),
+            "feed": self._hash(feed_url),
+            "text_chars": text_chars,
+            "timings_ms": {name: round(value * 1000, 2) for name, value in timings.items()}
+        })
+
+
+def load_trace(path: str) -> List[dict]:
+    """
+    Lee un archivo de trazas grabado por TrafficRecorder
+    """
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# Instancia global (sólo escribe si TRAFFIC_CAPTURE_FILE está configurado)
+recorder = TrafficRecorder()
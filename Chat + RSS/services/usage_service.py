@@ -0,0 +1,195 @@
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+from models.usage import LLMUsage
+from config.settings import settings
+from services.tracing_service import escape_label, tracer
+from services.token_utils import estimate_tokens
+
+
+def extract_usage(prompt: str, response) -> tuple:
+    """
+    Obtiene los tokens de una respuesta del LLM
+
+    Usa `usage_metadata` de Gemini cuando está disponible y, si no (por
+    ejemplo con StubLLM o sin red), los estima a partir del texto.
+
+    Returns:
+        Tupla (prompt_tokens, completion_tokens, estimated)
+    """
+    metadata = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(metadata, "prompt_token_count", None)
+    completion_tokens = getattr(metadata, "candidates_token_count", None)
+
+    if prompt_tokens is None or completion_tokens is None:
+        return estimate_tokens(prompt), estimate_tokens(response.text), True
+    return int(prompt_tokens), int(completion_tokens), False
+
+
+class UsageTracker:
+    """
+    Contabilidad de tokens, costo y latencia de las llamadas al LLM
+
+    Acumula totales globales y por operación, sesión, documento y feed.
+    Los totales se exponen como diccionario (panel de depuración, /metrics)
+    y en formato Prometheus junto a las métricas del tracer.
+    """
+
+    DIMENSIONS = ("operation", "session_id", "document_id", "feed_url")
+
+    def __init__(
+        self,
+        prompt_price_per_mtok: Optional[float] = None,
+        completion_price_per_mtok: Optional[float] = None,
+        max_recent: int = 200
+    ):
+        """
+        Args:
+            prompt_price_per_mtok: USD por millón de tokens de entrada (usa settings.LLM_PROMPT_PRICE_PER_MTOK)
+            completion_price_per_mtok: USD por millón de tokens de salida (usa settings.LLM_COMPLETION_PRICE_PER_MTOK)
+            max_recent: Llamadas recientes que se guardan en memoria
+        """
+        self.prompt_price = (
+            settings.LLM_PROMPT_PRICE_PER_MTOK if prompt_price_per_mtok is None else prompt_price_per_mtok
+        )
+        self.completion_price = (
+            settings.LLM_COMPLETION_PRICE_PER_MTOK if completion_price_per_mtok is None else completion_price_per_mtok
+        )
+        self._totals = self._empty()
+        self._by_dimension: Dict[str, Dict[str, dict]] = {dimension: {} for dimension in self.DIMENSIONS}
+        self._recent: deque = deque(maxlen=max_recent)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _empty() -> dict:
+        return {
+            "calls": 0,
+            "failed_calls": 0,
+            "estimated_calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cost_usd": 0.0,
+            "latency_seconds": 0.0
+        }
+
+    def cost(self, usage: LLMUsage) -> float:
+        """
+        Costo estimado en USD de una llamada
+        """
+        return (usage.prompt_tokens * self.prompt_price + usage.completion_tokens * self.completion_price) / 1_000_000
+
+    def record(self, usage: LLMUsage) -> None:
+        """
+        Registra una llamada y la suma a todos sus agregados
+        """
+        cost = self.cost(usage)
+
+        with self._lock:
+            buckets = [self._totals]
+            for dimension in self.DIMENSIONS:
+                key = getattr(usage, dimension)
+                if key:
+                    buckets.append(self._by_dimension[dimension].setdefault(key, self._empty()))
+
+            for bucket in buckets:
+                bucket["calls"] += 1
+                bucket["failed_calls"] += int(usage.failed)
+                bucket["estimated_calls"] += int(usage.estimated)
+                bucket["prompt_tokens"] += usage.prompt_tokens
+                bucket["completion_tokens"] += usage.completion_tokens
+                bucket["cost_usd"] += cost
+                bucket["latency_seconds"] += usage.latency_seconds
+
+            self._recent.append(usage)
+
+    def get_totals(self) -> dict:
+        """
+        Totales globales
+        """
+        with self._lock:
+            return self._format(self._totals)
+
+    def get_breakdown(self, dimension: str) -> Dict[str, dict]:
+        """
+        Totales por operación, sesión, documento o feed
+
+        Args:
+            dimension: Uno de "operation", "session_id", "document_id", "feed_url"
+        """
+        with self._lock:
+            return {key: self._format(bucket) for key, bucket in self._by_dimension[dimension].items()}
+
+    def get_stats(self) -> dict:
+        """
+        Totales globales y desglose por cada dimensión
+        """
+        return {
+            "totals": self.get_totals(),
+            **{dimension: self.get_breakdown(dimension) for dimension in self.DIMENSIONS}
+        }
+
+    def get_recent(self, n: int = 50) -> List[LLMUsage]:
+        with self._lock:
+            return list(self._recent)[-n:]
+
+    @staticmethod
+    def _format(bucket: dict) -> dict:
+        calls = bucket["calls"]
+        return {
+            "calls": calls,
+            "failed_calls": bucket["failed_calls"],
+            "estimated_calls": bucket["estimated_calls"],
+            "prompt_tokens": bucket["prompt_tokens"],
+            "completion_tokens": bucket["completion_tokens"],
+            "mean_prompt_tokens": round(bucket["prompt_tokens"] / calls, 1) if calls else 0.0,
+            "cost_usd": round(bucket["cost_usd"], 6),
+            "mean_latency_ms": round(bucket["latency_seconds"] * 1000 / calls, 2) if calls else 0.0
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Exporta los totales por operación en formato de texto de Prometheus
+
+        Las sesiones, documentos y feeds no se exportan como etiquetas para
+        no disparar la cardinalidad; están disponibles en `get_stats()`.
+        """
+        with self._lock:
+            totals = dict(self._totals)
+            operations = {escape_label(key): dict(bucket) for key, bucket in self._by_dimension["operation"].items()}
+
+        lines = [
+            "# HELP llm_tokens_total Tokens consumidos por las llamadas al LLM",
+            "# TYPE llm_tokens_total counter"
+        ]
+        for operation, bucket in operations.items():
+            lines.append(f'llm_tokens_total{{operation="{operation}",kind="prompt"}} {bucket["prompt_tokens"]}')
+            lines.append(f'llm_tokens_total{{operation="{operation}",kind="completion"}} {bucket["completion_tokens"]}')
+
+        lines.append("# TYPE llm_calls_total counter")
+        for operation, bucket in operations.items():
+            lines.append(f'llm_calls_total{{operation="{operation}"}} {bucket["calls"]}')
+
+        lines.append("# TYPE llm_failed_calls_total counter")
+        for operation, bucket in operations.items():
+            lines.append(f'llm_failed_calls_total{{operation="{operation}"}} {bucket["failed_calls"]}')
+
+        lines.append("# TYPE llm_cost_usd_total counter")
+        for operation, bucket in operations.items():
+            lines.append(f'llm_cost_usd_total{{operation="{operation}"}} {bucket["cost_usd"]}')
+
+        lines.append("# TYPE llm_latency_seconds_sum counter")
+        lines.append(f"llm_latency_seconds_sum {totals['latency_seconds']}")
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals = self._empty()
+            self._by_dimension = {dimension: {} for dimension in self.DIMENSIONS}
+            self._recent.clear()
+
+
+# Instancia global de consumo; sus métricas salen junto a las del tracer
+usage_tracker = UsageTracker()
+tracer.add_collector(usage_tracker.to_prometheus)
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+import api_server
+from services.index_registry import IndexRegistry
+from services.llm_backends import StubLLM
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.batches = 0
+        self._lock = threading.Lock()
+
+    def encode_batch(self, texts):
+        with self._lock:
+            self.batches += 1
+        return [[float(len(text)), 1.0, 0.0] for text in texts]
+
+    def encode_text(self, text):
+        return [float(len(text)), 1.0, 0.0]
+
+
+def document_bytes(word):
+    return " ".join(f"{word}{i}" for i in range(600)).encode("utf-8")
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = api_server.APIServer(llm_backend=StubLLM())
+    embeddings = FakeEmbeddings()
+    server.embedding_service = embeddings
+    # Presupuesto para un solo documento en memoria
+    server.index_registry = IndexRegistry(
+        embeddings, budget_mb=0.012, spill_dir=str(tmp_path), idle_seconds=0, session_ttl=0
+    )
+    yield server
+    server.cpu_executor.shutdown(wait=False)
+    server.llm_executor.shutdown(wait=False)
+
+
+def test_concurrent_ingests_of_the_same_document_index_it_once(server):
+    barrier = threading.Barrier(4)
+    results = []
+
+    def ingest():
+        barrier.wait()
+        results.append(server._ingest_sync("notas.txt", document_bytes("alfa")))
+
+    threads = [threading.Thread(target=ingest) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({result["document_id"] for result in results}) == 1
+    assert server.embedding_service.batches == 1
+    assert server.index_registry.get_stats()["indexes_in_memory"] == 1
+
+
+def test_documents_over_budget_are_spilled_and_reloaded(server):
+    first = server._ingest_sync("uno.txt", document_bytes("alfa"))
+    second = server._ingest_sync("dos.txt", document_bytes("beta"))
+
+    stats = server.index_registry.get_stats()
+    assert stats["indexes_in_memory"] == 1 and stats["indexes_on_disk"] == 1
+
+    result = server._retrieve_sync(first["document_id"], "alfa1", 2)
+    assert len(result.chunks) == 2
+    assert server._retrieve_sync(second["document_id"], "beta1", 2).chunks
+    assert server.index_registry.get_stats()["indexes_in_memory"] == 1
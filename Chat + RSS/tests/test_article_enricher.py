@@ -0,0 +1,147 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.feeds import FixtureFeedServer, build_article
+from models.feed import FeedEntry
+from services.article_enricher import ArticleEnricher
+
+
+PAGES = {f"/noticia-{i}": build_article(i) for i in range(8)}
+
+
+@pytest.fixture
+def server():
+    with FixtureFeedServer(PAGES, slow_seconds=0.3) as fixture:
+        yield fixture
+
+
+class CountingEnricher(ArticleEnricher):
+    """
+    Cuenta las descargas simultáneas del lado del cliente (el servidor cuenta
+    una petición hasta que su hilo termina, después de que el cliente ya leyó)
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.max_active = 0
+        self._count_lock = threading.Lock()
+
+    def _download(self, url):
+        with self._count_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            return super()._download(url)
+        finally:
+            with self._count_lock:
+                self.active -= 1
+
+
+def entries_for(server, prefix=""):
+    return [FeedEntry(title=f"Noticia {i}", link=server.url(f"{prefix}/noticia-{i}")) for i in range(8)]
+
+
+def test_limits_concurrent_downloads_per_domain(server):
+    enricher = CountingEnricher(cache_dir="", workers=8, per_domain=2, domain_delay=0, allow_private_hosts=True)
+
+    enriched = enricher.enrich(entries_for(server, "/slow"))
+
+    assert all(entry.content for entry in enriched)
+    assert enricher.max_active == 2
+
+
+def test_spaces_downloads_to_the_same_domain(server):
+    enricher = ArticleEnricher(cache_dir="", workers=8, per_domain=8, domain_delay=0.1, allow_private_hosts=True)
+
+    start = time.monotonic()
+    enricher.enrich(entries_for(server)[:4])
+
+    # Cuatro inicios separados por 0,1 s: el último no puede empezar antes de 0,3 s
+    assert time.monotonic() - start >= 0.3
+
+
+def test_other_domains_are_not_delayed(server):
+    entries = entries_for(server, "/slow")
+    for entry in entries[1::2]:
+        entry.link = entry.link.replace("127.0.0.1", "localhost")
+    enricher = CountingEnricher(cache_dir="", workers=8, per_domain=1, domain_delay=0, allow_private_hosts=True)
+
+    start = time.monotonic()
+    enricher.enrich(entries)
+
+    # 4 páginas por dominio, una a la vez, pero los dos dominios en paralelo
+    assert enricher.max_active == 2
+    assert time.monotonic() - start < 8 * 0.3 * 0.75
+
+
+def test_cache_avoids_second_download(server, tmp_path):
+    enricher = ArticleEnricher(cache_dir=str(tmp_path), domain_delay=0, allow_private_hosts=True)
+    enricher.enrich(entries_for(server))
+    requests = server.requests
+
+    again = enricher.enrich(entries_for(server))
+
+    assert server.requests == requests
+    assert enricher.get_stats()["cache_hits"] == 8
+    assert all(entry.content for entry in again)
+
+
+@pytest.mark.parametrize("link", [
+    "file:///etc/passwd",
+    "ftp://example.com/noticia",
+    "http://127.0.0.1/noticia",
+    "http://10.0.0.7/noticia",
+    "http://169.254.169.254/latest/meta-data",
+])
+def test_rejects_local_schemes_and_private_hosts(link):
+    enricher = ArticleEnricher(cache_dir="")
+
+    with pytest.raises(ValueError):
+        enricher.check_url(link)
+    assert enricher.fetch_text(link) == ""
+    assert enricher.get_stats()["failures"] == 1
+
+
+def test_trickling_page_is_cut_at_the_total_timeout():
+    with FixtureFeedServer(PAGES, slow_seconds=1.0) as slow_server:
+        enricher = ArticleEnricher(cache_dir="", domain_delay=0, timeout=0.3, allow_private_hosts=True)
+        entry = FeedEntry(title="Noticia", link=slow_server.url("/trickle/noticia-0"))
+
+        start = time.monotonic()
+        enriched = enricher.enrich([entry])
+
+        assert enriched == [entry]
+        assert enricher.get_stats()["failures"] == 1
+        assert time.monotonic() - start < 0.7
+
+
+def test_extraction_errors_only_affect_their_entry(server, monkeypatch):
+    import services.article_enricher as article_enricher
+
+    def extract(html):
+        if html == PAGES["/noticia-3"].decode("utf-8"):
+            raise RuntimeError("HTML imposible")
+        return "texto del artículo"
+
+    monkeypatch.setattr(article_enricher, "extract_article", extract)
+    enricher = ArticleEnricher(cache_dir="", domain_delay=0, allow_private_hosts=True)
+
+    enriched = enricher.enrich(entries_for(server))
+
+    assert [bool(entry.content) for entry in enriched] == [i != 3 for i in range(8)]
+    assert enricher.get_stats()["failures"] == 1
+
+
+def test_cache_write_errors_keep_the_text(server, tmp_path, monkeypatch):
+    enricher = ArticleEnricher(cache_dir=str(tmp_path), domain_delay=0, allow_private_hosts=True)
+
+    def full_disk(url, text):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(enricher, "_save_cache", full_disk)
+    enriched = enricher.enrich(entries_for(server)[:2])
+
+    assert all(entry.content for entry in enriched)
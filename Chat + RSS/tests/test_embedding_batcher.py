@@ -0,0 +1,71 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from services.embedding_batcher import EmbeddingBatcher
+
+
+def encode(texts):
+    time.sleep(0.01)
+    return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_concurrent_requests_share_a_batch_and_report_latency():
+    batcher = EmbeddingBatcher(encode, max_batch_size=8, max_wait_ms=50)
+    barrier = threading.Barrier(8)
+    results = {}
+
+    def query(i):
+        barrier.wait()
+        results[i] = batcher.encode("x" * i)
+
+    threads = [threading.Thread(target=query, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+
+    assert results == {i: [float(i), 1.0] for i in range(8)}
+    stats = batcher.get_stats()
+    assert stats["items"] == 8 and stats["batches"] < 8
+    assert set(stats["encode_ms_by_size"]) == set(stats["histogram"])
+    assert all(ms >= 10 for ms in stats["encode_ms_by_size"].values())
+    assert stats["mean_wait_ms"] > 0
+
+
+def test_submit_after_close_fails_instead_of_hanging():
+    batcher = EmbeddingBatcher(encode, max_wait_ms=0)
+    assert batcher.encode("hola") == [4.0, 1.0]
+    batcher.close()
+
+    with pytest.raises(RuntimeError):
+        batcher.submit("tarde")
+
+
+def test_close_racing_with_submits_resolves_every_future():
+    batcher = EmbeddingBatcher(encode, max_batch_size=64, max_wait_ms=1)
+    futures = []
+    stop = threading.Event()
+
+    def producer():
+        while not stop.is_set():
+            try:
+                futures.append(batcher.submit("texto"))
+            except RuntimeError:
+                return
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=producer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    batcher.close()
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    for future in futures:
+        assert future.result(timeout=1) == [5.0, 1.0]
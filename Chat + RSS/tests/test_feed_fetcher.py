@@ -0,0 +1,175 @@
+import threading
+import time
+
+import pytest
+
+import services.feed_fetcher as feed_fetcher
+from benchmarks.feeds import FixtureFeedServer, build_rss
+from services.feed_fetcher import DeadlineStream, FeedFetcher
+
+
+@pytest.fixture
+def server():
+    feeds = {f"/feed/{i}.xml": build_rss(20, seed=i) for i in range(6)}
+    with FixtureFeedServer(feeds, slow_seconds=1.0) as fixture:
+        yield fixture
+
+
+def test_304_reuses_cached_entries(server, tmp_path):
+    fetcher = FeedFetcher(cache_dir=str(tmp_path))
+    url = server.url("/feed/0.xml")
+
+    first = fetcher.fetch(url)
+    second = fetcher.fetch(url)
+
+    assert first.status == "ok"
+    assert second.status == "not_modified"
+    assert second.http_status == 304
+    assert server.not_modified == 1
+    assert [e.guid for e in second.entries] == [e.guid for e in first.entries]
+
+
+def test_304_respects_max_entries_and_changes_are_downloaded(server, tmp_path):
+    fetcher = FeedFetcher(cache_dir=str(tmp_path))
+    url = server.url("/feed/0.xml")
+    fetcher.fetch(url)
+
+    assert len(fetcher.fetch(url, max_entries=5).entries) == 5
+
+    server.set_feed("/feed/0.xml", build_rss(25, seed=99))
+    changed = fetcher.fetch(url)
+    assert changed.status == "ok"
+    assert len(changed.entries) == 25
+
+
+def test_per_host_limit(server, monkeypatch):
+    # Conexiones abiertas a la vez, contadas del lado del cliente (de urlopen al cierre)
+    counter = {"active": 0, "max_active": 0}
+    lock = threading.Lock()
+    original_urlopen = feed_fetcher.urlopen
+
+    def release():
+        with lock:
+            counter["active"] -= 1
+
+    def counting_urlopen(*args, **kwargs):
+        with lock:
+            counter["active"] += 1
+            counter["max_active"] = max(counter["max_active"], counter["active"])
+        try:
+            response = original_urlopen(*args, **kwargs)
+        except BaseException:
+            release()
+            raise
+        close = response.close
+        response.close = lambda: (release(), close())
+        return response
+
+    monkeypatch.setattr(feed_fetcher, "urlopen", counting_urlopen)
+    fetcher = FeedFetcher(cache_dir="", workers=6, per_host=2, timeout=5)
+    urls = [server.url(f"/slow/feed/{i}.xml") for i in range(6)]
+
+    results = fetcher.fetch_many(urls)
+
+    assert all(result.ok for result in results)
+    assert counter["max_active"] == 2
+
+
+def test_slow_feed_times_out(server):
+    fetcher = FeedFetcher(cache_dir="", timeout=0.3)
+
+    start = time.monotonic()
+    result = fetcher.fetch(server.url("/slow/feed/0.xml"))
+
+    assert result.status == "error"
+    assert "timed out" in result.error or "TimeoutError" in result.error
+    assert time.monotonic() - start < 0.9
+
+
+def test_timeout_is_a_total_deadline_for_trickling_servers(server):
+    # Cada parte llega antes del timeout del socket, pero el feed completo tarda 1 s
+    fetcher = FeedFetcher(cache_dir="", timeout=0.4)
+
+    start = time.monotonic()
+    result = fetcher.fetch(server.url("/trickle/feed/0.xml"))
+
+    assert result.status == "error"
+    assert "TimeoutError" in result.error
+    assert time.monotonic() - start < 0.8
+
+
+class TricklingResponse:
+    """
+    Respuesta que entrega 100 bytes cada 0.1 s, sin fin
+    """
+
+    def read1(self, size):
+        time.sleep(0.1)
+        return b"x" * min(size, 100)
+
+    def read(self, size=-1):
+        raise AssertionError("read() sin tamaño esperaría todo el cuerpo sin revisar el plazo")
+
+
+def test_reading_to_the_end_respects_the_deadline():
+    stream = DeadlineStream(TricklingResponse(), time.monotonic() + 0.35, 0.35)
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        stream.read()
+    assert time.monotonic() - start < 0.6
+
+
+def test_read_all_stops_at_the_limit():
+    stream = DeadlineStream(TricklingResponse(), time.monotonic() + 5, 5)
+    assert stream.read_all(limit=250) == b"x" * 250
+
+
+def test_parser_fallback_respects_the_deadline(server):
+    # Lo que no es RSS se termina de leer para feedparser: esa lectura también tiene plazo
+    server.set_feed("/noticias.html", b"<html><body>" + b"<p>no es un feed</p>" * 2000)
+    fetcher = FeedFetcher(cache_dir="", timeout=0.4)
+
+    start = time.monotonic()
+    result = fetcher.fetch(server.url("/trickle/noticias.html"))
+
+    assert result.status == "error"
+    assert "TimeoutError" in result.error
+    assert time.monotonic() - start < 0.8
+
+
+def test_waiting_for_the_host_limit_counts_against_the_deadline(server):
+    fetcher = FeedFetcher(cache_dir="", per_host=1, timeout=0.3)
+    url = server.url("/feed/0.xml")
+    host_limit = fetcher._host_limit(url)
+    host_limit.acquire()  # Otra descarga ocupa el único turno del host
+
+    try:
+        start = time.monotonic()
+        result = fetcher.fetch(url)
+    finally:
+        host_limit.release()
+
+    assert result.status == "error"
+    assert "TimeoutError" in result.error
+    assert 0.25 < time.monotonic() - start < 0.8
+    assert server.requests == 0
+    assert fetcher.fetch(url).status == "ok"
+
+
+def test_errors_are_isolated_per_feed(server):
+    fetcher = FeedFetcher(cache_dir="", timeout=0.3)
+    urls = [
+        server.url("/feed/0.xml"),
+        server.url("/broken.xml"),
+        server.url("/no-existe.xml"),
+        server.url("/slow/feed/1.xml"),
+        server.url("/feed/2.xml"),
+    ]
+
+    results = fetcher.fetch_many(urls)
+
+    assert [result.url for result in results] == urls
+    assert [result.status for result in results] == ["ok", "error", "error", "error", "ok"]
+    assert results[2].http_status == 404
+    assert len(results[0].entries) == 20 and len(results[4].entries) == 20
@@ -0,0 +1,162 @@
+import random
+import time
+
+import pytest
+
+from models.feed import FeedEntry, FeedResult
+from services.feed_poller import FeedPoller
+from services.feed_registry import FeedRegistry
+
+
+URL = "http://feeds.test/rss.xml"
+
+
+class FakeRSS:
+    """
+    Devuelve las entradas que se le indiquen, o lanza el error configurado
+    """
+
+    def __init__(self):
+        self.guids = ["a"]
+        self.error = None
+
+    def fetch_entries(self, url, max_entries=None):
+        if self.error:
+            raise self.error
+        return FeedResult(url=url, status="ok", title="Feed", entries=[FeedEntry(title=g, guid=g) for g in self.guids])
+
+
+class FakeAI:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_rss_analysis(self, text, feed_url=None):
+        self.calls += 1
+        return f"análisis {self.calls}"
+
+
+class Clock:
+    """
+    Reloj manual; arranca en la hora real para que las suscripciones recién creadas estén pendientes
+    """
+
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def setup():
+    registry = FeedRegistry(":memory:")
+    registry.subscribe(URL, interval_seconds=600)
+    rss, ai, clock = FakeRSS(), FakeAI(), Clock()
+    poller = FeedPoller(
+        registry, rss, ai, workers=1, min_interval=60, max_interval=3600,
+        max_error_delay=3600, jitter=0, clock=clock
+    )
+    yield poller, registry, rss, ai, clock
+    poller.close()
+    registry.close()
+
+
+def test_interval_halves_on_change_and_grows_when_unchanged(setup):
+    poller, registry, rss, ai, clock = setup
+
+    first = poller.poll(registry.get(URL))
+    # La primera revisión analiza, pero no cuenta como cambio
+    assert (first.interval_seconds, ai.calls) == (600, 1)
+
+    clock.now += 600
+    unchanged = poller.poll(registry.get(URL))
+    assert unchanged.interval_seconds == 900
+    assert ai.calls == 1
+
+    clock.now += 900
+    rss.guids = ["b", "a"]
+    changed = poller.poll(registry.get(URL))
+    assert changed.interval_seconds == 450
+    assert changed.last_changed_at == clock.now
+    assert ai.calls == 2
+    assert registry.get(URL).next_poll_at == clock.now + 450
+
+
+def test_interval_stays_within_bounds(setup):
+    poller, registry, rss, ai, clock = setup
+
+    for _ in range(20):
+        poller.poll(registry.get(URL))
+    assert registry.get(URL).interval_seconds == 3600
+
+    for i in range(20):
+        rss.guids = [str(i)]
+        poller.poll(registry.get(URL))
+    assert registry.get(URL).interval_seconds == 60
+
+
+def test_errors_back_off_exponentially_up_to_the_cap(setup):
+    poller, registry, rss, ai, clock = setup
+    rss.error = ValueError("RSS no accesible")
+
+    delays = []
+    for _ in range(5):
+        subscription = poller.poll(registry.get(URL))
+        delays.append(subscription.next_poll_at - clock.now)
+
+    assert delays == [1200, 2400, 3600, 3600, 3600]
+    assert registry.get(URL).failures == 5
+    assert registry.get(URL).last_error == "ValueError: RSS no accesible"
+
+    rss.error = None
+    recovered = poller.poll(registry.get(URL))
+    assert (recovered.failures, recovered.last_error) == (0, None)
+
+
+def test_backoff_does_not_overflow_after_many_failures(setup):
+    poller, registry, rss, ai, clock = setup
+    rss.error = ValueError("caído")
+    subscription = registry.get(URL)
+    subscription.failures = 1030
+    registry.update(subscription)
+
+    assert poller.poll_due() == 1
+    assert registry.get(URL).next_poll_at == clock.now + 3600
+    assert registry.get(URL).failures == 1031
+
+
+def test_jitter_stays_within_bounds(setup):
+    poller, registry, rss, ai, clock = setup
+    poller.jitter = 0.2
+    poller.rng = random.Random(7)
+
+    delays = set()
+    for _ in range(200):
+        subscription = registry.get(URL)
+        subscription.interval_seconds = 600
+        subscription.last_polled_at = None
+        registry.update(subscription)
+        delays.add(poller.poll(registry.get(URL)).next_poll_at - clock.now)
+
+    assert all(480 <= delay <= 720 for delay in delays)
+    # El jitter reparte las revisiones: no caen todas en el mismo instante
+    assert len(delays) > 100
+
+
+def test_ai_service_provider_is_called_on_first_analysis(setup):
+    poller, registry, rss, ai, clock = setup
+    created = []
+
+    def provider():
+        created.append(ai)
+        return ai
+
+    lazy = FeedPoller(registry, rss, provider, workers=1, jitter=0, clock=clock)
+    assert created == []
+    lazy.get_stats()
+    assert created == []
+
+    lazy.poll(registry.get(URL))
+    lazy.poll(registry.get(URL))
+    assert len(created) == 1
+    lazy.close()
@@ -0,0 +1,98 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+from models.document import Chunk, Document
+from services.index_registry import IndexRegistry, IndexReleasedError
+
+
+class FakeEmbeddings:
+    def encode_batch(self, texts):
+        return [[float(len(text)), 1.0, 0.0] for text in texts]
+
+
+def make_document(chunks=20):
+    file_hash = uuid.uuid4().hex
+    texts = [f"fragmento {i} del documento {file_hash[:8]}" for i in range(chunks)]
+    return Document(
+        file_name="notas.txt",
+        file_hash=file_hash,
+        full_text=" ".join(texts),
+        chunks=[Chunk(id=f"{file_hash[:8]}_{i}", content=t, start_index=0, size=len(t)) for i, t in enumerate(texts)],
+        total_pages=1
+    )
+
+
+def make_registry(tmp_path, **kwargs):
+    # Presupuesto para un solo documento de 20 chunks
+    options = {"budget_mb": 0.008, "spill_dir": str(tmp_path), "idle_seconds": 0, "session_ttl": 0}
+    options.update(kwargs)
+    return IndexRegistry(FakeEmbeddings(), **options)
+
+
+def test_evicted_index_is_spilled_and_reloaded(tmp_path):
+    registry = make_registry(tmp_path)
+    first, second = make_document(), make_document()
+
+    registry.create("sesion1", first)
+    registry.create("sesion2", second)
+    assert registry.get_stats()["indexes_on_disk"] == 1
+
+    with registry.use("sesion1", first.file_hash) as database:
+        assert database.collection.count() == 20
+    # Al recargar el primero se desalojó el segundo
+    assert registry.get_stats()["indexes_in_memory"] == 1
+
+
+def test_spilling_one_index_does_not_block_other_sessions(tmp_path):
+    registry = make_registry(tmp_path, budget_mb=1)
+    slow, fast = make_document(), make_document()
+    registry.create("lenta", slow)
+    registry.create("rapida", fast)
+
+    original_spill = registry._spill
+    spilling = threading.Event()
+
+    def slow_spill(entry, database):
+        spilling.set()
+        time.sleep(1.0)
+        original_spill(entry, database)
+
+    registry._spill = slow_spill
+    entry = registry._entries[registry.namespace("lenta", slow.file_hash)]
+    evictor = threading.Thread(target=registry._evict, args=(entry,))
+    evictor.start()
+    spilling.wait(1)
+
+    start = time.monotonic()
+    with registry.use("rapida", fast.file_hash) as database:
+        assert database.collection.count() == 20
+    assert time.monotonic() - start < 0.5
+
+    # Quien pide el índice que se está guardando espera y lo recibe recargado
+    with registry.use("lenta", slow.file_hash) as database:
+        assert database.collection.count() == 20
+    evictor.join()
+
+
+def test_released_index_reports_the_reason(tmp_path):
+    registry = make_registry(tmp_path, spill_to_disk=False)
+    first, second = make_document(), make_document()
+    registry.create("sesion1", first)
+    registry.create("sesion2", second)
+
+    with pytest.raises(IndexReleasedError, match="memoria"):
+        with registry.use("sesion1", first.file_hash):
+            pass
+
+    # La actividad de otra sesión libera la que quedó inactiva
+    registry.session_ttl = 0.05
+    time.sleep(0.1)
+    with pytest.raises(KeyError, match="no se encontró"):
+        with registry.use("sesion3", "nunca-existio"):
+            pass
+    with pytest.raises(IndexReleasedError, match="inactiva"):
+        with registry.use("sesion2", second.file_hash):
+            pass
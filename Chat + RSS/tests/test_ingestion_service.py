@@ -0,0 +1,79 @@
+import uuid
+
+import pytest
+
+from services.database_service import DatabaseService
+from services.ingestion_service import IngestionService
+
+
+class FakeEmbeddings:
+    """
+    Vectores fijos; falla en cualquier lote que contenga `poison`
+    """
+
+    def __init__(self, poison=None):
+        self.poison = poison
+
+    def encode_batch(self, texts):
+        if self.poison and any(self.poison in text for text in texts):
+            raise RuntimeError("modelo sin memoria")
+        return [[float(len(text)), 1.0, 0.0] for text in texts]
+
+
+class FailingWriteDatabase(DatabaseService):
+    """
+    Falla al escribir cualquier lote que incluya chunks de `broken_file`
+    """
+
+    broken_file = None
+
+    def add_chunks(self, texts, chunk_ids, embeddings, metadatas):
+        if any(metadata["file_name"] == self.broken_file for metadata in metadatas):
+            raise RuntimeError("disco lleno")
+        super().add_chunks(texts, chunk_ids, embeddings, metadatas)
+
+
+def paragraph(word, size=3000):
+    return " ".join(f"{word}{i}" for i in range(size // (len(word) + 4)))
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    for name in ("uno", "dos", "tres"):
+        (tmp_path / f"{name}.txt").write_text(paragraph(name), encoding="utf-8")
+    # El veneno está al final: los primeros lotes del archivo sí se escriben
+    (tmp_path / "malo.txt").write_text(paragraph("malo", 6000) + " VENENO", encoding="utf-8")
+    return tmp_path
+
+
+def indexed_files(database):
+    metadatas = database.collection.get(include=["metadatas"])["metadatas"]
+    return {metadata["file_name"] for metadata in metadatas}
+
+
+def test_failed_file_is_rolled_back_and_report_matches_index(corpus):
+    embeddings = FakeEmbeddings(poison="VENENO")
+    database = DatabaseService(embeddings, collection_name=f"ingesta-{uuid.uuid4().hex[:8]}")
+    service = IngestionService(embeddings, database, workers=1, batch_size=4)
+
+    report = service.ingest(str(corpus))
+
+    assert [failure.file_name for failure in report.failures] == ["malo.txt"]
+    assert indexed_files(database) == {"uno.txt", "dos.txt", "tres.txt"}
+    assert report.processed_files == 3
+    assert report.total_chunks == database.collection.count()
+
+
+def test_write_failures_are_subtracted_from_the_report(corpus):
+    embeddings = FakeEmbeddings()
+    database = FailingWriteDatabase(embeddings, collection_name=f"ingesta-{uuid.uuid4().hex[:8]}")
+    database.broken_file = "malo.txt"
+    service = IngestionService(embeddings, database, workers=1, batch_size=4)
+
+    report = service.ingest(str(corpus))
+
+    failed = {failure.file_name for failure in report.failures}
+    assert "malo.txt" in failed
+    assert indexed_files(database) == {"uno.txt", "dos.txt", "tres.txt", "malo.txt"} - failed
+    assert report.processed_files == 4 - len(failed)
+    assert report.total_chunks == database.collection.count()
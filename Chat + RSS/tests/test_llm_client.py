@@ -0,0 +1,193 @@
+import threading
+import time
+
+import pytest
+
+from services.llm_backends import StubLLM, StubServiceUnavailable
+from services.llm_client import LLMClient, LLMError, TokenBucket
+from services.usage_service import UsageTracker
+
+
+class Response:
+    text = "respuesta"
+
+
+class PlainBackend:
+    """
+    Backend con el contrato mínimo: generate_content(prompt), sin kwargs
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt):
+        self.calls += 1
+        return Response()
+
+
+class ScriptedBackend:
+    """
+    Ejecuta una acción por llamada: una excepción se lanza, un número se duerme
+    """
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+
+    def generate_content(self, prompt, request_options=None):
+        step = self.script[self.calls] if self.calls < len(self.script) else None
+        self.calls += 1
+        if isinstance(step, BaseException):
+            raise step
+        if step:
+            time.sleep(step)
+        return Response()
+
+
+def make_client(backend, **kwargs):
+    options = {"base_delay": 0.001, "max_delay": 0.001, "usage_tracker": UsageTracker()}
+    options.update(kwargs)
+    return LLMClient(backend, **options)
+
+
+def test_backend_without_request_options():
+    backend = PlainBackend()
+    assert make_client(backend).generate("hola").text == "respuesta"
+    assert backend.calls == 1
+
+
+def test_retries_transient_errors():
+    backend = ScriptedBackend(StubServiceUnavailable("503"), ConnectionError("reset"))
+    client = make_client(backend, max_retries=3)
+
+    assert client.generate("hola").text == "respuesta"
+    assert backend.calls == 3
+    assert client.get_stats()["retries"] == 2
+
+
+def test_non_retryable_error_fails_fast():
+    backend = ScriptedBackend(ValueError("prompt inválido"))
+    client = make_client(backend, max_retries=3)
+
+    with pytest.raises(LLMError):
+        client.generate("hola")
+    assert backend.calls == 1
+    assert client.get_stats()["failures"] == 1
+
+
+def test_hung_call_does_not_block_the_retry():
+    # El reintento sale por otro lugar mientras la llamada colgada sigue en curso
+    backend = ScriptedBackend(5.0)
+    client = make_client(backend, max_concurrency=2, timeout=0.2, max_retries=1)
+
+    start = time.monotonic()
+    assert client.generate("hola").text == "respuesta"
+
+    assert time.monotonic() - start < 1.0
+    assert backend.calls == 2
+    stats = client.get_stats()
+    assert stats["timeouts"] == 1 and stats["abandoned"] == 1
+
+
+class ConcurrencyBackend:
+    """
+    Cuenta las llamadas simultáneas; la primera se cuelga `hang` segundos
+    """
+
+    def __init__(self, hang):
+        self.hang = hang
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.calls += 1
+            first = self.calls == 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.hang if first else 0.01)
+            return Response()
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def test_abandoned_calls_keep_their_concurrency_slot():
+    backend = ConcurrencyBackend(hang=0.5)
+    client = make_client(backend, max_concurrency=1, timeout=0.2, max_retries=5)
+
+    start = time.monotonic()
+    assert client.generate("hola").text == "respuesta"
+
+    # El reintento esperó a que la llamada colgada terminara
+    assert time.monotonic() - start >= 0.5
+    assert backend.max_active == 1
+    assert client.get_stats()["abandoned"] == 1
+
+
+def test_identical_prompts_in_flight_share_one_call_and_one_usage_record():
+    backend = StubLLM(latency_ms=200)
+    tracker = UsageTracker()
+    client = make_client(backend, usage_tracker=tracker)
+
+    threads = [
+        threading.Thread(target=client.generate, args=("mismo prompt", "answer"), kwargs={"session_id": "s1"})
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert backend.calls == 1
+    assert client.get_stats()["deduplicated"] == 4
+    assert tracker.get_totals()["calls"] == 1
+    assert tracker.get_breakdown("session_id")["s1"]["calls"] == 1
+
+
+def test_limits_and_deduplication_can_be_disabled():
+    backend = StubLLM(latency_ms=100)
+    client = make_client(backend, requests_per_minute=1, rate_limited=False, deduplicate=False)
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=client.generate, args=("mismo prompt",)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Con 1 petición por minuto, la segunda llamada esperaría un minuto
+    assert time.monotonic() - start < 1.0
+    assert backend.calls == 4
+    stats = client.get_stats()
+    assert stats["deduplicated"] == 0 and stats["rate_limit_wait_s"] == 0
+
+
+def test_failed_attempts_are_recorded_as_usage():
+    tracker = UsageTracker()
+    client = make_client(ScriptedBackend(ConnectionError("reset")), usage_tracker=tracker)
+
+    client.generate("hola", "answer")
+
+    totals = tracker.get_totals()
+    assert totals["calls"] == 2
+    assert totals["failed_calls"] == 1
+
+
+def test_token_bucket_waits_for_refill():
+    now = [0.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(capacity=2, rate=1.0, clock=lambda: now[0], sleep=sleep)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert slept == [pytest.approx(1.0)]